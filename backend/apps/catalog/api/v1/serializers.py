@@ -5,12 +5,18 @@ from apps.catalog.models import Supplier, SupplierProduct
 
 class SupplierSerializer(serializers.ModelSerializer):
     def validate_name(self, value):
-        duplicate = Supplier.find_by_normalized_name(value)
+        return str(value or "").strip()
+
+    def validate(self, attrs):
+        # Checked on every write, not only when the name is sent: save() recomputes normalized_name, and
+        # legacy rows that collide once normalized were left without one by the 0005 migration.
+        name = attrs.get("name", self.instance.name if self.instance else "")
+        duplicate = Supplier.find_by_normalized_name(name)
         if duplicate and (not self.instance or duplicate.id != self.instance.id):
             raise serializers.ValidationError(
-                f"A supplier with equivalent normalized name already exists: {duplicate.name}."
+                {"name": f"A supplier with equivalent normalized name already exists: {duplicate.name}."}
             )
-        return str(value or "").strip()
+        return attrs
 
     class Meta:
         model = Supplier
@@ -13,6 +13,11 @@ urlpatterns = [
         SupplierProductCatalogViewSet.as_view({"get": "list"}),
         name="supplier-products-catalog",
     ),
+    path(
+        "supplier-products/complete/",
+        SupplierProductCatalogViewSet.as_view({"get": "complete"}),
+        name="supplier-products-complete",
+    ),
     path(
         "suppliers/<uuid:supplier_id>/products/",
         SupplierProductViewSet.as_view({"get": "list", "post": "create"}),
@@ -1,8 +1,14 @@
 ﻿from rest_framework import mixins, viewsets
 from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
 
 from apps.catalog.api.v1.serializers import SupplierProductSerializer, SupplierSerializer
 from apps.catalog.models import Supplier, SupplierProduct
+from apps.catalog.services.product_search import (
+    COMPLETION_DEFAULT_LIMIT,
+    complete_supplier_products,
+    search_supplier_products,
+)
 
 
 class SupplierViewSet(viewsets.ModelViewSet):
@@ -43,5 +49,14 @@ class SupplierProductCatalogViewSet(mixins.ListModelMixin, viewsets.GenericViewS
             queryset = queryset.filter(active=True)
         query = (self.request.query_params.get("q") or "").strip()
         if query:
-            queryset = queryset.filter(name__icontains=query)
+            queryset = search_supplier_products(queryset, query)
         return queryset
+
+    def complete(self, request):
+        query = (request.query_params.get("q") or "").strip()
+        try:
+            limit = int(request.query_params.get("limit") or COMPLETION_DEFAULT_LIMIT)
+        except ValueError:
+            limit = COMPLETION_DEFAULT_LIMIT
+        active_only = str(request.query_params.get("active") or "1").strip().lower() not in {"0", "false", "no"}
+        return Response({"results": complete_supplier_products(query, limit=limit, active_only=active_only)})
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Expressions match what Django emits for icontains/istartswith on PostgreSQL: UPPER("col"::text) LIKE ...
+PREFIX_INDEXES = (
+    ("idx_catalog_sp_name_prefix", "catalog_supplier_product", "name"),
+)
+TRIGRAM_INDEXES = (
+    ("idx_catalog_sp_name_trgm", "catalog_supplier_product", "name"),
+    ("idx_catalog_sp_sku_trgm", "catalog_supplier_product", "supplier_sku"),
+    ("idx_catalog_sp_category_trgm", "catalog_supplier_product", "category"),
+    ("idx_catalog_supplier_name_trgm", "catalog_supplier", "name"),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    # Other backends (SQLite in local runs) keep plain LIKE scans.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name, table, column in PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} (UPPER("{column}"::text) text_pattern_ops)'
+        )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name, _table, _column in (*PREFIX_INDEXES, *TRIGRAM_INDEXES):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0003_supplierproduct_category"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,50 @@
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalize(value):
+    # Frozen copy of apps.catalog.models.normalize_supplier_name.
+    raw = str(value or "").strip()
+    if not raw:
+        return ""
+    without_accents = "".join(
+        char for char in unicodedata.normalize("NFD", raw) if unicodedata.category(char) != "Mn"
+    )
+    return re.sub(r"[^A-Za-z0-9]+", "", without_accents).upper()
+
+
+def fill_normalized_names(apps, schema_editor):
+    Supplier = apps.get_model("catalog", "Supplier")
+    seen = set()
+    pending = []
+    # Older rows may already collide once normalized: the oldest keeps the value, the rest stay NULL.
+    for supplier in Supplier.objects.order_by("created_at", "id").only("id", "name"):
+        normalized = _normalize(supplier.name)
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        supplier.normalized_name = normalized
+        pending.append(supplier)
+    Supplier.objects.bulk_update(pending, ["normalized_name"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0004_supplier_product_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="supplier",
+            name="normalized_name",
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(fill_normalized_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="supplier",
+            name="normalized_name",
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -20,6 +20,8 @@ def normalize_supplier_name(value: str | None) -> str:
 class Supplier(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255, unique=True)
+    # normalize_supplier_name(name), kept in sync by save(); NULL when the name has no letters or digits.
+    normalized_name = models.CharField(max_length=255, unique=True, null=True, blank=True, editable=False)
     vat_number = models.CharField(max_length=64, blank=True, null=True)
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,15 +34,33 @@ class Supplier(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_supplier_name(self.name) or None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_name"}
+        super().save(*args, **kwargs)
+
     @classmethod
     def find_by_normalized_name(cls, value: str | None):
         normalized = normalize_supplier_name(value)
         if not normalized:
             return None
-        for candidate in cls.objects.all():
-            if normalize_supplier_name(candidate.name) == normalized:
-                return candidate
-        return None
+        return cls.objects.filter(normalized_name=normalized).first()
+
+    @classmethod
+    def resolve_by_normalized_names(cls, values) -> dict[str, "Supplier"]:
+        """Map each raw name in `values` to its supplier by normalized name, in one query; misses are left out."""
+        normalized_by_value = {value: normalize_supplier_name(value) for value in values}
+        wanted = {normalized for normalized in normalized_by_value.values() if normalized}
+        if not wanted:
+            return {}
+        by_normalized = {supplier.normalized_name: supplier for supplier in cls.objects.filter(normalized_name__in=wanted)}
+        return {
+            value: by_normalized[normalized]
+            for value, normalized in normalized_by_value.items()
+            if normalized in by_normalized
+        }
 
 
 class SupplierProduct(models.Model):
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Greatest
+
+from apps.catalog.models import SupplierProduct
+
+SEARCH_FIELDS = ("name", "supplier_sku", "supplier__name", "category")
+COMPLETION_DEFAULT_LIMIT = 20
+COMPLETION_MAX_LIMIT = 50
+
+_trigram_available: dict[tuple[str, str], bool] = {}
+
+
+def trigram_search_available(using: str = "default") -> bool:
+    """True when `using` is PostgreSQL with pg_trgm installed (see catalog migration 0004)."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    cache_key = (using, str(connection.settings_dict.get("NAME") or ""))
+    if cache_key not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[cache_key] = cursor.fetchone() is not None
+    return _trigram_available[cache_key]
+
+
+def search_supplier_products(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Products of `queryset` whose name, SKU, supplier name or category contains `query`, best first:
+    name prefix matches, then trigram word similarity on PostgreSQL, then name.
+
+    The icontains filters compile to UPPER(col::text) LIKE, which the pg_trgm GIN indexes serve.
+    """
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__icontains": query})
+    queryset = queryset.filter(condition).annotate(
+        search_prefix=Case(
+            When(name__istartswith=query, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+    if not trigram_search_available(queryset.db):
+        return queryset.order_by("-search_prefix", "name")
+
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    return queryset.annotate(
+        search_rank=Greatest(
+            TrigramWordSimilarity(query, "name"),
+            TrigramWordSimilarity(query, "supplier__name"),
+        )
+    ).order_by("-search_prefix", "-search_rank", "name")
+
+
+def complete_supplier_products(
+    query: str,
+    *,
+    limit: int = COMPLETION_DEFAULT_LIMIT,
+    active_only: bool = True,
+) -> list[dict]:
+    """Compact type-ahead rows for products whose name starts with `query`."""
+    queryset = SupplierProduct.objects.all()
+    if active_only:
+        queryset = queryset.filter(active=True)
+    if query:
+        queryset = queryset.filter(name__istartswith=query)
+    limit = max(1, min(int(limit), COMPLETION_MAX_LIMIT))
+    rows = queryset.order_by("name", "id").values("id", "name", "supplier_sku", "uom", "supplier__name")[:limit]
+    return [
+        {
+            "id": str(row["id"]),
+            "name": row["name"],
+            "supplier_name": row["supplier__name"],
+            "supplier_sku": row["supplier_sku"],
+            "uom": row["uom"],
+        }
+        for row in rows
+    ]
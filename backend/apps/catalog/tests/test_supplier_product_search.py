@@ -0,0 +1,62 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import Supplier, SupplierProduct
+from apps.core.models import Site
+
+
+class SupplierProductSearchApiTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.metro = Supplier.objects.create(name="Metro")
+        self.tomato_farm = Supplier.objects.create(name="Tomato Farm")
+        SupplierProduct.objects.create(supplier=self.metro, name="Pelati di pomodoro", uom="kg", category="conserve")
+        SupplierProduct.objects.create(supplier=self.metro, name="Tomates cerise", uom="kg", supplier_sku="TC-01")
+        SupplierProduct.objects.create(supplier=self.tomato_farm, name="Basilico", uom="pc")
+        SupplierProduct.objects.create(supplier=self.metro, name="Tomates grappe", uom="kg", active=False)
+
+    def test_catalog_search_matches_all_fields_with_prefix_matches_first(self):
+        response = self.client.get("/api/v1/supplier-products/", {"q": "tom", "active": "1"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [row["name"] for row in response.json()]
+        self.assertEqual(names[0], "Tomates cerise")
+        self.assertEqual(set(names), {"Tomates cerise", "Basilico"})
+
+        by_sku = self.client.get("/api/v1/supplier-products/", {"q": "tc-0"}).json()
+        by_category = self.client.get("/api/v1/supplier-products/", {"q": "CONSERVE"}).json()
+        self.assertEqual([row["name"] for row in by_sku], ["Tomates cerise"])
+        self.assertEqual([row["name"] for row in by_category], ["Pelati di pomodoro"])
+
+    def test_completion_returns_compact_prefix_rows(self):
+        response = self.client.get("/api/v1/supplier-products/complete/", {"q": "toma"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "id": str(SupplierProduct.objects.get(name="Tomates cerise").id),
+                    "name": "Tomates cerise",
+                    "supplier_name": "Metro",
+                    "supplier_sku": "TC-01",
+                    "uom": "kg",
+                }
+            ],
+        )
+
+        with_inactive = self.client.get("/api/v1/supplier-products/complete/", {"q": "toma", "active": "0"}).json()
+        limited = self.client.get("/api/v1/supplier-products/complete/", {"limit": "2"}).json()
+        self.assertEqual([row["name"] for row in with_inactive["results"]], ["Tomates cerise", "Tomates grappe"])
+        self.assertEqual([row["name"] for row in limited["results"]], ["Basilico", "Pelati di pomodoro"])
+
+    def test_inventory_product_search_ranks_name_prefix_first(self):
+        site = Site.objects.create(name="Search Site", code="SEARCH")
+
+        response = self.client.get("/api/v1/inventory/products/", {"site": str(site.id), "q": "tom"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["product_name"] for row in response.json()["results"]],
+            ["Tomates cerise", "Basilico"],
+        )
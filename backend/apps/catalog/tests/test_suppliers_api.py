@@ -39,6 +39,18 @@ class SupplierApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("name", response.json())
 
+    def test_update_of_legacy_colliding_supplier_returns_400(self):
+        Supplier.objects.create(name="ATSCASH")
+        # Pre-0005 duplicate: the migration left it without a normalized name.
+        (legacy,) = Supplier.objects.bulk_create([Supplier(name="ATS CASH", normalized_name=None)])
+
+        response = self.client.patch(f"/api/v1/suppliers/{legacy.id}/", {"vat_number": "IT0001"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("name", response.json()["field_errors"])
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.vat_number)
+
     def test_list_supplier_products_returns_200(self):
         supplier = Supplier.objects.create(name="Supplier A")
         SupplierProduct.objects.create(
@@ -94,3 +106,27 @@ class SupplierApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         product.refresh_from_db()
         self.assertEqual(product.category, "surgeles")
+
+    def test_supplier_keeps_normalized_name_in_sync(self):
+        supplier = Supplier.objects.create(name="Ats Cash")
+        self.assertEqual(supplier.normalized_name, "ATSCASH")
+
+        response = self.client.patch(f"/api/v1/suppliers/{supplier.id}/", {"name": "Métro S.p.A."}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        supplier.refresh_from_db()
+        self.assertEqual(supplier.normalized_name, "METROSPA")
+
+        supplier.name = "Ats Cash Carry"
+        supplier.save(update_fields=["name"])
+        supplier.refresh_from_db()
+        self.assertEqual(supplier.normalized_name, "ATSCASHCARRY")
+        self.assertEqual(Supplier.find_by_normalized_name("ats-cash carry"), supplier)
+
+    def test_resolve_by_normalized_names_uses_one_query(self):
+        metro = Supplier.objects.create(name="Metro")
+        promocash = Supplier.objects.create(name="Promo Cash")
+
+        with self.assertNumQueries(1):
+            resolved = Supplier.resolve_by_normalized_names(["METRO", "promo-cash", "Unknown", ""])
+
+        self.assertEqual(resolved, {"METRO": metro, "promo-cash": promocash})
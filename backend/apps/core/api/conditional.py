@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.catalog.models import Supplier, SupplierProduct
+
+
+def build_etag(request, *markers) -> str:
+    """Weak ETag over the request path, its query params and cheap change markers of the data behind it."""
+    material = json.dumps(
+        [request.path, sorted(request.query_params.lists()), markers],
+        default=str,
+        sort_keys=True,
+    )
+    return f'W/"{hashlib.sha256(material.encode("utf-8")).hexdigest()[:40]}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match") or ""
+    if not header:
+        return False
+    candidates = {item.strip() for item in header.split(",") if item.strip()}
+    if "*" in candidates:
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == bare for candidate in candidates)
+
+
+def not_modified_response(etag: str) -> Response:
+    return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response["ETag"] = etag
+    # Let clients keep the body but revalidate on every poll.
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def catalog_markers() -> dict:
+    markers = SupplierProduct.objects.aggregate(products=Count("id"), products_updated=Max("updated_at"))
+    markers["suppliers_updated"] = Supplier.objects.aggregate(updated=Max("updated_at"))["updated"]
+    return markers
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination on (<date field>, id).
+
+    The cursor carries the last row's sort values, so every page is one indexed range
+    scan whatever the depth, unlike OFFSET which re-reads every skipped row.
+    Paging is opt-in: requests without `limit` or `cursor` get the unpaginated list.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 50
+    max_limit = 500
+    ordering_field = "created_at"
+
+    def get_limit(self, request) -> int:
+        raw = (request.query_params.get(self.limit_query_param) or "").strip()
+        if not raw:
+            return self.default_limit
+        try:
+            limit = int(raw)
+        except ValueError as exc:
+            raise ValidationError({self.limit_query_param: "Must be an integer."}) from exc
+        if limit < 1:
+            raise ValidationError({self.limit_query_param: "Must be greater than 0."})
+        return min(limit, self.max_limit)
+
+    def encode_cursor(self, instance) -> str:
+        value = getattr(instance, self.ordering_field)
+        payload = json.dumps([value.isoformat(), str(instance.pk)])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, raw: str):
+        try:
+            padded = raw + "=" * (-len(raw) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            parsed = parse_datetime(value) if "T" in value else parse_date(value)
+            pk = str(uuid.UUID(str(pk)))
+        except (ValueError, TypeError, UnicodeDecodeError) as exc:
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."}) from exc
+        if not isinstance(parsed, (date, datetime)):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+        return parsed, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not any(request.query_params.get(param) for param in (self.cursor_query_param, self.limit_query_param)):
+            return None
+        self.request = request
+        self.ordering_field = getattr(view, "keyset_ordering_field", self.ordering_field)
+        limit = self.get_limit(request)
+        queryset = queryset.order_by(f"-{self.ordering_field}", "-id")
+        raw_cursor = (request.query_params.get(self.cursor_query_param) or "").strip()
+        if raw_cursor:
+            value, pk = self.decode_cursor(raw_cursor)
+            queryset = queryset.filter(
+                Q(**{f"{self.ordering_field}__lt": value}) | Q(**{self.ordering_field: value, "id__lt": pk})
+            )
+        rows = list(queryset[: limit + 1])
+        self.next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit]
+
+    def get_next_link(self) -> str | None:
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "next_cursor": self.next_cursor,
+                "results": data,
+            }
+        )
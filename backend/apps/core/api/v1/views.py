@@ -5,31 +5,42 @@ import re
 import unicodedata
 
 from django.db import transaction
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.catalog.models import SupplierProduct
+from apps.core.api.conditional import build_etag, catalog_markers, etag_matches, not_modified_response, with_etag
 from apps.core.api.v1.serializers import (
     ServiceMenuEntrySerializer,
     ServiceMenuEntrySyncSerializer,
     SiteSerializer,
     SiteWriteSerializer,
 )
-from apps.core.models import ServiceMenuEntry, Site
-from apps.core.services.service_ingredients import extract_ingredients, normalize_qty_unit
-from apps.integration.models import RecipeSnapshot
-
-PERMANENT_SERVICE_DATE = date(1900, 1, 1)
-SCHEDULE_PERMANENT = "permanent"
-SCHEDULE_DATE_SPECIFIC = "date_specific"
-SCHEDULE_RECURRING_WEEKLY = "recurring_weekly"
-SUPPORTED_SCHEDULE_MODES = {
-    SCHEDULE_PERMANENT,
+from apps.core.models import (
+    PERMANENT_SERVICE_DATE,
     SCHEDULE_DATE_SPECIFIC,
+    SCHEDULE_PERMANENT,
     SCHEDULE_RECURRING_WEEKLY,
-}
+    SUPPORTED_SCHEDULE_MODES,
+    ServiceMenuEntry,
+    Site,
+)
+from apps.core.services.service_ingredients import extract_ingredients, normalize_qty_unit
+from apps.core.services.service_menu import MAX_RANGE_DAYS, resolve_effective_entries
+from apps.integration.models import RecipeSnapshot, normalize_recipe_title
+
+# Per-day and per-placement forecast quantities are shares of a recipe's range total, rounded to this step.
+FORECAST_DAY_QTY_STEP = Decimal("0.001")
+
+
+def _service_menu_markers(site_id) -> list:
+    """Menu entries of the site plus the imported fiche snapshots they resolve against."""
+    entries = ServiceMenuEntry.objects.filter(site_id=site_id).aggregate(count=Count("id"), updated=Max("updated_at"))
+    snapshots = RecipeSnapshot.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    return [entries, snapshots]
 
 
 class HealthView(APIView):
@@ -76,45 +87,84 @@ class SiteDetailView(APIView):
 
 class ServiceMenuEntrySyncView(APIView):
     @staticmethod
-    def _resolve_recipe_category_for_entry(entry: ServiceMenuEntry) -> str:
-        if entry.fiche_product_id:
-            snap = (
-                RecipeSnapshot.objects.filter(fiche_product_id=entry.fiche_product_id)
-                .order_by("-source_updated_at", "-created_at")
-                .first()
-            )
-            if snap and snap.category:
-                return str(snap.category).strip()
-        title = (entry.title or "").strip()
-        if not title:
-            return ""
-        snap = RecipeSnapshot.objects.filter(title__iexact=title).order_by("-source_updated_at", "-created_at").first()
-        if snap and snap.category:
-            return str(snap.category).strip()
-        snap = RecipeSnapshot.objects.filter(title__icontains=title).order_by("-source_updated_at", "-created_at").first()
-        if snap and snap.category:
-            return str(snap.category).strip()
-        return ""
+    def _resolve_recipe_categories(entries: list[ServiceMenuEntry]) -> dict[int, str]:
+        """
+        Category of the current fiche snapshot for each entry (keyed by id(entry)): by fiche id, then exact
+        title, then title containment, in at most three queries for the whole list.
+        """
+        resolved: dict[int, str] = {}
+        current = RecipeSnapshot.objects.filter(is_current=True)
+
+        fiche_ids = {entry.fiche_product_id for entry in entries if entry.fiche_product_id}
+        category_by_fiche = (
+            dict(current.filter(fiche_product_id__in=fiche_ids).values_list("fiche_product_id", "category"))
+            if fiche_ids
+            else {}
+        )
+        pending_titles: dict[int, str] = {}
+        for entry in entries:
+            category = str(category_by_fiche.get(entry.fiche_product_id) or "").strip()
+            if category:
+                resolved[id(entry)] = category
+                continue
+            title = normalize_recipe_title(entry.title)
+            if title:
+                pending_titles[id(entry)] = title
+        if not pending_titles:
+            return resolved
+
+        # Same precedence as RecipeSnapshot.current_for_title: the latest current version wins.
+        by_title = current.filter(source_active=True).order_by(*RecipeSnapshot.LATEST_FIRST)
+        exact: dict[str, str] = {}
+        for normalized_title, category in by_title.filter(normalized_title__in=set(pending_titles.values())).values_list(
+            "normalized_title", "category"
+        ):
+            exact.setdefault(normalized_title, str(category or "").strip())
+        partial_titles = set()
+        for key, title in list(pending_titles.items()):
+            if exact.get(title):
+                resolved[key] = exact[title]
+                del pending_titles[key]
+            else:
+                partial_titles.add(title)
+        if not partial_titles:
+            return resolved
+
+        contains = Q()
+        for title in partial_titles:
+            contains |= Q(normalized_title__contains=title)
+        candidates = list(by_title.filter(contains).values_list("normalized_title", "category"))
+        for key, title in pending_titles.items():
+            category = next((category for candidate, category in candidates if title in candidate), None)
+            category = str(category or "").strip()
+            if category:
+                resolved[key] = category
+        return resolved
 
     @classmethod
     def _enrich_entries_recipe_category(cls, entries: list[ServiceMenuEntry]):
+        pending = []
         for entry in entries:
             metadata = entry.metadata if isinstance(entry.metadata, dict) else {}
             if metadata.get("item_kind") == "product":
                 continue
-            current = str(metadata.get("recipe_category") or "").strip()
-            if current:
+            if str(metadata.get("recipe_category") or "").strip():
                 continue
-            resolved = cls._resolve_recipe_category_for_entry(entry)
+            pending.append(entry)
+        if not pending:
+            return
+
+        resolved_by_entry = cls._resolve_recipe_categories(pending)
+        for entry in pending:
+            resolved = resolved_by_entry.get(id(entry))
             if not resolved:
                 continue
             try:
                 resolved = ServiceIngredientsView._canonicalize_category(resolved)
             except NameError:
                 pass
-            next_meta = dict(metadata)
-            next_meta["recipe_category"] = resolved
-            entry.metadata = next_meta
+            metadata = entry.metadata if isinstance(entry.metadata, dict) else {}
+            entry.metadata = {**metadata, "recipe_category": resolved}
 
     @staticmethod
     def _parse_iso_date(raw_value):
@@ -128,148 +178,12 @@ class ServiceMenuEntrySyncView(APIView):
             return None
 
     @staticmethod
-    def _normalize_weekdays(raw_value):
-        if raw_value is None:
-            return []
-        if isinstance(raw_value, (int, str)):
-            raw_items = [raw_value]
-        elif isinstance(raw_value, list):
-            raw_items = raw_value
-        else:
-            return []
-
-        aliases = {
-            "mon": 0,
-            "monday": 0,
-            "lun": 0,
-            "lunedì": 0,
-            "lunedi": 0,
-            "tue": 1,
-            "tuesday": 1,
-            "mar": 1,
-            "martedì": 1,
-            "martedi": 1,
-            "wed": 2,
-            "wednesday": 2,
-            "mer": 2,
-            "mercoledì": 2,
-            "mercoledi": 2,
-            "thu": 3,
-            "thursday": 3,
-            "gio": 3,
-            "giovedì": 3,
-            "giovedi": 3,
-            "fri": 4,
-            "friday": 4,
-            "ven": 4,
-            "venerdì": 4,
-            "venerdi": 4,
-            "sat": 5,
-            "saturday": 5,
-            "sab": 5,
-            "sun": 6,
-            "sunday": 6,
-            "dom": 6,
-            "domenica": 6,
-        }
-
-        normalized = set()
-        for item in raw_items:
-            if isinstance(item, int):
-                if 0 <= item <= 6:
-                    normalized.add(item)
-                elif 1 <= item <= 7:
-                    normalized.add(item - 1)
-                continue
-            raw = str(item).strip().lower()
-            if raw.isdigit():
-                value = int(raw)
-                if 0 <= value <= 6:
-                    normalized.add(value)
-                elif 1 <= value <= 7:
-                    normalized.add(value - 1)
-                continue
-            mapped = aliases.get(raw)
-            if mapped is not None:
-                normalized.add(mapped)
-        return sorted(normalized)
-
-    @classmethod
-    def _resolve_schedule_mode(cls, entry: ServiceMenuEntry):
-        metadata = entry.metadata if isinstance(entry.metadata, dict) else {}
-        schedule_mode = str(metadata.get("schedule_mode") or "").strip().lower()
-        if schedule_mode in SUPPORTED_SCHEDULE_MODES:
-            return schedule_mode
-        if entry.service_date == PERMANENT_SERVICE_DATE:
-            return SCHEDULE_PERMANENT
-        if entry.space_key.startswith("carta"):
-            return SCHEDULE_PERMANENT
-        return SCHEDULE_DATE_SPECIFIC
-
-    @classmethod
-    def _is_entry_applicable_for_date(cls, entry: ServiceMenuEntry, target_date: date):
-        metadata = entry.metadata if isinstance(entry.metadata, dict) else {}
-        schedule_mode = cls._resolve_schedule_mode(entry)
-        valid_from = cls._parse_iso_date(metadata.get("valid_from"))
-        valid_to = cls._parse_iso_date(metadata.get("valid_to"))
-
-        if valid_from and target_date < valid_from:
-            return False
-        if valid_to and target_date > valid_to:
-            return False
-
-        if schedule_mode == SCHEDULE_RECURRING_WEEKLY:
-            weekdays = cls._normalize_weekdays(metadata.get("weekdays"))
-            if weekdays and target_date.weekday() not in weekdays:
-                return False
-            return True
-        if schedule_mode == SCHEDULE_PERMANENT:
-            return True
-        return entry.service_date == target_date
-
-    @classmethod
-    def _get_effective_entries(cls, site_id, target_date: date):
-        dated_entries = list(
-            ServiceMenuEntry.objects.filter(site_id=site_id, service_date=target_date, is_active=True).order_by(
-                "space_key", "sort_order", "title"
-            )
-        )
-        permanent_entries = list(
-            ServiceMenuEntry.objects.filter(site_id=site_id, service_date=PERMANENT_SERVICE_DATE, is_active=True).order_by(
-                "space_key", "sort_order", "title"
-            )
-        )
-        legacy_card_entries: list[ServiceMenuEntry] = []
-        if not permanent_entries:
-            latest_legacy_date = (
-                ServiceMenuEntry.objects.filter(site_id=site_id, is_active=True, space_key__startswith="carta")
-                .exclude(service_date=PERMANENT_SERVICE_DATE)
-                .order_by("-service_date")
-                .values_list("service_date", flat=True)
-                .first()
-            )
-            if latest_legacy_date:
-                legacy_card_entries = list(
-                    ServiceMenuEntry.objects.filter(
-                        site_id=site_id,
-                        service_date=latest_legacy_date,
-                        is_active=True,
-                        space_key__startswith="carta",
-                    ).order_by("space_key", "sort_order", "title")
-                )
+    def _is_entry_applicable_for_date(entry: ServiceMenuEntry, target_date: date):
+        return entry.applies_on(target_date)
 
-        deduped: dict[tuple[str, str, str, str], ServiceMenuEntry] = {}
-        for entry in permanent_entries + legacy_card_entries + dated_entries:
-            if cls._is_entry_applicable_for_date(entry, target_date):
-                key = (
-                    (entry.space_key or "").strip().lower(),
-                    (entry.section or "").strip().lower(),
-                    (entry.title or "").strip().lower(),
-                    str(entry.fiche_product_id or "").strip().lower(),
-                )
-                # Iteration order keeps dated entries last, so they override permanent/legacy duplicates.
-                deduped[key] = entry
-        return list(deduped.values())
+    @staticmethod
+    def _get_effective_entries(site_id, target_date: date):
+        return resolve_effective_entries(site_id, target_date)[target_date]
 
     def get(self, request):
         site_id = request.query_params.get("site")
@@ -280,10 +194,42 @@ class ServiceMenuEntrySyncView(APIView):
         parsed_service_date = self._parse_iso_date(service_date)
         if not parsed_service_date:
             return Response({"detail": "Query param 'date' must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        etag = build_etag(request, *_service_menu_markers(site_id))
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        date_to = request.query_params.get("date_to")
+        if date_to:
+            parsed_date_to = self._parse_iso_date(date_to)
+            if not parsed_date_to or parsed_date_to < parsed_service_date:
+                return Response(
+                    {"detail": "Query param 'date_to' must be YYYY-MM-DD, not before 'date'."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if (parsed_date_to - parsed_service_date).days >= MAX_RANGE_DAYS:
+                return Response(
+                    {"detail": f"Date range is limited to {MAX_RANGE_DAYS} days."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            entries_by_day = resolve_effective_entries(site_id, parsed_service_date, parsed_date_to)
+            unique_entries = {entry.pk: entry for entries in entries_by_day.values() for entry in entries}
+            self._enrich_entries_recipe_category(list(unique_entries.values()))
+            days = [
+                {
+                    "date": day.isoformat(),
+                    "count": len(entries),
+                    "entries": ServiceMenuEntrySerializer(entries, many=True).data,
+                }
+                for day, entries in entries_by_day.items()
+            ]
+            return with_etag(Response({"days": days}), etag)
 
         effective_entries = self._get_effective_entries(site_id, parsed_service_date)
         self._enrich_entries_recipe_category(effective_entries)
-        return Response({"count": len(effective_entries), "entries": ServiceMenuEntrySerializer(effective_entries, many=True).data})
+        return with_etag(
+            Response({"count": len(effective_entries), "entries": ServiceMenuEntrySerializer(effective_entries, many=True).data}),
+            etag,
+        )
 
     @transaction.atomic
     def post(self, request):
@@ -343,6 +289,10 @@ class ServiceMenuEntrySyncView(APIView):
             for item in dated_entries_payload
         ]
 
+        # Stored with the entries so later reads only resolve rows synced before categories were persisted.
+        self._enrich_entries_recipe_category(permanent_instances + dated_instances)
+        for instance in (*permanent_instances, *dated_instances):
+            instance.sync_schedule_columns()
         if permanent_instances:
             ServiceMenuEntry.objects.bulk_create(permanent_instances)
         if dated_instances:
@@ -395,28 +345,26 @@ class ServiceIngredientsView(APIView):
     @staticmethod
     def _resolve_snapshot_for_entry(entry: ServiceMenuEntry):
         if entry.fiche_product_id:
-            snapshot = (
-                RecipeSnapshot.objects.filter(fiche_product_id=entry.fiche_product_id)
-                .order_by("-source_updated_at", "-created_at")
-                .first()
-            )
+            snapshot = RecipeSnapshot.current_for_fiche(entry.fiche_product_id)
             if snapshot:
                 return snapshot
 
         title = (entry.title or "").strip()
         if not title:
             return None
-        snapshot = RecipeSnapshot.objects.filter(title__iexact=title).order_by("-source_updated_at", "-created_at").first()
-        if snapshot:
-            return snapshot
-        return RecipeSnapshot.objects.filter(title__icontains=title).order_by("-source_updated_at", "-created_at").first()
+        return RecipeSnapshot.current_for_title(title) or RecipeSnapshot.current_for_title(title, partial=True)
 
     @staticmethod
     def _resolve_snapshot_for_ingredient_title(title: str):
-        cleaned = (title or "").strip()
-        if not cleaned:
-            return None
-        return RecipeSnapshot.objects.filter(title__iexact=cleaned).order_by("-source_updated_at", "-created_at").first()
+        return RecipeSnapshot.current_for_title(title)
+
+    def _nested_snapshot(self, title: str):
+        # Memoized per request: the same internal preparations recur across recipes and days.
+        cache = self.__dict__.setdefault("_nested_snapshot_cache", {})
+        key = normalize_recipe_title(title)
+        if key not in cache:
+            cache[key] = self._resolve_snapshot_for_ingredient_title(title)
+        return cache[key]
 
     @staticmethod
     def _parse_iso_date(raw_value):
@@ -542,7 +490,7 @@ class ServiceIngredientsView(APIView):
         derived_from_recipe: str | None = None,
         derived_from_category: str | None = None,
     ):
-        ingredients = extract_ingredients(snapshot.payload or {})
+        ingredients = extract_ingredients(snapshot.full_payload)
         if not ingredients:
             return []
 
@@ -558,7 +506,7 @@ class ServiceIngredientsView(APIView):
             supplier = ing.get("supplier") or "Senza fornitore"
             supplier_code = (ing.get("supplier_code") or "").strip()
 
-            nested_snapshot = self._resolve_snapshot_for_ingredient_title(ingredient_name)
+            nested_snapshot = self._nested_snapshot(ingredient_name)
             nested_key = ""
             if nested_snapshot:
                 nested_key = str(nested_snapshot.fiche_product_id).lower()
@@ -604,7 +552,8 @@ class ServiceIngredientsView(APIView):
                     derived_from_category or self._canonicalize_category(self._extract_snapshot_category(nested_snapshot)),
                 )
                 if nested_items:
-                    expanded.extend(nested_items)
+                    # Not proportional to the planned portions: one portion per menu placement and day.
+                    expanded.extend({**item, "per_placement": True} for item in nested_items)
                     continue
 
             qty_normalized, unit_normalized = normalize_qty_unit(qty_total, ing.get("unit"))
@@ -633,10 +582,32 @@ class ServiceIngredientsView(APIView):
         parsed_service_date = self._parse_iso_date(service_date)
         if not parsed_service_date:
             return Response({"detail": "Query param 'date' must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+        parsed_date_to = None
+        date_to = request.query_params.get("date_to")
+        if date_to:
+            parsed_date_to = self._parse_iso_date(date_to)
+            if not parsed_date_to or parsed_date_to < parsed_service_date:
+                return Response(
+                    {"detail": "Query param 'date_to' must be YYYY-MM-DD, not before 'date'."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if (parsed_date_to - parsed_service_date).days >= MAX_RANGE_DAYS:
+                return Response(
+                    {"detail": f"Date range is limited to {MAX_RANGE_DAYS} days."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        etag = build_etag(request, *_service_menu_markers(site_id), catalog_markers())
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+        if parsed_date_to:
+            return with_etag(Response(self._forecast(site_id, parsed_service_date, parsed_date_to, view_mode)), etag)
 
         entries = ServiceMenuEntrySyncView._get_effective_entries(site_id, parsed_service_date)
         if not entries:
-            return Response({"rows": [], "warnings": ["Nessuna voce menu attiva per data/sede selezionata."]})
+            return with_etag(
+                Response({"rows": [], "warnings": ["Nessuna voce menu attiva per data/sede selezionata."]}),
+                etag,
+            )
 
         warnings: list[str] = []
 
@@ -701,14 +672,172 @@ class ServiceIngredientsView(APIView):
             )
 
         if view_mode == "recipe":
-            return Response({"view": "recipe", "rows": recipe_rows, "warnings": warnings})
+            return with_etag(Response({"view": "recipe", "rows": recipe_rows, "warnings": warnings}), etag)
+
+        supplier_rows = self._supplier_rows(supplier_agg)
+        return with_etag(Response({"view": "supplier", "rows": supplier_rows, "warnings": warnings}), etag)
+
+    def _forecast(self, site_id, start: date, end: date, view_mode: str) -> dict:
+        """
+        Ingredient needs over several service days. Planned portions are summed per resolved recipe across
+        all days, each recipe is expanded once, and per-day quantities are its share of those portions.
+        """
+        entries_by_day = resolve_effective_entries(site_id, start, end)
+        warnings: list[str] = []
+        snapshot_by_entry: dict = {}
+        plans: dict = {}
+        for day, entries in entries_by_day.items():
+            for entry in entries:
+                if entry.pk not in snapshot_by_entry:
+                    snapshot_by_entry[entry.pk] = self._resolve_snapshot_for_entry(entry)
+                snapshot = snapshot_by_entry[entry.pk]
+                if not snapshot:
+                    warnings.append(f"'{entry.title}': nessuna fiche importata trovata (uuid/titolo).")
+                    continue
+                planned_portions = entry.expected_qty or Decimal("0")
+                if planned_portions <= 0:
+                    warnings.append(f"'{entry.title}': porzioni target non valorizzate (> 0).")
+                    continue
+                plan = plans.setdefault(
+                    snapshot.pk,
+                    {
+                        "snapshot": snapshot,
+                        "portions_by_day": defaultdict(lambda: Decimal("0")),
+                        "groups": {},
+                    },
+                )
+                plan["portions_by_day"][day] += planned_portions
+                group = plan["groups"].setdefault(
+                    (entry.space_key, entry.section, entry.title),
+                    {"entry": entry, "portions_by_day": defaultdict(lambda: Decimal("0"))},
+                )
+                group["portions_by_day"][day] += planned_portions
+
+        expanded_by_plan: dict = {}
+        for key, plan in plans.items():
+            # Placements of the recipe per day: the unit of the one-portion fallback for preparations without qty.
+            plan["placements_by_day"] = defaultdict(int)
+            for group in plan["groups"].values():
+                for day in group["portions_by_day"]:
+                    plan["placements_by_day"][day] += 1
+            snapshot = plan["snapshot"]
+            total_portions = sum(plan["portions_by_day"].values())
+            recipe_portions = snapshot.portions if snapshot.portions and snapshot.portions > 0 else None
+            multiplier = total_portions / recipe_portions if recipe_portions else total_portions
+            root_key = str(snapshot.fiche_product_id).lower() if snapshot.fiche_product_id else ""
+            visited = {root_key} if root_key else set()
+            expanded = self._expand_snapshot_ingredients(snapshot, multiplier, warnings, visited, 0)
+            if not expanded:
+                warnings.append(f"'{snapshot.title}': nessun ingrediente nel payload fiche.")
+                continue
+            expanded_by_plan[key] = (expanded, total_portions)
 
-        supplier_rows = [
+        code_lookup = self._build_supplier_code_lookup(
+            [ing for expanded, _total in expanded_by_plan.values() for ing in expanded]
+        )
+        supplier_agg: dict[tuple[str, str, str, str, str, str], Decimal] = defaultdict(lambda: Decimal("0"))
+        supplier_by_day: dict[date, dict] = {day: defaultdict(lambda: Decimal("0")) for day in entries_by_day}
+        recipe_rows: list[dict] = []
+        for key, (expanded, total_portions) in expanded_by_plan.items():
+            plan = plans[key]
+            snapshot = plan["snapshot"]
+            resolved_ingredients = []
+            for ing in expanded:
+                supplier = ing["supplier"] or "Senza fornitore"
+                supplier_code = self._resolve_supplier_code(ing, code_lookup)
+                source_type = ing.get("source_type") or "direct"
+                source_recipe_title = ing.get("source_recipe_title") or ""
+                row_key = (supplier, ing["ingredient"], supplier_code, ing["unit"], source_type, source_recipe_title)
+                per_placement = bool(ing.get("per_placement"))
+                if per_placement:
+                    for day, placements in plan["placements_by_day"].items():
+                        supplier_agg[row_key] += ing["qty_total"] * placements
+                        supplier_by_day[day][row_key] += ing["qty_total"] * placements
+                else:
+                    supplier_agg[row_key] += ing["qty_total"]
+                    for day, portions in plan["portions_by_day"].items():
+                        supplier_by_day[day][row_key] += ing["qty_total"] * portions / total_portions
+                resolved_ingredients.append(
+                    (
+                        ing["qty_total"],
+                        per_placement,
+                        {
+                            "ingredient": ing["ingredient"],
+                            "supplier": supplier,
+                            "supplier_code": supplier_code,
+                            "unit": ing["unit"],
+                            "source_type": source_type,
+                            "source_recipe_title": source_recipe_title or None,
+                            "source_recipe_category": ing.get("source_recipe_category") or None,
+                        },
+                    )
+                )
+
+            recipe_portions = snapshot.portions if snapshot.portions and snapshot.portions > 0 else None
+            recipe_category = self._canonicalize_category(self._extract_snapshot_category(snapshot))
+            # One row per menu placement of the recipe, with its share of the single expansion.
+            for group in plan["groups"].values():
+                entry = group["entry"]
+                group_portions = sum(group["portions_by_day"].values())
+                recipe_rows.append(
+                    {
+                        "space": entry.space_key,
+                        "section": entry.section,
+                        "recipe_category": recipe_category or entry.section,
+                        "title": entry.title,
+                        "expected_qty": str(group_portions),
+                        "expected_qty_by_day": {
+                            day.isoformat(): str(portions) for day, portions in sorted(group["portions_by_day"].items())
+                        },
+                        "recipe_portions": str(recipe_portions) if recipe_portions else None,
+                        "ingredients": [
+                            {
+                                **ingredient_row,
+                                "qty_total": str(
+                                    qty_total * len(group["portions_by_day"])
+                                    if per_placement
+                                    else self._share(qty_total, group_portions, total_portions)
+                                ),
+                            }
+                            for qty_total, per_placement, ingredient_row in resolved_ingredients
+                        ],
+                    }
+                )
+
+        warnings = list(dict.fromkeys(warnings))
+        if not any(entries_by_day.values()):
+            warnings.append("Nessuna voce menu attiva per data/sede selezionata.")
+        result = {
+            "view": "recipe" if view_mode == "recipe" else "supplier",
+            "date": start.isoformat(),
+            "date_to": end.isoformat(),
+        }
+        if view_mode == "recipe":
+            return {**result, "rows": recipe_rows, "warnings": warnings}
+        return {
+            **result,
+            "rows": self._supplier_rows(supplier_agg),
+            "days": [
+                {"date": day.isoformat(), "rows": self._supplier_rows(rows, quantize=FORECAST_DAY_QTY_STEP)}
+                for day, rows in supplier_by_day.items()
+            ],
+            "warnings": warnings,
+        }
+
+    @staticmethod
+    def _share(qty: Decimal, part: Decimal, whole: Decimal) -> Decimal:
+        if part == whole:
+            return qty
+        return (qty * part / whole).quantize(FORECAST_DAY_QTY_STEP)
+
+    @staticmethod
+    def _supplier_rows(supplier_agg: dict, quantize: Decimal | None = None) -> list[dict]:
+        return [
             {
                 "supplier": supplier,
                 "ingredient": ingredient,
                 "supplier_code": supplier_code or None,
-                "qty_total": str(total),
+                "qty_total": str(total.quantize(quantize) if quantize else total),
                 "unit": unit,
                 "source_type": source_type,
                 "source_recipe_title": source_recipe_title or None,
@@ -718,4 +847,3 @@ class ServiceIngredientsView(APIView):
                 key=lambda item: (item[0][0], item[0][1], item[0][2], item[0][4], item[0][5]),
             )
         ]
-        return Response({"view": "supplier", "rows": supplier_rows, "warnings": warnings})
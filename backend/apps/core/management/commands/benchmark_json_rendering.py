@@ -0,0 +1,93 @@
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.api.renderers import FastJSONRenderer, orjson
+from apps.integration.import_batches import normalize_payload
+
+
+def _stock_summary_payload(rows: int) -> dict:
+    """Same shape as InventoryStockSummaryView output, with Decimal strings and ISO datetimes."""
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    results = []
+    for index in range(rows):
+        current = Decimal(index % 97) + Decimal("0.125")
+        results.append(
+            {
+                "product_key": f"SKU-{index:06d}",
+                "product_label": f"SKU-{index:06d}",
+                "product_name": f"Prodotto {index} - crème fraîche 35%",
+                "supplier_code": f"{index:07d}",
+                "supplier_name": f"Fornitore {index % 40}",
+                "product_category": "bof",
+                "qty_unit": "kg",
+                "total_in": f"{current + 10:.3f}",
+                "total_out": f"{Decimal(10):.3f}",
+                "in_from_docs": f"{current + 10:.3f}",
+                "in_from_invoice_fallback": f"{Decimal(0):.3f}",
+                "out_from_inventory": f"{Decimal(4):.3f}",
+                "out_other": f"{Decimal(6):.3f}",
+                "current_stock": f"{current:.3f}",
+                "weighted_avg_cost": f"{Decimal('3.4567'):.4f}",
+                "stock_value": f"{current * Decimal('3.4567'):.2f}",
+                "last_movement_at": (started + timedelta(minutes=index)).isoformat().replace("+00:00", "Z"),
+            }
+        )
+    return {"results": results, "count": len(results)}
+
+
+def _batch_payload(rows: int) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "received_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "lines": [
+            {"qty_value": Decimal("1.250"), "unit_price": Decimal("3.4000"), "raw_product_name": f"Riga {index}"}
+            for index in range(rows)
+        ],
+    }
+
+
+def _best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark del rendering JSON (stock summary sintetico) e di normalize_payload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = max(1, int(options["rows"]))
+        repeat = max(1, int(options["repeat"]))
+        summary = _stock_summary_payload(rows)
+        batch = _batch_payload(rows)
+        stock_renderer = JSONRenderer()
+        fast_renderer = FastJSONRenderer()
+
+        if stock_renderer.render(summary) != fast_renderer.render(summary):
+            self.stderr.write(self.style.WARNING("FastJSONRenderer output differs from JSONRenderer."))
+
+        measurements = [
+            ("render stock summary: JSONRenderer", _best_of(lambda: stock_renderer.render(summary), repeat)),
+            ("render stock summary: FastJSONRenderer", _best_of(lambda: fast_renderer.render(summary), repeat)),
+            (
+                "normalize batch: json round-trip",
+                _best_of(lambda: json.loads(json.dumps(batch, default=str)), repeat),
+            ),
+            ("normalize batch: normalize_payload", _best_of(lambda: normalize_payload(batch), repeat)),
+        ]
+        self.stdout.write(f"rows={rows} repeat={repeat} orjson={'yes' if orjson else 'no'}")
+        for label, elapsed_ms in measurements:
+            self.stdout.write(f"{label:<42} {elapsed_ms:8.1f} ms")
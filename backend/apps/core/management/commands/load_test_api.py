@@ -0,0 +1,71 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _timed_get(url: str, api_key: str, timeout: float) -> tuple[float, int]:
+    request = urllib.request.Request(url, headers={"X-API-Key": api_key})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status_code = response.status
+    except urllib.error.HTTPError as exc:
+        status_code = exc.code
+    except (urllib.error.URLError, OSError):
+        status_code = 0
+    return time.perf_counter() - started, status_code
+
+
+class Command(BaseCommand):
+    help = (
+        "Carico HTTP concorrente su un server CookOps in esecuzione: req/s e latenze. "
+        "Lanciarlo con il server avviato in DB_CONNECTION_MODE=none e poi persistent/pool per confrontare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--path",
+            action="append",
+            default=[],
+            help="Endpoint da chiamare (ripetibile). Default: /api/v1/sites/",
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Richieste totali.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--timeout", type=float, default=10.0)
+        parser.add_argument("--api-key", default="", help="Default: prima chiave di COOKOPS_API_KEYS.")
+
+    def handle(self, *args, **options):
+        total = max(1, int(options["requests"]))
+        concurrency = max(1, int(options["concurrency"]))
+        api_key = options["api_key"] or (settings.COOKOPS_API_KEYS[0] if settings.COOKOPS_API_KEYS else "")
+        base_url = str(options["base_url"]).rstrip("/")
+        paths = options["path"] or ["/api/v1/sites/"]
+        urls = [f"{base_url}/{paths[index % len(paths)].lstrip('/')}" for index in range(total)]
+
+        # One warm-up request so server start-up is not part of the measurement.
+        _elapsed, warmup_status = _timed_get(urls[0], api_key, options["timeout"])
+        if warmup_status == 0:
+            raise CommandError(f"Server not reachable at {base_url}.")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda url: _timed_get(url, api_key, options["timeout"]), urls))
+        wall = time.perf_counter() - started
+
+        latencies = sorted(elapsed * 1000 for elapsed, _status in results)
+        errors = sum(1 for _elapsed, status_code in results if not 200 <= status_code < 400)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(f"requests={total} concurrency={concurrency} errors={errors}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total / wall:.1f} req/s  p50={statistics.median(latencies):.1f}ms  "
+                f"p95={p95:.1f}ms  max={latencies[-1]:.1f}ms"
+            )
+        )
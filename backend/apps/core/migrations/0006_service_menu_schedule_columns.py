@@ -0,0 +1,103 @@
+from datetime import date
+
+from django.db import migrations, models
+
+# Frozen copies of the schedule helpers in apps.core.models.
+PERMANENT_SERVICE_DATE = date(1900, 1, 1)
+SUPPORTED_SCHEDULE_MODES = {"permanent", "date_specific", "recurring_weekly"}
+WEEKDAY_ALIASES = {
+    **dict.fromkeys(("mon", "monday", "lun", "lunedì", "lunedi"), 0),
+    **dict.fromkeys(("tue", "tuesday", "mar", "martedì", "martedi"), 1),
+    **dict.fromkeys(("wed", "wednesday", "mer", "mercoledì", "mercoledi"), 2),
+    **dict.fromkeys(("thu", "thursday", "gio", "giovedì", "giovedi"), 3),
+    **dict.fromkeys(("fri", "friday", "ven", "venerdì", "venerdi"), 4),
+    **dict.fromkeys(("sat", "saturday", "sab"), 5),
+    **dict.fromkeys(("sun", "sunday", "dom", "domenica"), 6),
+}
+
+
+def _weekday(item):
+    if isinstance(item, int) or str(item).strip().isdigit():
+        value = int(item) if isinstance(item, int) else int(str(item).strip())
+        if 0 <= value <= 6:
+            return value
+        if 1 <= value <= 7:
+            return value - 1
+        return None
+    return WEEKDAY_ALIASES.get(str(item).strip().lower())
+
+
+def _weekdays_mask(raw_value):
+    if isinstance(raw_value, (int, str)):
+        raw_items = [raw_value]
+    elif isinstance(raw_value, list):
+        raw_items = raw_value
+    else:
+        return 0
+    days = {_weekday(item) for item in raw_items} - {None}
+    return sum(1 << day for day in days)
+
+
+def _parse_iso_date(raw_value):
+    if not raw_value:
+        return None
+    try:
+        return date.fromisoformat(str(raw_value))
+    except ValueError:
+        return None
+
+
+def fill_schedule_columns(apps, schema_editor):
+    ServiceMenuEntry = apps.get_model("core", "ServiceMenuEntry")
+    pending = []
+    for entry in ServiceMenuEntry.objects.only("id", "service_date", "space_key", "metadata").iterator(chunk_size=2000):
+        metadata = entry.metadata if isinstance(entry.metadata, dict) else {}
+        schedule_mode = str(metadata.get("schedule_mode") or "").strip().lower()
+        if schedule_mode not in SUPPORTED_SCHEDULE_MODES:
+            if entry.service_date == PERMANENT_SERVICE_DATE or (entry.space_key or "").startswith("carta"):
+                schedule_mode = "permanent"
+            else:
+                schedule_mode = "date_specific"
+        entry.schedule_mode = schedule_mode
+        entry.weekdays_mask = _weekdays_mask(metadata.get("weekdays"))
+        entry.valid_from = _parse_iso_date(metadata.get("valid_from"))
+        entry.valid_to = _parse_iso_date(metadata.get("valid_to"))
+        pending.append(entry)
+        if len(pending) >= 500:
+            ServiceMenuEntry.objects.bulk_update(pending, ["schedule_mode", "weekdays_mask", "valid_from", "valid_to"])
+            pending = []
+    ServiceMenuEntry.objects.bulk_update(pending, ["schedule_mode", "weekdays_mask", "valid_from", "valid_to"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_alter_servicemenuentry_expected_qty"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicemenuentry",
+            name="schedule_mode",
+            field=models.CharField(default="date_specific", editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="servicemenuentry",
+            name="valid_from",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="servicemenuentry",
+            name="valid_to",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="servicemenuentry",
+            name="weekdays_mask",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_schedule_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="servicemenuentry",
+            index=models.Index(fields=["site", "schedule_mode", "weekdays_mask"], name="idx_core_srv_site_schedule"),
+        ),
+    ]
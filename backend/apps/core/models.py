@@ -1,7 +1,97 @@
 ﻿import uuid
+from datetime import date
 
 from django.db import models
 
+# Entries without a real service date (card items, weekly recurrences) are stored on this date.
+PERMANENT_SERVICE_DATE = date(1900, 1, 1)
+SCHEDULE_PERMANENT = "permanent"
+SCHEDULE_DATE_SPECIFIC = "date_specific"
+SCHEDULE_RECURRING_WEEKLY = "recurring_weekly"
+SUPPORTED_SCHEDULE_MODES = {
+    SCHEDULE_PERMANENT,
+    SCHEDULE_DATE_SPECIFIC,
+    SCHEDULE_RECURRING_WEEKLY,
+}
+WEEKDAY_ALIASES = {
+    "mon": 0,
+    "monday": 0,
+    "lun": 0,
+    "lunedì": 0,
+    "lunedi": 0,
+    "tue": 1,
+    "tuesday": 1,
+    "mar": 1,
+    "martedì": 1,
+    "martedi": 1,
+    "wed": 2,
+    "wednesday": 2,
+    "mer": 2,
+    "mercoledì": 2,
+    "mercoledi": 2,
+    "thu": 3,
+    "thursday": 3,
+    "gio": 3,
+    "giovedì": 3,
+    "giovedi": 3,
+    "fri": 4,
+    "friday": 4,
+    "ven": 4,
+    "venerdì": 4,
+    "venerdi": 4,
+    "sat": 5,
+    "saturday": 5,
+    "sab": 5,
+    "sun": 6,
+    "sunday": 6,
+    "dom": 6,
+    "domenica": 6,
+}
+
+
+def normalize_weekdays(raw_value) -> list[int]:
+    """Monday=0 weekday numbers from ints (0-6 or 1-7), digit strings or IT/EN/FR-ish day names."""
+    if raw_value is None:
+        return []
+    if isinstance(raw_value, (int, str)):
+        raw_items = [raw_value]
+    elif isinstance(raw_value, list):
+        raw_items = raw_value
+    else:
+        return []
+
+    normalized = set()
+    for item in raw_items:
+        if isinstance(item, int):
+            if 0 <= item <= 6:
+                normalized.add(item)
+            elif 1 <= item <= 7:
+                normalized.add(item - 1)
+            continue
+        raw = str(item).strip().lower()
+        if raw.isdigit():
+            value = int(raw)
+            if 0 <= value <= 6:
+                normalized.add(value)
+            elif 1 <= value <= 7:
+                normalized.add(value - 1)
+            continue
+        mapped = WEEKDAY_ALIASES.get(raw)
+        if mapped is not None:
+            normalized.add(mapped)
+    return sorted(normalized)
+
+
+def _parse_iso_date(raw_value):
+    if not raw_value:
+        return None
+    if isinstance(raw_value, date):
+        return raw_value
+    try:
+        return date.fromisoformat(str(raw_value))
+    except ValueError:
+        return None
+
 
 class Site(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -31,6 +121,12 @@ class ServiceMenuEntry(models.Model):
     sort_order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     metadata = models.JSONField(default=dict, blank=True)
+    # Schedule columns derived from metadata/service_date by sync_schedule_columns(), so menu resolution
+    # can filter in SQL. weekdays_mask has bit n set for weekday n (Monday=0); 0 means every day.
+    schedule_mode = models.CharField(max_length=32, default=SCHEDULE_DATE_SPECIFIC, editable=False)
+    weekdays_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    valid_from = models.DateField(blank=True, null=True, editable=False)
+    valid_to = models.DateField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -40,7 +136,40 @@ class ServiceMenuEntry(models.Model):
         indexes = [
             models.Index(fields=["site", "service_date"], name="idx_core_srv_site_date"),
             models.Index(fields=["fiche_product_id"], name="idx_core_srv_fiche"),
+            models.Index(fields=["site", "schedule_mode", "weekdays_mask"], name="idx_core_srv_site_schedule"),
         ]
 
     def __str__(self) -> str:
         return f"{self.service_date} {self.space_key} - {self.title}"
+
+    def save(self, *args, **kwargs):
+        self.sync_schedule_columns()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"metadata", "service_date", "space_key"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "schedule_mode", "weekdays_mask", "valid_from", "valid_to"}
+        super().save(*args, **kwargs)
+
+    def sync_schedule_columns(self) -> None:
+        """Refresh the schedule columns from metadata; bulk writers must call it since bulk_create skips save()."""
+        metadata = self.metadata if isinstance(self.metadata, dict) else {}
+        schedule_mode = str(metadata.get("schedule_mode") or "").strip().lower()
+        if schedule_mode not in SUPPORTED_SCHEDULE_MODES:
+            if self.service_date == PERMANENT_SERVICE_DATE or (self.space_key or "").startswith("carta"):
+                schedule_mode = SCHEDULE_PERMANENT
+            else:
+                schedule_mode = SCHEDULE_DATE_SPECIFIC
+        self.schedule_mode = schedule_mode
+        self.weekdays_mask = sum(1 << day for day in normalize_weekdays(metadata.get("weekdays")))
+        self.valid_from = _parse_iso_date(metadata.get("valid_from"))
+        self.valid_to = _parse_iso_date(metadata.get("valid_to"))
+
+    def applies_on(self, target_date: date) -> bool:
+        if self.valid_from and target_date < self.valid_from:
+            return False
+        if self.valid_to and target_date > self.valid_to:
+            return False
+        if self.schedule_mode == SCHEDULE_RECURRING_WEEKLY:
+            return not self.weekdays_mask or bool(self.weekdays_mask & (1 << target_date.weekday()))
+        if self.schedule_mode == SCHEDULE_PERMANENT:
+            return True
+        return self.service_date == target_date
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from django.db import connections
+
+
+def release_thread_connections() -> None:
+    """
+    Give back this thread's database connections before it goes idle.
+
+    With DB_CONNECTION_MODE=pool, close() returns the connection to the pool; otherwise it
+    ends the session, so a sleeping background thread never pins a server connection.
+    Connections inside an open transaction (e.g. a test case) are left alone.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
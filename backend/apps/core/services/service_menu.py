@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db.models import Exists, F, Q, Subquery
+
+from apps.core.models import PERMANENT_SERVICE_DATE, SCHEDULE_RECURRING_WEEKLY, ServiceMenuEntry
+
+MAX_RANGE_DAYS = 31
+
+
+def _dedupe_key(entry: ServiceMenuEntry) -> tuple[str, str, str, str]:
+    return (
+        (entry.space_key or "").strip().lower(),
+        (entry.section or "").strip().lower(),
+        (entry.title or "").strip().lower(),
+        str(entry.fiche_product_id or "").strip().lower(),
+    )
+
+
+def resolve_effective_entries(site_id, start: date, end: date | None = None) -> dict[date, list[ServiceMenuEntry]]:
+    """
+    Effective menu of every day in [start, end]. Permanent and weekly entries apply first; for sites without
+    any, the latest dated "carta" menu stands in. Entries dated that day override both. All candidates are
+    read in one query; only per-day applicability runs in Python, on the schedule columns.
+    """
+    end = end or start
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    day_bits = 0
+    for day in days[:7]:
+        day_bits |= 1 << day.weekday()
+
+    active = ServiceMenuEntry.objects.filter(site_id=site_id, is_active=True)
+    latest_legacy_date = Subquery(
+        active.filter(space_key__startswith="carta")
+        .exclude(service_date=PERMANENT_SERVICE_DATE)
+        .order_by("-service_date")
+        .values("service_date")[:1]
+    )
+    candidates = (
+        active.filter(
+            Q(service_date__range=(start, end))
+            | Q(service_date=PERMANENT_SERVICE_DATE)
+            | Q(space_key__startswith="carta", service_date=latest_legacy_date)
+        )
+        .filter(Q(valid_from__isnull=True) | Q(valid_from__lte=end), Q(valid_to__isnull=True) | Q(valid_to__gte=start))
+        .alias(day_match=F("weekdays_mask").bitand(day_bits))
+        .exclude(schedule_mode=SCHEDULE_RECURRING_WEEKLY, weekdays_mask__gt=0, day_match=0)
+        .annotate(
+            latest_legacy_date=latest_legacy_date,
+            site_has_permanent=Exists(active.filter(service_date=PERMANENT_SERVICE_DATE)),
+        )
+        .order_by("space_key", "sort_order", "title")
+    )
+
+    permanent: list[ServiceMenuEntry] = []
+    legacy: list[ServiceMenuEntry] = []
+    dated: dict[date, list[ServiceMenuEntry]] = defaultdict(list)
+    for entry in candidates:
+        if entry.service_date == PERMANENT_SERVICE_DATE:
+            permanent.append(entry)
+            continue
+        if start <= entry.service_date <= end:
+            dated[entry.service_date].append(entry)
+        if (
+            not entry.site_has_permanent
+            and entry.service_date == entry.latest_legacy_date
+            and entry.space_key.startswith("carta")
+        ):
+            legacy.append(entry)
+
+    effective: dict[date, list[ServiceMenuEntry]] = {}
+    for day in days:
+        deduped: dict[tuple[str, str, str, str], ServiceMenuEntry] = {}
+        for entry in (*permanent, *legacy, *dated.get(day, ())):
+            if entry.applies_on(day):
+                # Dated entries come last, so they override permanent/legacy duplicates.
+                deduped[_dedupe_key(entry)] = entry
+        effective[day] = list(deduped.values())
+    return effective
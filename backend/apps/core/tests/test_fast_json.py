@@ -0,0 +1,50 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from apps.core.api.renderers import FastJSONParser, FastJSONRenderer
+from apps.integration.import_batches import normalize_payload
+
+
+class FastJsonTests(SimpleTestCase):
+    def _sample(self):
+        return {
+            "id": uuid.UUID("0f8fad5b-d9cb-469f-a165-70867728950e"),
+            "qty": Decimal("1.250"),
+            "created_at": datetime(2026, 3, 1, 10, 30, 15, 123456, tzinfo=timezone.utc),
+            "day": date(2026, 3, 1),
+            "rows": ReturnList([{"name": "crème", "note": "a\u2028b"}], serializer=None),
+            1: "non-string key",
+            "empty": None,
+        }
+
+    def test_renderer_matches_stock_json_renderer(self):
+        data = self._sample()
+        fast = FastJSONRenderer().render(data)
+        stock = JSONRenderer().render(data)
+
+        self.assertEqual(json.loads(fast), json.loads(stock))
+        self.assertIn(b"\\u2028", fast)
+        self.assertIn(b'"2026-03-01T10:30:15.123456Z"', fast)
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_parser_reads_json_and_rejects_invalid_body(self):
+        parsed = FastJSONParser().parse(io.BytesIO(b'{"qty": "1.250", "lines": [1, 2]}'))
+        self.assertEqual(parsed, {"qty": "1.250", "lines": [1, 2]})
+
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"qty": '))
+
+    def test_normalize_payload_matches_json_round_trip(self):
+        data = self._sample()
+        data["tags"] = ("a", "b")
+        data["big"] = 2**70
+
+        self.assertEqual(normalize_payload(data), json.loads(json.dumps(data, default=str)))
@@ -1,10 +1,13 @@
 import uuid
 from decimal import Decimal
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
-from apps.core.models import Site
+from apps.core.models import ServiceMenuEntry, Site
+from apps.integration.fiches_snapshots import _deactivate_missing_fiches
 from apps.integration.models import RecipeSnapshot
 
 
@@ -242,3 +245,205 @@ class ServiceIngredientsApiTests(TestCase):
         self.assertEqual(by_ingredient["aretes de poisson"]["unit"], "kg")
         self.assertEqual(by_ingredient["aretes de poisson"]["source_type"], "derived_recipe")
         self.assertEqual(by_ingredient["aretes de poisson"]["source_recipe_title"], "bouillon de poisson")
+
+    def test_ingredients_and_menu_entries_support_conditional_get(self):
+        fiche_id = uuid.uuid4()
+        RecipeSnapshot.objects.create(
+            fiche_product_id=fiche_id,
+            title="Tiramisu",
+            snapshot_hash="hash-tiramisu-1",
+            payload={"ingredients": [{"name": "Mascarpone", "qty": "0.250", "unit": "kg", "supplier": "AEM"}]},
+        )
+        self.client.post(
+            "/api/v1/servizio/menu-entries/sync",
+            {
+                "site_id": str(self.site.id),
+                "service_date": "2026-02-27",
+                "entries": [{"space_key": "menu-giorno", "title": "Tiramisu", "fiche_product_id": str(fiche_id), "expected_qty": "1.000"}],
+            },
+            format="json",
+        )
+        url = f"/api/v1/servizio/ingredients?site={self.site.id}&date=2026-02-27&view=supplier"
+        first = self.client.get(url)
+        etag = first["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        recipe_view = self.client.get(url.replace("view=supplier", "view=recipe"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(recipe_view.status_code, 200)
+        entries_url = f"/api/v1/servizio/menu-entries/sync?site={self.site.id}&date=2026-02-27"
+        entries_etag = self.client.get(entries_url)["ETag"]
+        self.assertEqual(self.client.get(entries_url, HTTP_IF_NONE_MATCH=entries_etag).status_code, 304)
+
+        RecipeSnapshot.objects.create(
+            fiche_product_id=fiche_id,
+            title="Tiramisu",
+            snapshot_hash="hash-tiramisu-2",
+            payload={"ingredients": [{"name": "Mascarpone", "qty": "0.300", "unit": "kg", "supplier": "AEM"}]},
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(entries_url, HTTP_IF_NONE_MATCH=entries_etag).status_code, 200)
+
+    def test_in_place_snapshot_updates_change_the_etag(self):
+        fiche_id = uuid.uuid4()
+        snapshot = RecipeSnapshot.objects.create(
+            fiche_product_id=fiche_id,
+            title="Tiramisu",
+            snapshot_hash="hash-tiramisu-1",
+            payload={"ingredients": [{"name": "Mascarpone", "qty": "0.250", "unit": "kg", "supplier": "AEM"}]},
+        )
+        entries_url = f"/api/v1/servizio/menu-entries/sync?site={self.site.id}&date=2026-02-27"
+        etag = self.client.get(entries_url)["ETag"]
+
+        snapshot.payload = {"ingredients": [{"name": "Mascarpone", "qty": "0.300", "unit": "kg", "supplier": "AEM"}]}
+        snapshot.save(update_fields=["payload"])
+        after_edit = self.client.get(entries_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after_edit.status_code, 200)
+
+        _deactivate_missing_fiches(set())
+        self.assertEqual(self.client.get(entries_url, HTTP_IF_NONE_MATCH=after_edit["ETag"]).status_code, 200)
+
+    def test_menu_sync_resolves_recipe_categories_in_bulk_and_persists_them(self):
+        by_id = uuid.uuid4()
+        RecipeSnapshot.objects.create(fiche_product_id=by_id, title="Tiramisu", category="dolci", snapshot_hash="h-tira")
+        RecipeSnapshot.objects.create(
+            fiche_product_id=uuid.uuid4(), title="Burger  Classico", category="burgers", snapshot_hash="h-burger"
+        )
+        RecipeSnapshot.objects.create(
+            fiche_product_id=uuid.uuid4(), title="Salsa verde della casa", category="sauce", snapshot_hash="h-salsa"
+        )
+
+        def entries(count):
+            rows = [
+                {"space_key": "carta-principale", "title": "Dolce del giorno", "fiche_product_id": str(by_id)},
+                {"space_key": "carta-principale", "title": "burger classico"},
+                {"space_key": "carta-principale", "title": "Salsa verde"},
+                {"space_key": "carta-principale", "title": "Acqua", "metadata": {"item_kind": "product"}},
+            ]
+            rows += [{"space_key": "carta-principale", "title": f"Piatto {index}"} for index in range(count)]
+            return {"site_id": str(self.site.id), "service_date": "2026-02-27", "entries": rows}
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.post("/api/v1/servizio/menu-entries/sync", entries(1), format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post("/api/v1/servizio/menu-entries/sync", entries(30), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        categories = {
+            entry.title: entry.metadata.get("recipe_category")
+            for entry in ServiceMenuEntry.objects.filter(
+                site=self.site, title__in=["Dolce del giorno", "burger classico", "Salsa verde", "Acqua"]
+            )
+        }
+        self.assertEqual(
+            categories,
+            {"Dolce del giorno": "Desserts", "burger classico": "Burger", "Salsa verde": "Sauces", "Acqua": None},
+        )
+
+    def test_forecast_range_expands_each_recipe_once_and_splits_per_day(self):
+        pizza_id = uuid.uuid4()
+        tiramisu_id = uuid.uuid4()
+        RecipeSnapshot.objects.create(
+            fiche_product_id=pizza_id,
+            title="Pizza Margherita",
+            snapshot_hash="hash-pizza",
+            portions="4",
+            payload={"ingredients": [{"name": "Farina", "qty": "1.000", "unit": "kg", "supplier": "AEM"}]},
+        )
+        RecipeSnapshot.objects.create(
+            fiche_product_id=tiramisu_id,
+            title="Tiramisu",
+            snapshot_hash="hash-tiramisu",
+            portions="2",
+            payload={"ingredients": [{"name": "Mascarpone", "qty": "0.250", "unit": "kg", "supplier": "AEM"}]},
+        )
+        self.client.post(
+            "/api/v1/servizio/menu-entries/sync",
+            {
+                "site_id": str(self.site.id),
+                "service_date": "2026-03-03",
+                "entries": [
+                    {
+                        "space_key": "carta-principale",
+                        "title": "Pizza Margherita",
+                        "fiche_product_id": str(pizza_id),
+                        "expected_qty": "2",
+                    },
+                    {
+                        "space_key": "menu-giorno",
+                        "title": "Tiramisu",
+                        "fiche_product_id": str(tiramisu_id),
+                        "expected_qty": "4",
+                    },
+                ],
+            },
+            format="json",
+        )
+
+        with CaptureQueriesContext(connection) as short_range:
+            response = self.client.get(
+                f"/api/v1/servizio/ingredients?site={self.site.id}&date=2026-03-02&date_to=2026-03-04&view=supplier"
+            )
+        with CaptureQueriesContext(connection) as week:
+            self.client.get(f"/api/v1/servizio/ingredients?site={self.site.id}&date=2026-03-02&date_to=2026-03-08")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(len(week.captured_queries), len(short_range.captured_queries))
+        totals = {row["ingredient"]: Decimal(row["qty_total"]) for row in body["rows"]}
+        self.assertEqual(totals, {"Farina": Decimal("1.5"), "Mascarpone": Decimal("0.5")})
+        per_day = {
+            day["date"]: {row["ingredient"]: Decimal(row["qty_total"]) for row in day["rows"]} for day in body["days"]
+        }
+        self.assertEqual(per_day["2026-03-02"], {"Farina": Decimal("0.5")})
+        self.assertEqual(per_day["2026-03-03"], {"Farina": Decimal("0.5"), "Mascarpone": Decimal("0.5")})
+
+        recipes = self.client.get(
+            f"/api/v1/servizio/ingredients?site={self.site.id}&date=2026-03-02&date_to=2026-03-04&view=recipe"
+        ).json()["rows"]
+        pizza = next(row for row in recipes if row["title"] == "Pizza Margherita")
+        self.assertEqual(Decimal(pizza["expected_qty"]), Decimal("6"))
+        self.assertEqual(len(pizza["expected_qty_by_day"]), 3)
+
+    def test_forecast_applies_the_unquantified_preparation_fallback_per_day(self):
+        pasta_id = uuid.uuid4()
+        RecipeSnapshot.objects.create(
+            fiche_product_id=pasta_id,
+            title="Pasta al ragu",
+            snapshot_hash="hash-pasta",
+            portions="4",
+            payload={"ingredients": [{"name": "Ragu", "qty": "0", "unit": "kg"}]},
+        )
+        RecipeSnapshot.objects.create(
+            fiche_product_id=uuid.uuid4(),
+            title="Ragu",
+            snapshot_hash="hash-ragu",
+            portions="2",
+            payload={"ingredients": [{"name": "Carne", "qty": "1.000", "unit": "kg", "supplier": "AEM"}]},
+        )
+        self.client.post(
+            "/api/v1/servizio/menu-entries/sync",
+            {
+                "site_id": str(self.site.id),
+                "service_date": "2026-03-03",
+                "entries": [
+                    {
+                        "space_key": "carta-principale",
+                        "title": "Pasta al ragu",
+                        "fiche_product_id": str(pasta_id),
+                        "expected_qty": "8",
+                    }
+                ],
+            },
+            format="json",
+        )
+
+        body = self.client.get(
+            f"/api/v1/servizio/ingredients?site={self.site.id}&date=2026-03-02&date_to=2026-03-04&view=supplier"
+        ).json()
+
+        self.assertEqual({row["ingredient"]: Decimal(row["qty_total"]) for row in body["rows"]}, {"Carne": Decimal("1.5")})
+        self.assertEqual(
+            [(day["date"], Decimal(day["rows"][0]["qty_total"])) for day in body["days"]],
+            [("2026-03-02", Decimal("0.5")), ("2026-03-03", Decimal("0.5")), ("2026-03-04", Decimal("0.5"))],
+        )
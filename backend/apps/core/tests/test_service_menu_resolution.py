@@ -0,0 +1,78 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.models import PERMANENT_SERVICE_DATE, ServiceMenuEntry, Site
+from apps.core.services.service_menu import resolve_effective_entries
+
+MONDAY = date(2026, 3, 2)
+
+
+class ServiceMenuResolutionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="Menu test", code="MENU_TEST")
+
+    def _entry(self, title, service_date=PERMANENT_SERVICE_DATE, space_key="carta-principale", **metadata):
+        return ServiceMenuEntry.objects.create(
+            site=self.site, service_date=service_date, space_key=space_key, title=title, metadata=metadata
+        )
+
+    def test_schedule_columns_follow_metadata(self):
+        entry = self._entry("Brunch", schedule_mode="recurring_weekly", weekdays=["sab", "7"], valid_to="2026-06-30")
+
+        self.assertEqual((entry.schedule_mode, entry.weekdays_mask), ("recurring_weekly", 0b1100000))
+        self.assertEqual(entry.valid_to, date(2026, 6, 30))
+        entry.metadata = {"schedule_mode": "permanent"}
+        entry.save(update_fields=["metadata"])
+        entry.refresh_from_db()
+        self.assertEqual((entry.schedule_mode, entry.weekdays_mask, entry.valid_to), ("permanent", 0, None))
+
+    def test_range_resolves_every_day_in_one_query(self):
+        self._entry("Pizza", schedule_mode="permanent")
+        self._entry("Couscous", schedule_mode="recurring_weekly", weekdays=["fri"])
+        self._entry("Asparagi", schedule_mode="permanent", valid_from="2026-03-04")
+        self._entry("Pizza", service_date=date(2026, 3, 3), schedule_mode="date_specific")
+        self._entry("Piatto del giorno", service_date=date(2026, 3, 3), space_key="lavagna")
+        self._entry("Fuori periodo", service_date=date(2026, 4, 1), space_key="lavagna")
+
+        with self.assertNumQueries(1):
+            by_day = resolve_effective_entries(self.site.id, MONDAY, date(2026, 3, 8))
+
+        titles = {day.isoformat(): sorted(entry.title for entry in entries) for day, entries in by_day.items()}
+        self.assertEqual(titles["2026-03-02"], ["Pizza"])
+        self.assertEqual(titles["2026-03-03"], ["Piatto del giorno", "Pizza"])
+        self.assertEqual(titles["2026-03-04"], ["Asparagi", "Pizza"])
+        self.assertEqual(titles["2026-03-06"], ["Asparagi", "Couscous", "Pizza"])
+        # The dated Pizza overrides the permanent one on its own day only.
+        self.assertEqual(by_day[date(2026, 3, 3)][0].service_date, date(2026, 3, 3))
+        self.assertEqual(by_day[MONDAY][0].service_date, PERMANENT_SERVICE_DATE)
+
+    def test_latest_dated_card_stands_in_without_permanent_entries(self):
+        self._entry("Vecchia carta", service_date=date(2026, 1, 10))
+        self._entry("Carta recente", service_date=date(2026, 2, 20))
+
+        by_day = resolve_effective_entries(self.site.id, MONDAY)
+
+        self.assertEqual([entry.title for entry in by_day[MONDAY]], ["Carta recente"])
+        self._entry("Pizza", schedule_mode="permanent")
+        self.assertEqual([entry.title for entry in resolve_effective_entries(self.site.id, MONDAY)[MONDAY]], ["Pizza"])
+
+    def test_menu_api_range_mode_returns_entries_per_day(self):
+        self._entry("Couscous", schedule_mode="recurring_weekly", weekdays=["fri"])
+
+        response = self.client.get(
+            f"/api/v1/servizio/menu-entries/sync?site={self.site.id}&date=2026-03-05&date_to=2026-03-06"
+        )
+        too_long = self.client.get(
+            f"/api/v1/servizio/menu-entries/sync?site={self.site.id}&date=2026-03-01&date_to=2026-05-01"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(day["date"], day["count"]) for day in response.json()["days"]],
+            [("2026-03-05", 0), ("2026-03-06", 1)],
+        )
+        self.assertEqual(too_long.status_code, 400)
@@ -2,6 +2,7 @@
 
 from apps.integration.models import (
     DocumentExtraction,
+    ExtractionCacheEntry,
     IntegrationDocument,
     IntegrationImportBatch,
     RecipeIngredientLink,
@@ -16,11 +17,21 @@ class IntegrationImportBatchAdmin(admin.ModelAdmin):
     list_filter = ("status", "source", "import_type")
 
 
+@admin.register(ExtractionCacheEntry)
+class ExtractionCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("document_type", "file_sha256", "model", "prompt_version", "hit_count", "last_hit_at", "created_at")
+    search_fields = ("file_sha256", "model", "prompt_version")
+    list_filter = ("document_type", "model")
+
+
 @admin.register(RecipeSnapshot)
 class RecipeSnapshotAdmin(admin.ModelAdmin):
-    list_display = ("title", "fiche_product_id", "snapshot_hash", "source_updated_at", "created_at")
+    list_display = ("title", "fiche_product_id", "snapshot_hash", "source_updated_at", "is_current", "created_at")
     search_fields = ("title", "snapshot_hash", "fiche_product_id")
-    list_filter = ("category",)
+    list_filter = ("category", "is_current", "source_active")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("payload")
 
 
 @admin.register(RecipeIngredientLink)
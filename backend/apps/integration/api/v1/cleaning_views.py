@@ -25,6 +25,7 @@ from apps.integration.models import (
     CleaningPlan,
     CleaningProcedure,
 )
+from apps.integration.services.traccia_cache import invalidate_traccia_cache
 from apps.integration.services.traccia_client import TracciaClient, TracciaClientError
 
 
@@ -313,6 +314,7 @@ class CleaningPlanGenerateView(APIView):
             except TracciaClientError as exc:
                 errors.append({"date": str(due_day), "detail": exc.payload})
 
+        invalidate_traccia_cache("/api/v1/haccp/schedules/")
         return Response({"created": created, "errors": errors}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 
@@ -337,4 +339,5 @@ class CleaningBatchCompleteView(APIView):
                     completed += 1
             except TracciaClientError as exc:
                 errors.append({"schedule_id": schedule_id, "detail": exc.payload})
+        invalidate_traccia_cache("/api/v1/haccp/schedules/")
         return Response({"completed": completed, "errors": errors}, status=status.HTTP_200_OK)
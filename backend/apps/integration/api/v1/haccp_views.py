@@ -1,12 +1,14 @@
 from collections import Counter
 from decimal import Decimal, InvalidOperation
 
+from django.db.models import Count, Max
 from django.http import HttpRequest
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.integration.models import DocumentType, IntegrationDocument
+from apps.core.api.conditional import build_etag, etag_matches, not_modified_response, with_etag
+from apps.integration.models import DocumentExtraction, DocumentType, IntegrationDocument
 from apps.integration.api.v1.serializers import (
     HaccpColdPointSerializer,
     HaccpLabelProfileSerializer,
@@ -15,8 +17,9 @@ from apps.integration.api.v1.serializers import (
     HaccpScheduleSerializer,
     HaccpSectorSerializer,
 )
+from apps.integration.services.traccia_cache import cached_request_json, invalidate_traccia_cache
 from apps.integration.services.traccia_client import TracciaClient, TracciaClientError
-from apps.purchasing.models import GoodsReceiptLine, InvoiceGoodsReceiptMatch, InvoiceLine
+from apps.purchasing.models import GoodsReceipt, GoodsReceiptLine, Invoice, InvoiceGoodsReceiptMatch, InvoiceLine
 
 
 def _pass_through_headers(request: HttpRequest):
@@ -129,6 +132,23 @@ def _build_local_traceability_rows(site_id: str):
     return rows
 
 
+def _local_reconciliation_markers(site_id: str) -> list:
+    label_documents = IntegrationDocument.objects.filter(site_id=site_id, document_type=DocumentType.LABEL_CAPTURE)
+    return [
+        label_documents.aggregate(count=Count("id"), updated=Max("updated_at")),
+        DocumentExtraction.objects.filter(document__in=label_documents).aggregate(
+            count=Count("id"), updated=Max("updated_at")
+        ),
+        GoodsReceipt.objects.filter(site_id=site_id).aggregate(updated=Max("updated_at")),
+        GoodsReceiptLine.objects.filter(receipt__site_id=site_id).aggregate(count=Count("id"), updated=Max("updated_at")),
+        Invoice.objects.filter(site_id=site_id).aggregate(updated=Max("updated_at")),
+        InvoiceLine.objects.filter(invoice__site_id=site_id).aggregate(count=Count("id"), updated=Max("updated_at")),
+        InvoiceGoodsReceiptMatch.objects.filter(invoice_line__invoice__site_id=site_id).aggregate(
+            count=Count("id"), updated=Max("updated_at")
+        ),
+    ]
+
+
 class HaccpTracciaReconciliationOverviewView(APIView):
     MATCH_SCAN_LIMIT = 5
 
@@ -140,14 +160,14 @@ class HaccpTracciaReconciliationOverviewView(APIView):
 
         try:
             client = TracciaClient()
-            lifecycle_code, lifecycle_payload = client.request_json(
-                "GET",
+            lifecycle_code, lifecycle_payload = cached_request_json(
+                client,
                 "/api/v1/haccp/lifecycle-events/",
                 params={"site": site_id, "limit": limit},
                 headers=_pass_through_headers(request),
             )
-            schedule_code, schedule_payload = client.request_json(
-                "GET",
+            schedule_code, schedule_payload = cached_request_json(
+                client,
                 "/api/v1/haccp/schedules/",
                 params={"site": site_id, "task_type": "label_print"},
                 headers=_pass_through_headers(request),
@@ -159,6 +179,10 @@ class HaccpTracciaReconciliationOverviewView(APIView):
         except TracciaClientError as exc:
             return _proxy_error(exc)
 
+        etag = build_etag(request, lifecycle_payload, schedule_payload, *_local_reconciliation_markers(site_id))
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
         lifecycle_rows = _payload_results(lifecycle_payload)
         local_traceability_rows = _build_local_traceability_rows(site_id)
         seen_local_keys = {
@@ -361,31 +385,34 @@ class HaccpTracciaReconciliationOverviewView(APIView):
 
         schedule_counter = Counter(str(item.get("status") or "planned") for item in schedule_rows)
 
-        return Response(
-            {
-                "site": site_id,
-                "summary": {
-                    "lifecycle_events": len(lifecycle_rows),
-                    "goods_receipt_lines": len(goods_receipt_lines),
-                    "invoice_lines": len(invoice_lines),
-                    "matches": len(match_rows),
-                    "reconciled_events": status_counter["reconciled"],
-                    "goods_receipt_only_events": status_counter["goods_receipt_only"],
-                    "invoice_only_events": status_counter["invoice_only"],
-                    "missing_events": status_counter["missing"],
-                    "documents_found_events": status_counter["documents_found"],
-                    "label_tasks_planned": schedule_counter["planned"],
-                    "label_tasks_done": schedule_counter["done"],
-                },
-                "label_schedule_summary": {
-                    "planned": schedule_counter["planned"],
-                    "done": schedule_counter["done"],
-                    "skipped": schedule_counter["skipped"],
-                    "cancelled": schedule_counter["cancelled"],
+        return with_etag(
+            Response(
+                {
+                    "site": site_id,
+                    "summary": {
+                        "lifecycle_events": len(lifecycle_rows),
+                        "goods_receipt_lines": len(goods_receipt_lines),
+                        "invoice_lines": len(invoice_lines),
+                        "matches": len(match_rows),
+                        "reconciled_events": status_counter["reconciled"],
+                        "goods_receipt_only_events": status_counter["goods_receipt_only"],
+                        "invoice_only_events": status_counter["invoice_only"],
+                        "missing_events": status_counter["missing"],
+                        "documents_found_events": status_counter["documents_found"],
+                        "label_tasks_planned": schedule_counter["planned"],
+                        "label_tasks_done": schedule_counter["done"],
+                    },
+                    "label_schedule_summary": {
+                        "planned": schedule_counter["planned"],
+                        "done": schedule_counter["done"],
+                        "skipped": schedule_counter["skipped"],
+                        "cancelled": schedule_counter["cancelled"],
+                    },
+                    "results": overview_rows,
                 },
-                "results": overview_rows,
-            },
-            status=status.HTTP_200_OK,
+                status=status.HTTP_200_OK,
+            ),
+            etag,
         )
 
 
@@ -396,9 +423,8 @@ class HaccpOcrQueueView(APIView):
             return Response({"detail": "site query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
         limit = (request.query_params.get("limit") or "100").strip()
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/ocr-results/",
                 params={"site": site_id, "limit": limit},
                 headers=_pass_through_headers(request),
@@ -420,6 +446,7 @@ class HaccpOcrValidateView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/ocr-results/{document_id}/validate/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -432,9 +459,8 @@ class HaccpLifecycleEventListView(APIView):
             return Response({"detail": "site query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
         limit = (request.query_params.get("limit") or "200").strip()
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/lifecycle-events/",
                 params={"site": site_id, "limit": limit},
                 headers=_pass_through_headers(request),
@@ -450,9 +476,8 @@ class HaccpSectorListView(APIView):
         if not site_id:
             return Response({"detail": "site query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/sectors/",
                 params={"site": site_id},
                 headers=_pass_through_headers(request),
@@ -474,6 +499,7 @@ class HaccpSectorDetailView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/sectors/{sector_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -486,6 +512,7 @@ class HaccpSectorDetailView(APIView):
                 f"/api/v1/haccp/sectors/{sector_id}/",
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/sectors/{sector_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -501,6 +528,7 @@ class HaccpSiteSyncView(APIView):
                 data=request.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache("/api/v1/haccp/sites/sync/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -513,9 +541,8 @@ class HaccpColdPointListView(APIView):
             return Response({"detail": "site query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
         sector_id = (request.query_params.get("sector") or "").strip()
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/cold-points/",
                 params={"site": site_id, "sector": sector_id},
                 headers=_pass_through_headers(request),
@@ -537,6 +564,7 @@ class HaccpColdPointDetailView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/cold-points/{point_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -549,6 +577,7 @@ class HaccpColdPointDetailView(APIView):
                 f"/api/v1/haccp/cold-points/{point_id}/",
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/cold-points/{point_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -560,9 +589,8 @@ class HaccpTemperatureReadingListView(APIView):
         if not site_id:
             return Response({"detail": "site query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/temperature-readings/",
                 params={
                     "site": site_id,
@@ -587,6 +615,7 @@ class HaccpSectorSyncView(APIView):
                 data=request.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache("/api/v1/haccp/sectors/sync/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -602,6 +631,7 @@ class HaccpColdPointSyncView(APIView):
                 data=request.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache("/api/v1/haccp/cold-points/sync/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -612,9 +642,8 @@ class HaccpScheduleListCreateView(APIView):
         site_id = (request.query_params.get("site") or "").strip()
         task_type = (request.query_params.get("task_type") or "").strip()
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/schedules/",
                 params={"site": site_id, "task_type": task_type},
                 headers=_pass_through_headers(request),
@@ -634,6 +663,7 @@ class HaccpScheduleListCreateView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache("/api/v1/haccp/schedules/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -651,6 +681,7 @@ class HaccpScheduleDetailView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/schedules/{schedule_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -660,9 +691,8 @@ class HaccpLabelProfileListCreateView(APIView):
     def get(self, request):
         site_id = (request.query_params.get("site") or "").strip()
         try:
-            client = TracciaClient()
-            code, payload = client.request_json(
-                "GET",
+            code, payload = cached_request_json(
+                TracciaClient(),
                 "/api/v1/haccp/label-profiles/",
                 params={"site": site_id},
                 headers=_pass_through_headers(request),
@@ -682,6 +712,7 @@ class HaccpLabelProfileListCreateView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache("/api/v1/haccp/label-profiles/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -699,6 +730,7 @@ class HaccpLabelProfileDetailView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/label-profiles/{profile_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -711,6 +743,7 @@ class HaccpLabelProfileDetailView(APIView):
                 f"/api/v1/haccp/label-profiles/{profile_id}/",
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/label-profiles/{profile_id}/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -742,6 +775,7 @@ class HaccpLabelSessionListCreateView(APIView):
                 data=serializer.data,
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache("/api/v1/haccp/label-sessions/")
             return Response(payload, status=code)
         except TracciaClientError as exc:
             return _proxy_error(exc)
@@ -754,6 +788,7 @@ class HaccpLabelSessionListCreateView(APIView):
                 f"/api/v1/haccp/schedules/{schedule_id}/",
                 headers=_pass_through_headers(request),
             )
+            invalidate_traccia_cache(f"/api/v1/haccp/schedules/{schedule_id}/")
             if code == status.HTTP_204_NO_CONTENT:
                 return Response(status=code)
             return Response(payload, status=code)
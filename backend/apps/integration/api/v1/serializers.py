@@ -13,6 +13,7 @@ from apps.integration.models import (
     IntegrationDocument,
     TraceabilityReconciliationDecision,
 )
+from apps.integration.services.extraction_queue import is_allowed_callback_url
 
 
 class IntegrationDocumentSerializer(serializers.ModelSerializer):
@@ -104,10 +105,13 @@ class DocumentExtractionSerializer(serializers.ModelSerializer):
             "normalized_payload",
             "confidence",
             "error_message",
+            "attempts",
+            "max_attempts",
+            "available_at",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "document", "created_at", "updated_at")
+        read_only_fields = ("id", "document", "attempts", "max_attempts", "available_at", "created_at", "updated_at")
 
 
 class ExtractionIngestSerializer(serializers.Serializer):
@@ -151,6 +155,12 @@ class ExtractionIngestSerializer(serializers.Serializer):
 
 class ClaudeExtractSerializer(serializers.Serializer):
     idempotency_key = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    callback_url = serializers.URLField(max_length=500, required=False, allow_blank=True, default="")
+
+    def validate_callback_url(self, value):
+        if value and not is_allowed_callback_url(value):
+            raise serializers.ValidationError("callback_url host is not in EXTRACTION_QUEUE_CALLBACK_ALLOWED_HOSTS.")
+        return value
 
 
 class DocumentReviewSerializer(serializers.Serializer):
@@ -187,10 +197,17 @@ class FicheSnapshotImportSerializer(serializers.Serializer):
     limit = serializers.IntegerField(required=False, min_value=1, max_value=5000, default=500)
     idempotency_key = serializers.CharField(required=False, allow_blank=True, default="")
     refresh_existing = serializers.BooleanField(required=False, default=False)
+    # Incremental sync: fiches changed since the stored watermark, read in keyset pages.
+    incremental = serializers.BooleanField(required=False, default=False)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=5000, default=500)
+    detect_deletions = serializers.BooleanField(required=False, default=False)
 
 
 class FicheCatalogImportSerializer(serializers.Serializer):
     idempotency_key = serializers.CharField(required=False, allow_blank=True, default="")
+    # Incremental sync: rows changed since `updated_since`, or since the last completed import's watermark.
+    incremental = serializers.BooleanField(required=False, default=False)
+    updated_since = serializers.DateTimeField(required=False, allow_null=True, default=None)
 
 
 class FicheSnapshotEnvelopeImportSerializer(serializers.Serializer):
@@ -35,7 +35,9 @@ from apps.integration.api.v1.cleaning_views import (
 from apps.integration.api.v1.views import (
     DriveAssetImportView,
     DocumentClaudeExtractView,
+    DocumentExtractionDetailView,
     DocumentExtractionViewSet,
+    ExtractionCacheStatsView,
     DocumentFileView,
     DocumentIngestViewSet,
     TraceabilityReconciliationDecisionListCreateView,
@@ -93,6 +95,16 @@ urlpatterns = [
         DocumentExtractionViewSet.as_view({"post": "create"}),
         name="integration-document-extraction-create",
     ),
+    path(
+        "integration/extractions/<uuid:extraction_id>/",
+        DocumentExtractionDetailView.as_view(),
+        name="integration-extraction-detail",
+    ),
+    path(
+        "integration/extraction-cache/stats/",
+        ExtractionCacheStatsView.as_view(),
+        name="integration-extraction-cache-stats",
+    ),
     path(
         "integration/documents/<uuid:document_id>/ingest/",
         DocumentIngestViewSet.as_view({"post": "create"}),
@@ -4,10 +4,10 @@ from rest_framework.exceptions import ValidationError
 import json
 import re
 import uuid
-from datetime import datetime, time, timezone as dt_timezone
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 from decimal import Decimal, InvalidOperation
 
-from django.http import Http404, HttpResponse
+from django.http import Http404, StreamingHttpResponse
 from django.db import IntegrityError
 from django.utils import timezone as dj_timezone
 from django.utils.dateparse import parse_date, parse_datetime
@@ -31,8 +31,12 @@ from apps.integration.api.v1.serializers import (
     TraceabilityReconciliationDecisionSerializer,
     TracciaAssetImportSerializer,
 )
-from apps.integration.fiches_catalog import import_supplier_catalog_from_fiches
-from apps.integration.fiches_snapshots import import_recipe_snapshots, import_recipe_snapshots_from_v11_envelope
+from apps.integration.fiches_catalog import import_supplier_catalog_from_fiches, latest_catalog_watermark
+from apps.integration.fiches_snapshots import (
+    import_recipe_snapshots,
+    import_recipe_snapshots_from_v11_envelope,
+    sync_recipe_snapshots_incremental,
+)
 from apps.integration.fiches_titles import fetch_recipe_titles
 from apps.integration.import_batches import complete_batch, fail_batch, find_completed_batch, start_batch
 from apps.integration.models import (
@@ -40,15 +44,28 @@ from apps.integration.models import (
     DocumentSource,
     DocumentStatus,
     DocumentType,
+    ExtractionStatus,
     IntegrationDocument,
     TraceabilityReconciliationDecision,
 )
-from apps.integration.services.claude_extractor import run_claude_extraction
-from apps.integration.services.document_storage import delete_document_binary, drive_storage_enabled, persist_document_binary, read_document_bytes
+from apps.integration.services.document_storage import (
+    delete_document_binary,
+    drive_storage_enabled,
+    open_document_stream,
+    persist_document_binary,
+)
 from apps.integration.services.drive_client import DriveClient, DriveClientError
 from apps.integration.services.drive_importer import import_drive_assets_for_site
+from apps.integration.services.extraction_cache import extraction_cache_stats
+from apps.integration.services.extraction_queue import (
+    enqueue_claude_extraction,
+    extraction_queue_async,
+    run_extraction_sync,
+)
+from apps.integration.services.traccia_cache import invalidate_traccia_cache
 from apps.integration.services.traccia_client import TracciaClient, TracciaClientError
 from apps.inventory.models import InventoryMovement, Lot, LotStatus, MovementType, SourceType
+from apps.inventory.services.lot_ledger import delete_lot_movements, record_lot_movement
 from apps.purchasing.api.v1.serializers import GoodsReceiptSerializer, InvoiceSerializer
 from apps.purchasing.models import GoodsReceipt, Invoice
 from apps.purchasing.services.reconciliation_auto_match import auto_match_invoice_lines
@@ -847,9 +864,9 @@ def _resolve_supplier_id(source: dict, supplier_id):
                 return str(candidate.id)
 
     if supplier_name:
-        existing = Supplier.objects.filter(name__iexact=supplier_name).first() or Supplier.find_by_normalized_name(
-            supplier_name
-        )
+        existing = Supplier.find_by_normalized_name(supplier_name) or Supplier.objects.filter(
+            name__iexact=supplier_name
+        ).first()
         if existing:
             if supplier_vat and not existing.vat_number:
                 existing.vat_number = supplier_vat
@@ -864,9 +881,9 @@ def _resolve_supplier_id(source: dict, supplier_id):
             )
             return str(created.id)
         except IntegrityError:
-            fallback = Supplier.objects.filter(name__iexact=supplier_name[:255]).first() or Supplier.find_by_normalized_name(
-                supplier_name[:255]
-            )
+            fallback = Supplier.find_by_normalized_name(supplier_name[:255]) or Supplier.objects.filter(
+                name__iexact=supplier_name[:255]
+            ).first()
             if fallback:
                 return str(fallback.id)
 
@@ -1014,6 +1031,25 @@ def _delete_linked_ingest_record(instance: IntegrationDocument):
         receipt.delete()
 
 
+def _resolve_lot_supplier_product(metadata: dict, payload: dict, *, supplier_code: str | None, raw_name: str):
+    product_id = _safe_uuid(metadata.get("supplier_product") or payload.get("supplier_product"))
+    if product_id:
+        product = SupplierProduct.objects.filter(pk=product_id).first()
+        if product:
+            return product
+    supplier_id = str(metadata.get("supplier_id") or metadata.get("supplier") or payload.get("supplier_id") or "").strip()
+    if supplier_id:
+        return _resolve_supplier_product_by_line(
+            supplier_id=supplier_id, supplier_code=supplier_code or "", raw_name=raw_name, qty_unit=None
+        )
+    if supplier_code:
+        # Without a supplier the code is only trusted when a single active product carries it.
+        candidates = list(SupplierProduct.objects.filter(active=True, supplier_sku=supplier_code)[:2])
+        if len(candidates) == 1:
+            return candidates[0]
+    return None
+
+
 def _sync_traceability_lot_allocation(decision: TraceabilityReconciliationDecision):
     _delete_traceability_lot_allocation(decision.event_id)
     if decision.decision_status != "matched":
@@ -1055,15 +1091,20 @@ def _sync_traceability_lot_allocation(decision: TraceabilityReconciliationDecisi
     supplier_code = str(metadata.get("supplier_code") or payload.get("supplier_code") or "").strip() or None
     happened_at = _normalize_datetime_text(metadata.get("happened_at")) or dj_timezone.now().isoformat().replace("+00:00", "Z")
 
+    supplier_product = _resolve_lot_supplier_product(
+        metadata, payload, supplier_code=supplier_code, raw_name=product_label
+    )
+
     lot, _created = Lot.objects.get_or_create(
         site=decision.site,
         internal_lot_code=internal_lot_code,
         defaults={
             "source_type": SourceType.SUPPLIER_PRODUCT,
+            "supplier_product": supplier_product,
             "supplier_lot_code": supplier_lot_code,
             "production_date": production_date,
             "dlc_date": dlc_date,
-            "qty_value": Decimal(qty_text),
+            "qty_value": Decimal("0"),
             "qty_unit": qty_unit,
             "status": LotStatus.ACTIVE,
             "metadata": {
@@ -1085,11 +1126,16 @@ def _sync_traceability_lot_allocation(decision: TraceabilityReconciliationDecisi
     if lot.qty_unit != qty_unit:
         lot.qty_unit = qty_unit
         lot_changed = True
+    if supplier_product and lot.supplier_product_id != supplier_product.id:
+        lot.supplier_product = supplier_product
+        lot_changed = True
 
-    InventoryMovement.objects.create(
+    if lot_changed:
+        lot.save(update_fields=["supplier_product", "supplier_lot_code", "production_date", "dlc_date", "qty_unit"])
+    record_lot_movement(
         site=decision.site,
         lot=lot,
-        supplier_product=None,
+        supplier_product=supplier_product,
         supplier_code=supplier_code,
         raw_product_name=product_label,
         movement_type=MovementType.IN,
@@ -1100,38 +1146,9 @@ def _sync_traceability_lot_allocation(decision: TraceabilityReconciliationDecisi
         ref_id=decision.event_id,
     )
 
-    current_qty = Decimal("0")
-    for movement in lot.movements.all():
-        movement_qty = Decimal(str(movement.qty_value or "0"))
-        if movement.movement_type == MovementType.OUT:
-            current_qty -= movement_qty
-        else:
-            current_qty += movement_qty
-    if lot.qty_value != current_qty:
-        lot.qty_value = current_qty
-        lot_changed = True
-    if lot_changed:
-        lot.save(update_fields=["supplier_lot_code", "production_date", "dlc_date", "qty_value", "qty_unit"])
-
 
 def _delete_traceability_lot_allocation(event_id: str):
-    movements = list(InventoryMovement.objects.select_related("lot").filter(ref_type="traceability_label_allocation", ref_id=event_id))
-    impacted_lots = [movement.lot for movement in movements if movement.lot_id]
-    if movements:
-        InventoryMovement.objects.filter(id__in=[movement.id for movement in movements]).delete()
-    for lot in impacted_lots:
-        if not lot:
-            continue
-        current_qty = Decimal("0")
-        for movement in lot.movements.all():
-            movement_qty = Decimal(str(movement.qty_value or "0"))
-            if movement.movement_type == MovementType.OUT:
-                current_qty -= movement_qty
-            else:
-                current_qty += movement_qty
-        if lot.qty_value != current_qty:
-            lot.qty_value = current_qty
-            lot.save(update_fields=["qty_value"])
+    delete_lot_movements(InventoryMovement.objects.filter(ref_type="traceability_label_allocation", ref_id=event_id))
 
 
 class IntegrationDocumentViewSet(
@@ -1163,15 +1180,15 @@ class IntegrationDocumentViewSet(
             return
         instance.file.open("rb")
         try:
-            binary = instance.file.read()
+            persist_document_binary(
+                document=instance,
+                filename=instance.filename,
+                content_type=instance.content_type or "application/octet-stream",
+                stream=instance.file,
+                size=instance.file.size,
+            )
         finally:
             instance.file.close()
-        persist_document_binary(
-            document=instance,
-            filename=instance.filename,
-            content_type=instance.content_type or "application/octet-stream",
-            binary=binary,
-        )
 
     def perform_destroy(self, instance: IntegrationDocument):
         _delete_linked_ingest_record(instance)
@@ -1182,10 +1199,12 @@ class IntegrationDocumentViewSet(
 class DocumentFileView(APIView):
     def get(self, request, document_id):
         document = get_object_or_404(IntegrationDocument, pk=document_id)
-        file_bytes, content_type = read_document_bytes(document)
-        if not file_bytes:
+        chunks, content_type, content_length = open_document_stream(document)
+        if chunks is None:
             raise Http404("Document binary is not available.")
-        response = HttpResponse(file_bytes, content_type=content_type or "application/octet-stream")
+        response = StreamingHttpResponse(chunks, content_type=content_type or "application/octet-stream")
+        if content_length is not None:
+            response["Content-Length"] = str(content_length)
         response["Content-Disposition"] = f'inline; filename="{document.filename}"'
         return response
 
@@ -1546,6 +1565,20 @@ class DocumentIngestViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
             raise
 
 
+def _queued_extraction_failed(batch) -> bool:
+    """
+    Async batches complete with 202 as soon as the job is queued. Once that job has failed for good, the
+    batch must not be replayed, or the document could never be extracted again under the same key.
+    """
+    result = batch.result or {}
+    if result.get("status_code") != status.HTTP_202_ACCEPTED:
+        return False
+    extraction_id = _safe_uuid((result.get("data") or {}).get("id"))
+    return bool(extraction_id) and DocumentExtraction.objects.filter(
+        pk=extraction_id, status=ExtractionStatus.FAILED
+    ).exists()
+
+
 class DocumentClaudeExtractView(APIView):
     def post(self, request, document_id):
         document = get_object_or_404(IntegrationDocument, pk=document_id)
@@ -1560,7 +1593,7 @@ class DocumentClaudeExtractView(APIView):
         source = "claude"
         import_type = "document_extraction"
         existing = find_completed_batch(source, import_type, idempotency_key)
-        if existing:
+        if existing and not _queued_extraction_failed(existing):
             result = existing.result or {}
             return Response(result.get("data", {}), status=result.get("status_code", status.HTTP_200_OK))
 
@@ -1575,37 +1608,29 @@ class DocumentClaudeExtractView(APIView):
             },
         )
 
+        callback_url = serializer.validated_data.get("callback_url") or ""
         try:
-            result = run_claude_extraction(document)
-            extraction = DocumentExtraction.objects.create(
-                document=document,
-                extractor_name="claude",
-                extractor_version=result.extractor_version,
-                status=result.status,
-                raw_payload=result.raw_payload,
-                normalized_payload=result.normalized_payload,
-                confidence=result.confidence,
-                error_message=result.error_message,
-            )
-            if result.status == "succeeded":
-                document.status = "extracted"
-            else:
-                document.status = "failed"
-            document.save(update_fields=["status", "updated_at"])
+            if extraction_queue_async():
+                extraction = enqueue_claude_extraction(document, callback_url=callback_url)
+                payload = DocumentExtractionSerializer(extraction).data
+                complete_batch(batch, status.HTTP_202_ACCEPTED, payload)
+                return Response(payload, status=status.HTTP_202_ACCEPTED)
+
+            extraction = run_extraction_sync(document, callback_url=callback_url)
             payload = DocumentExtractionSerializer(extraction).data
-            if result.status == "succeeded":
+            if extraction.status == "succeeded":
                 complete_batch(batch, status.HTTP_201_CREATED, payload)
                 return Response(payload, status=status.HTTP_201_CREATED)
             fail_batch(
                 batch,
                 status.HTTP_400_BAD_REQUEST,
                 {
-                    "detail": result.error_message or "Claude extraction failed.",
+                    "detail": extraction.error_message or "Claude extraction failed.",
                     "extraction": payload,
                 },
             )
             return Response(
-                {"detail": result.error_message or "Claude extraction failed.", "extraction": payload},
+                {"detail": extraction.error_message or "Claude extraction failed.", "extraction": payload},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as exc:
@@ -1613,6 +1638,25 @@ class DocumentClaudeExtractView(APIView):
             raise
 
 
+class DocumentExtractionDetailView(APIView):
+    def get(self, request, extraction_id):
+        extraction = get_object_or_404(DocumentExtraction, pk=extraction_id)
+        return Response(DocumentExtractionSerializer(extraction).data)
+
+
+class ExtractionCacheStatsView(APIView):
+    def get(self, request):
+        raw_days = str(request.query_params.get("days") or "").strip()
+        since = None
+        if raw_days:
+            try:
+                days = int(raw_days)
+            except ValueError:
+                return Response({"detail": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+            since = dj_timezone.now() - timedelta(days=max(1, days))
+        return Response(extraction_cache_stats(since=since))
+
+
 def _sync_validated_label_capture_to_traccia(document: IntegrationDocument):
     extraction = document.extractions.order_by("-created_at").first()
     payload = _as_dict(extraction.normalized_payload if extraction else {})
@@ -1643,6 +1687,7 @@ def _sync_validated_label_capture_to_traccia(document: IntegrationDocument):
             "corrected_payload": payload,
         },
     )
+    invalidate_traccia_cache("/api/v1/haccp/traceability-validations/")
     return sync_payload
 
 
@@ -1746,10 +1791,14 @@ class FicheSnapshotImportView(APIView):
         query = serializer.validated_data.get("query", "")
         limit = serializer.validated_data.get("limit", 500)
         refresh_existing = serializer.validated_data.get("refresh_existing", False)
+        incremental = serializer.validated_data.get("incremental", False)
+        page_size = serializer.validated_data.get("page_size", 500)
+        detect_deletions = serializer.validated_data.get("detect_deletions", False)
+        # Incremental runs are not replayed from the default key, since the source keeps changing.
         idempotency_key = (
             serializer.validated_data.get("idempotency_key")
             or request.headers.get("Idempotency-Key", "")
-            or f"fiches-snapshots:{query}:{limit}"
+            or ("" if incremental else f"fiches-snapshots:{query}:{limit}")
         )
 
         existing = find_completed_batch("fiches", "recipe_snapshot", idempotency_key)
@@ -1761,10 +1810,13 @@ class FicheSnapshotImportView(APIView):
             "fiches",
             "recipe_snapshot",
             idempotency_key,
-            {"query": query, "limit": limit},
+            {"query": query, "limit": limit, "incremental": incremental},
         )
         try:
-            result = import_recipe_snapshots(query=query, limit=limit, refresh_existing=refresh_existing)
+            if incremental:
+                result = sync_recipe_snapshots_incremental(page_size=page_size, detect_deletions=detect_deletions)
+            else:
+                result = import_recipe_snapshots(query=query, limit=limit, refresh_existing=refresh_existing)
             if not result.get("ok"):
                 fail_batch(batch, status.HTTP_400_BAD_REQUEST, {"detail": result.get("detail", "Import failed")})
                 return Response({"detail": result.get("detail", "Import failed")}, status=status.HTTP_400_BAD_REQUEST)
@@ -1830,10 +1882,16 @@ class FicheCatalogImportView(APIView):
         serializer = FicheCatalogImportSerializer(data=request.data or {})
         serializer.is_valid(raise_exception=True)
 
+        updated_since = serializer.validated_data.get("updated_since")
+        incremental = serializer.validated_data.get("incremental") or updated_since is not None
+        if incremental and updated_since is None:
+            # No previous watermark yet: the first incremental run is a full sync.
+            updated_since = latest_catalog_watermark()
+        # Incremental runs are not replayed from the default key, since the source keeps changing.
         idempotency_key = (
             serializer.validated_data.get("idempotency_key")
             or request.headers.get("Idempotency-Key", "")
-            or "fiches-catalog"
+            or ("" if incremental else "fiches-catalog")
         )
         existing = find_completed_batch("fiches", "supplier_catalog", idempotency_key)
         if existing:
@@ -1844,10 +1902,10 @@ class FicheCatalogImportView(APIView):
             "fiches",
             "supplier_catalog",
             idempotency_key,
-            {},
+            {"incremental": incremental, "updated_since": updated_since},
         )
         try:
-            result = import_supplier_catalog_from_fiches()
+            result = import_supplier_catalog_from_fiches(updated_since=updated_since, incremental=incremental)
             if not result.get("ok"):
                 fail_batch(batch, status.HTTP_400_BAD_REQUEST, {"detail": result.get("detail", "Import failed")})
                 return Response({"detail": result.get("detail", "Import failed")}, status=status.HTTP_400_BAD_REQUEST)
@@ -1,14 +1,22 @@
 import re
 import uuid
+from datetime import datetime
 from decimal import Decimal, InvalidOperation
 from typing import Any
 
+from django.conf import settings
 from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
 
-from apps.catalog.models import Supplier, SupplierProduct
+from apps.catalog.models import Supplier, SupplierProduct, normalize_supplier_name
+from apps.integration.models import IntegrationImportBatch
 
 
 SAFE_DB_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_\\.]*$")
+SYNC_BATCH_SIZE = 500
+SUPPLIER_SYNC_FIELDS = ["metadata", "updated_at"]
+PRODUCT_SYNC_FIELDS = ["supplier_sku", "uom", "pack_qty", "active", "metadata", "updated_at"]
 
 
 def _safe_identifier(value: str, fallback: str) -> str:
@@ -18,6 +26,13 @@ def _safe_identifier(value: str, fallback: str) -> str:
     return candidate
 
 
+def _safe_optional_identifier(value: str) -> str:
+    candidate = value.strip()
+    if not candidate or not SAFE_DB_IDENTIFIER.match(candidate):
+        return ""
+    return candidate
+
+
 def _to_decimal(value: Any):
     if value in (None, ""):
         return None
@@ -46,120 +61,281 @@ def _normalize_uom(unit: str | None) -> str:
     return aliases.get(candidate, "pc")
 
 
-def import_supplier_catalog_from_fiches() -> dict[str, Any]:
+def import_supplier_catalog_from_fiches(
+    updated_since: datetime | None = None, *, incremental: bool | None = None
+) -> dict[str, Any]:
+    """
+    Sync suppliers and supplier products from the fiches DB. With `updated_since`, only source rows whose
+    FICHES_CATALOG_UPDATED_AT_COLUMN is at or after it are read. Incremental runs (the default when
+    `updated_since` is given; a first incremental run has none) carry `source_max_updated_at` to use as the
+    next watermark. Plain full syncs never touch that column, so they work on sources without it, and
+    reject `updated_since`.
+    """
     if "fiches" not in connections.databases:
         return {"ok": False, "detail": "FICHES DB non configurato."}
 
-    supplier_created = 0
-    supplier_updated = 0
-    product_created = 0
-    product_updated = 0
-    invalid_supplier_ids = 0
-    invalid_product_ids = 0
-
-    suppliers_sql = "SELECT id::text, name FROM suppliers ORDER BY name ASC"
-    products_sql = """
-        SELECT id::text, supplier_id::text, name, source_code, source_unit, unit, source_price, unit_price
-        FROM supplier_products
+    if incremental is None:
+        incremental = updated_since is not None
+    if updated_since is not None and not incremental:
+        return {"ok": False, "detail": "updated_since richiede un import incrementale."}
+    updated_col = ""
+    if incremental:
+        updated_col = _safe_optional_identifier(getattr(settings, "FICHES_CATALOG_UPDATED_AT_COLUMN", "updated_at"))
+        if not updated_col:
+            return {"ok": False, "detail": "FICHES_CATALOG_UPDATED_AT_COLUMN non configurata: import incrementale non disponibile."}
+
+    updated_select = updated_col or "NULL"
+    where = f" WHERE {updated_col} >= %s" if updated_since is not None else ""
+    params = [updated_since] if updated_since is not None else []
+    suppliers_sql = f"SELECT id::text, name, {updated_select} FROM suppliers{where} ORDER BY name ASC"
+    products_sql = f"""
+        SELECT id::text, supplier_id::text, name, source_code, source_unit, unit, source_price, unit_price, {updated_select}
+        FROM supplier_products{where}
         ORDER BY name ASC
     """
 
     try:
         with connections["fiches"].cursor() as cursor:
-            cursor.execute(suppliers_sql)
+            cursor.execute(suppliers_sql, params)
             supplier_rows = cursor.fetchall()
-            cursor.execute(products_sql)
+            cursor.execute(products_sql, params)
             product_rows = cursor.fetchall()
     except Exception as exc:
         return {"ok": False, "detail": f"Impossibile leggere DB fiches: {exc}"}
 
-    supplier_by_source_id: dict[str, Supplier] = {}
-    with transaction.atomic():
-        for source_id, name in supplier_rows:
-            supplier_name = str(name or "").strip()
-            if not supplier_name:
-                continue
-            supplier_uuid = None
-            try:
-                supplier_uuid = uuid.UUID(str(source_id))
-            except (TypeError, ValueError):
-                invalid_supplier_ids += 1
-
-            supplier = Supplier.objects.filter(name=supplier_name).first() or Supplier.find_by_normalized_name(
-                supplier_name
-            )
-            if supplier is None:
-                create_kwargs = {"name": supplier_name, "metadata": {"source": "fiches", "fiches_supplier_id": str(source_id)}}
-                if supplier_uuid:
-                    create_kwargs["id"] = supplier_uuid
-                supplier = Supplier.objects.create(**create_kwargs)
-                supplier_created += 1
-            else:
-                metadata = supplier.metadata or {}
-                metadata["source"] = "fiches"
-                metadata["fiches_supplier_id"] = str(source_id)
-                supplier.metadata = metadata
-                supplier.save(update_fields=["metadata", "updated_at"])
-                supplier_updated += 1
-
-            supplier_by_source_id[str(source_id)] = supplier
-
-        for source_product_id, source_supplier_id, name, source_code, source_unit, unit, source_price, unit_price in product_rows:
-            product_name = str(name or "").strip()
-            if not product_name:
-                continue
-            supplier = supplier_by_source_id.get(str(source_supplier_id))
-            if not supplier:
-                continue
-            product_uuid = None
-            try:
-                product_uuid = uuid.UUID(str(source_product_id))
-            except (TypeError, ValueError):
-                invalid_product_ids += 1
-
-            normalized_uom = _normalize_uom(unit or source_unit)
-            pack_qty = _to_decimal(source_price)
-
-            existing = SupplierProduct.objects.filter(supplier=supplier, name=product_name).first()
-            metadata = (existing.metadata if existing else {}) or {}
-            metadata["source"] = "fiches"
-            metadata["fiches_product_id"] = str(source_product_id)
-            metadata["source_unit_price"] = str(unit_price) if unit_price is not None else None
-            metadata["source_unit"] = source_unit
-
-            if existing is None:
-                create_kwargs = {
-                    "supplier": supplier,
-                    "name": product_name,
-                    "supplier_sku": str(source_code).strip() if source_code else None,
-                    "uom": normalized_uom,
-                    "pack_qty": pack_qty,
-                    "active": True,
-                    "traceability_flag": False,
-                    "allergens": [],
-                    "metadata": metadata,
-                }
-                if product_uuid:
-                    create_kwargs["id"] = product_uuid
-                SupplierProduct.objects.create(**create_kwargs)
-                product_created += 1
-            else:
-                existing.supplier_sku = str(source_code).strip() if source_code else existing.supplier_sku
-                existing.uom = normalized_uom
-                existing.pack_qty = pack_qty if pack_qty is not None else existing.pack_qty
-                existing.active = True
-                existing.metadata = metadata
-                existing.save(update_fields=["supplier_sku", "uom", "pack_qty", "active", "metadata", "updated_at"])
-                product_updated += 1
+    result = sync_supplier_catalog(
+        [row[:2] for row in supplier_rows],
+        [row[:8] for row in product_rows],
+    )
+    watermarks = [row[-1] for row in (*supplier_rows, *product_rows) if isinstance(row[-1], datetime)]
+    result["updated_since"] = updated_since.isoformat() if updated_since else None
+    watermark = max(watermarks) if watermarks else updated_since
+    result["source_max_updated_at"] = watermark.isoformat() if watermark else None
+    return result
+
 
+def sync_supplier_catalog(supplier_rows, product_rows, *, batch_size: int = SYNC_BATCH_SIZE) -> dict[str, Any]:
+    """
+    Diff fiches rows against the local catalog and write only what changed.
+
+    supplier_rows: (source_id, name); product_rows: (source_id, source_supplier_id, name, source_code,
+    source_unit, unit, source_price, unit_price). Local rows are matched by fiches id (primary key or
+    metadata), then suppliers by normalized name and products by (supplier, name). Inserts and updates
+    are applied with bulk_create/bulk_update, one short transaction per chunk.
+    """
+    now = timezone.now()
+    supplier_stats, supplier_by_source_id = _sync_suppliers(supplier_rows, product_rows, now, batch_size)
+    product_stats = _sync_products(product_rows, supplier_by_source_id, now, batch_size)
     return {
         "ok": True,
         "suppliers_read": len(supplier_rows),
         "products_read": len(product_rows),
-        "supplier_created": supplier_created,
-        "supplier_updated": supplier_updated,
-        "product_created": product_created,
-        "product_updated": product_updated,
-        "invalid_supplier_ids": invalid_supplier_ids,
-        "invalid_product_ids": invalid_product_ids,
+        **supplier_stats,
+        **product_stats,
+    }
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _parse_uuid(value) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _index_by_source_id(model, metadata_key: str, source_ids: set[str], batch_size: int) -> dict[str, Any]:
+    """Local rows whose primary key or metadata[metadata_key] is one of the fiches ids."""
+    index: dict[str, Any] = {}
+    for chunk in _chunks(sorted(source_ids), batch_size):
+        uuids = [parsed for parsed in (_parse_uuid(value) for value in chunk) if parsed]
+        wanted = set(chunk)
+        for obj in model.objects.filter(Q(id__in=uuids) | Q(**{f"metadata__{metadata_key}__in": chunk})):
+            metadata_id = str((obj.metadata or {}).get(metadata_key) or "")
+            if metadata_id in wanted:
+                index.setdefault(metadata_id, obj)
+            if str(obj.id) in wanted:
+                index.setdefault(str(obj.id), obj)
+    return index
+
+
+def _apply(model, to_create: list, to_update: dict, fields: list[str], batch_size: int) -> None:
+    for chunk in _chunks(to_create, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk)
+    for chunk in _chunks(list(to_update.values()), batch_size):
+        with transaction.atomic():
+            model.objects.bulk_update(chunk, fields)
+
+
+def _sync_suppliers(supplier_rows, product_rows, now, batch_size: int):
+    source_ids = {str(source_id) for source_id, _name in supplier_rows}
+    source_ids |= {str(row[1]) for row in product_rows if row[1]}
+    local_by_source_id = _index_by_source_id(Supplier, "fiches_supplier_id", source_ids, batch_size)
+
+    names = {str(name or "").strip() for _source_id, name in supplier_rows} - {""}
+    by_normalized_name = {
+        supplier.normalized_name: supplier for supplier in Supplier.resolve_by_normalized_names(names).values()
     }
+    unnormalizable = [name for name in names if not normalize_supplier_name(name)]
+    by_name = {supplier.name: supplier for supplier in Supplier.objects.filter(name__in=unnormalizable)}
+
+    to_create: list[Supplier] = []
+    to_update: dict[Any, Supplier] = {}
+    stats = {"supplier_created": 0, "supplier_updated": 0, "supplier_unchanged": 0, "invalid_supplier_ids": 0}
+    supplier_by_source_id = dict(local_by_source_id)
+    for source_id, name in supplier_rows:
+        source_id = str(source_id)
+        supplier_name = str(name or "").strip()
+        if not supplier_name:
+            continue
+        supplier_uuid = _parse_uuid(source_id)
+        if supplier_uuid is None:
+            stats["invalid_supplier_ids"] += 1
+
+        normalized_name = normalize_supplier_name(supplier_name)
+        supplier = local_by_source_id.get(source_id)
+        if supplier is None:
+            supplier = by_normalized_name.get(normalized_name) if normalized_name else by_name.get(supplier_name)
+        if supplier is None:
+            create_kwargs = {
+                "name": supplier_name,
+                # bulk_create skips Supplier.save(), which normally fills this in.
+                "normalized_name": normalized_name or None,
+                "metadata": {"source": "fiches", "fiches_supplier_id": source_id},
+            }
+            if supplier_uuid:
+                create_kwargs["id"] = supplier_uuid
+            supplier = Supplier(**create_kwargs)
+            to_create.append(supplier)
+            stats["supplier_created"] += 1
+            if normalized_name:
+                by_normalized_name[normalized_name] = supplier
+            else:
+                by_name[supplier_name] = supplier
+        elif supplier.pk not in to_update and not supplier._state.adding:
+            metadata = {**(supplier.metadata or {}), "source": "fiches", "fiches_supplier_id": source_id}
+            if metadata != supplier.metadata:
+                supplier.metadata = metadata
+                supplier.updated_at = now
+                to_update[supplier.pk] = supplier
+                stats["supplier_updated"] += 1
+            else:
+                stats["supplier_unchanged"] += 1
+        supplier_by_source_id[source_id] = supplier
+
+    _apply(Supplier, to_create, to_update, SUPPLIER_SYNC_FIELDS, batch_size)
+    return stats, supplier_by_source_id
+
+
+def _sync_products(product_rows, supplier_by_source_id: dict[str, Supplier], now, batch_size: int):
+    source_ids = {str(row[0]) for row in product_rows}
+    local_by_source_id = _index_by_source_id(SupplierProduct, "fiches_product_id", source_ids, batch_size)
+
+    unmatched = {
+        (supplier_by_source_id[str(row[1])].pk, str(row[2] or "").strip())
+        for row in product_rows
+        if str(row[0]) not in local_by_source_id and str(row[1]) in supplier_by_source_id
+    }
+    by_supplier_and_name: dict[tuple, SupplierProduct] = {}
+    for chunk in _chunks(sorted(unmatched, key=str), batch_size):
+        candidates = SupplierProduct.objects.filter(
+            supplier_id__in={supplier_id for supplier_id, _name in chunk},
+            name__in={name for _supplier_id, name in chunk},
+        )
+        for product in candidates:
+            key = (product.supplier_id, product.name)
+            if key in unmatched:
+                by_supplier_and_name[key] = product
+
+    to_create: list[SupplierProduct] = []
+    to_update: dict[Any, SupplierProduct] = {}
+    stats = {
+        "product_created": 0,
+        "product_updated": 0,
+        "product_unchanged": 0,
+        "products_without_supplier": 0,
+        "invalid_product_ids": 0,
+    }
+    for source_product_id, source_supplier_id, name, source_code, source_unit, unit, source_price, unit_price in product_rows:
+        source_product_id = str(source_product_id)
+        product_name = str(name or "").strip()
+        if not product_name:
+            continue
+        supplier = supplier_by_source_id.get(str(source_supplier_id))
+        if not supplier:
+            stats["products_without_supplier"] += 1
+            continue
+        product_uuid = _parse_uuid(source_product_id)
+        if product_uuid is None:
+            stats["invalid_product_ids"] += 1
+
+        existing = local_by_source_id.get(source_product_id) or by_supplier_and_name.get((supplier.pk, product_name))
+        metadata = {
+            **((existing.metadata if existing else {}) or {}),
+            "source": "fiches",
+            "fiches_product_id": source_product_id,
+            "source_unit_price": str(unit_price) if unit_price is not None else None,
+            "source_unit": source_unit,
+        }
+        supplier_sku = str(source_code).strip() if source_code else None
+        normalized_uom = _normalize_uom(unit or source_unit)
+        pack_qty = _to_decimal(source_price)
+
+        if existing is None:
+            create_kwargs = {
+                "supplier": supplier,
+                "name": product_name,
+                "supplier_sku": supplier_sku,
+                "uom": normalized_uom,
+                "pack_qty": pack_qty,
+                "active": True,
+                "traceability_flag": False,
+                "allergens": [],
+                "metadata": metadata,
+            }
+            if product_uuid:
+                create_kwargs["id"] = product_uuid
+            product = SupplierProduct(**create_kwargs)
+            to_create.append(product)
+            by_supplier_and_name[(supplier.pk, product_name)] = product
+            stats["product_created"] += 1
+            continue
+        if existing._state.adding or existing.pk in to_update:
+            continue
+
+        changes = {
+            "supplier_sku": supplier_sku or existing.supplier_sku,
+            "uom": normalized_uom,
+            "pack_qty": pack_qty if pack_qty is not None else existing.pack_qty,
+            "active": True,
+            "metadata": metadata,
+        }
+        if all(getattr(existing, field) == value for field, value in changes.items()):
+            stats["product_unchanged"] += 1
+            continue
+        for field, value in changes.items():
+            setattr(existing, field, value)
+        existing.updated_at = now
+        to_update[existing.pk] = existing
+        stats["product_updated"] += 1
+
+    _apply(SupplierProduct, to_create, to_update, PRODUCT_SYNC_FIELDS, batch_size)
+    return stats
+
+
+def latest_catalog_watermark() -> datetime | None:
+    """`source_max_updated_at` of the most recent completed fiches catalog import, if any."""
+    batches = IntegrationImportBatch.objects.filter(
+        source="fiches",
+        import_type="supplier_catalog",
+        status=IntegrationImportBatch.Status.COMPLETED,
+    ).order_by("-started_at")
+    for batch in batches.only("result")[:20]:
+        value = ((batch.result or {}).get("data") or {}).get("source_max_updated_at")
+        if value:
+            return datetime.fromisoformat(str(value))
+    return None
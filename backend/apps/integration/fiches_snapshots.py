@@ -1,23 +1,26 @@
 import hashlib
 import json
 import re
+import time
 import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from datetime import datetime, timezone as dt_timezone
 from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.parse import quote
-from urllib.request import Request, urlopen
 
 from django.conf import settings
-from django.db import connections
+from django.db import connections, transaction
 from django.utils.dateparse import parse_datetime
 
-from apps.integration.models import RecipeSnapshot
+from apps.integration.models import RecipeIngredientBlock, RecipeSnapshot, SyncWatermark, normalize_recipe_title
+from apps.integration.services.fiches_api_client import FichesApiClient, FichesApiError
 
 
 SAFE_DB_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_\\.]*$")
 FICHES_TEXTUAL_ID_NAMESPACE = uuid.UUID("9a7b0c87-3d8f-4b29-a06d-3f5b0e33fd7f")
+SNAPSHOT_UPSERT_BATCH_SIZE = 500
+SNAPSHOT_METADATA_FIELDS = ("title", "category", "portions", "source_updated_at")
 
 
 def _safe_identifier(value: str, fallback: str) -> str:
@@ -85,13 +88,6 @@ def _normalize_text(value: Any) -> str:
     return re.sub(r"\s+", " ", str(value or "")).strip().lower()
 
 
-def _http_get_json(url: str) -> Any:
-    request = Request(url, headers={"Accept": "application/json"})
-    with urlopen(request, timeout=30) as response:
-        raw = response.read().decode("utf-8")
-    return json.loads(raw)
-
-
 def _map_fiche_to_v11_export(fiche: dict[str, Any], fallback_summary: dict[str, Any] | None = None) -> dict[str, Any]:
     summary = fallback_summary or {}
     ingredients = fiche.get("ingredients") if isinstance(fiche.get("ingredients"), list) else []
@@ -128,21 +124,40 @@ def _map_fiche_to_v11_export(fiche: dict[str, Any], fallback_summary: dict[str,
     }
 
 
+def _known_fiche_versions(fiche_ids: list[str]) -> dict[str, tuple[datetime | None, str]]:
+    """(source_updated_at, source_etag) of the latest stored snapshot for each API fiche id."""
+    uuid_by_fiche_id = {}
+    for fiche_id in fiche_ids:
+        fiche_uuid, _was_remapped = _normalize_fiche_id(fiche_id)
+        if fiche_uuid:
+            uuid_by_fiche_id[fiche_id] = fiche_uuid
+    latest: dict[uuid.UUID, tuple[datetime | None, str]] = {
+        fiche_uuid: (source_updated_at, source_etag)
+        for fiche_uuid, source_updated_at, source_etag in RecipeSnapshot.objects.filter(
+            fiche_product_id__in=set(uuid_by_fiche_id.values()), is_current=True
+        ).values_list("fiche_product_id", "source_updated_at", "source_etag")
+    }
+    return {fiche_id: latest[fiche_uuid] for fiche_id, fiche_uuid in uuid_by_fiche_id.items() if fiche_uuid in latest}
+
+
 def import_recipe_snapshots_from_api(query: str = "", limit: int = 500, refresh_existing: bool = False) -> dict[str, Any]:
     base_url = getattr(settings, "FICHES_API_BASE_URL", "").strip().rstrip("/")
     if not base_url:
         return {"ok": False, "detail": "FICHES API non configurata."}
 
+    fetch_started = time.perf_counter()
     try:
-        listing = _http_get_json(f"{base_url}/fiches")
-    except HTTPError as exc:
-        return {"ok": False, "detail": f"Fiches API HTTP error: {exc.code}"}
-    except URLError as exc:
-        return {"ok": False, "detail": f"Fiches API unreachable: {exc.reason}"}
-    except Exception as exc:
-        return {"ok": False, "detail": f"Fiches API read failed: {exc}"}
+        client = FichesApiClient(base_url)
+    except FichesApiError as exc:
+        return {"ok": False, "detail": exc.detail}
+    try:
+        _status_code, listing, _etag = client.get_json("/fiches")
+    except FichesApiError as exc:
+        client.close()
+        return {"ok": False, "detail": exc.detail}
 
     if not isinstance(listing, list):
+        client.close()
         return {"ok": False, "detail": "Fiches API returned an invalid listing payload."}
 
     query_norm = _normalize_text(query)
@@ -156,18 +171,43 @@ def import_recipe_snapshots_from_api(query: str = "", limit: int = 500, refresh_
         filtered.append(item)
     filtered = filtered[: max(1, min(int(limit), 5000))]
 
-    fiches_export: list[dict[str, Any]] = []
+    # Unless a refresh is forced, fiches whose listing updatedAt matches the stored version are not
+    # fetched again, and the others are revalidated with the stored ETag.
+    known = {} if refresh_existing else _known_fiche_versions([str(item.get("id") or "").strip() for item in filtered])
+    to_fetch = []
+    skipped_unchanged = 0
     for item in filtered:
         fiche_id = str(item.get("id") or "").strip()
         if not fiche_id:
             continue
-        try:
-            fiche_payload = _http_get_json(f"{base_url}/fiches/{quote(fiche_id, safe='')}")
-        except Exception:
+        listed_updated_at = parse_datetime(str(item.get("updatedAt") or "")) if item.get("updatedAt") else None
+        if listed_updated_at and fiche_id in known and known[fiche_id][0] == listed_updated_at:
+            skipped_unchanged += 1
             continue
-        if not isinstance(fiche_payload, dict):
-            continue
-        fiches_export.append(_map_fiche_to_v11_export(fiche_payload, item))
+        to_fetch.append(item)
+
+    results = client.fetch_fiches(
+        to_fetch,
+        etags={fiche_id: etag for fiche_id, (_updated_at, etag) in known.items() if etag},
+    )
+    fetch_ms = round((time.perf_counter() - fetch_started) * 1000, 1)
+    fiches_export: list[dict[str, Any]] = []
+    source_etags: dict[str, str] = {}
+    fetch_failures: list[dict[str, str]] = []
+    for fetched in results:
+        if fetched.status == "failed":
+            fetch_failures.append(
+                {
+                    "fiche_id": fetched.fiche_id,
+                    "title": str(fetched.summary.get("title") or ""),
+                    "detail": fetched.error,
+                }
+            )
+        elif fetched.status == "fetched":
+            export = _map_fiche_to_v11_export(fetched.payload, fetched.summary)
+            fiches_export.append(export)
+            if fetched.etag:
+                source_etags[str(export["fiche_id"])] = fetched.etag
 
     envelope = {
         "export_version": "1.1",
@@ -176,36 +216,63 @@ def import_recipe_snapshots_from_api(query: str = "", limit: int = 500, refresh_
         "fiches": fiches_export,
         "warnings": [],
     }
-    return import_recipe_snapshots_from_v11_envelope(envelope, refresh_existing=refresh_existing)
+    result = import_recipe_snapshots_from_v11_envelope(
+        envelope,
+        refresh_existing=refresh_existing,
+        source_etags=source_etags,
+    )
+    result["fetch"] = {
+        "listed": len(filtered),
+        "requested": len(to_fetch),
+        "fetched": sum(1 for fetched in results if fetched.status == "fetched"),
+        "not_modified": sum(1 for fetched in results if fetched.status == "not_modified"),
+        "skipped_unchanged": skipped_unchanged,
+        "failed": len(fetch_failures),
+    }
+    result["fetch_failures"] = fetch_failures
+    if "timings_ms" in result:
+        result["timings_ms"] = {
+            "fetch": fetch_ms,
+            **result["timings_ms"],
+            "total": round(result["timings_ms"]["total"] + fetch_ms, 1),
+        }
+    return result
 
 
-def _enrich_payload_supplier_codes(payload: dict[str, Any]) -> dict[str, Any]:
-    if not isinstance(payload, dict):
-        return payload
-    ingredients = payload.get("ingredients")
-    if not isinstance(ingredients, list):
-        return payload
-    if "fiches" not in connections.databases:
-        return payload
+def _ingredient_supplier_code(item: dict[str, Any]) -> str:
+    return str(item.get("supplierCode") or item.get("supplier_code") or "").strip()
 
-    product_ids: set[str] = set()
-    supplier_ids: set[str] = set()
-    ingredient_names: set[str] = set()
-    for item in ingredients:
-        if not isinstance(item, dict):
-            continue
-        supplier_code = str(item.get("supplierCode") or item.get("supplier_code") or "").strip()
-        if supplier_code:
-            continue
-        product_id = str(item.get("supplierProductId") or item.get("supplier_product_id") or "").strip()
-        if product_id:
-            product_ids.add(product_id)
-        supplier_id = str(item.get("supplierId") or item.get("supplier_id") or "").strip()
-        if supplier_id:
-            supplier_ids.add(supplier_id)
-        name = str(item.get("name") or item.get("ingredient") or item.get("ingredient_name_raw") or "").strip()
-        if name:
-            ingredient_names.add(_normalize_text(name))
+
+def _ingredient_supplier_product_id(item: dict[str, Any]) -> str:
+    return str(item.get("supplierProductId") or item.get("supplier_product_id") or "").strip()
+
+
+def _ingredient_supplier_id(item: dict[str, Any]) -> str:
+    return str(item.get("supplierId") or item.get("supplier_id") or "").strip()
+
+
+def _ingredient_name(item: dict[str, Any]) -> str:
+    return str(item.get("name") or item.get("ingredient") or item.get("ingredient_name_raw") or "").strip()
+
+
+def _enrich_payloads_supplier_codes(payloads: list[dict[str, Any]]) -> None:
+    """
+    Fill in missing ingredient supplierCode values from fiches supplier_products, in place, for every
+    payload at once: ids are collected across all payloads and looked up with one pair of queries.
+    """
+    pending = [
+        item
+        for payload in payloads
+        if isinstance(payload, dict) and isinstance(payload.get("ingredients"), list)
+        for item in payload["ingredients"]
+        if isinstance(item, dict) and not _ingredient_supplier_code(item)
+    ]
+    if not pending or "fiches" not in connections.databases:
+        return
+
+    product_ids = {_ingredient_supplier_product_id(item) for item in pending} - {""}
+    supplier_ids = {_ingredient_supplier_id(item) for item in pending} - {""}
+    has_names = any(_ingredient_name(item) for item in pending)
 
     id_lookup: dict[str, str] = {}
     name_lookup: dict[tuple[str, str], str] = {}
@@ -220,7 +287,7 @@ def _enrich_payload_supplier_codes(payload: dict[str, Any]) -> dict[str, Any]:
                     if source_code:
                         id_lookup[str(prod_id)] = str(source_code).strip()
 
-            if supplier_ids and ingredient_names:
+            if supplier_ids and has_names:
                 cursor.execute(
                     "SELECT supplier_id, name, source_code FROM supplier_products WHERE supplier_id = ANY(%s) AND source_code IS NOT NULL",
                     [list(supplier_ids)],
@@ -233,34 +300,205 @@ def _enrich_payload_supplier_codes(payload: dict[str, Any]) -> dict[str, Any]:
                         continue
                     name_lookup[(str(supplier_id), name_key)] = str(source_code).strip()
     except Exception:
-        return payload
+        return
 
     if not id_lookup and not name_lookup:
-        return payload
+        return
 
-    for item in ingredients:
-        if not isinstance(item, dict):
-            continue
-        current_code = str(item.get("supplierCode") or item.get("supplier_code") or "").strip()
-        if current_code:
-            continue
-        product_id = str(item.get("supplierProductId") or item.get("supplier_product_id") or "").strip()
+    for item in pending:
+        product_id = _ingredient_supplier_product_id(item)
         if product_id and product_id in id_lookup:
             item["supplierCode"] = id_lookup[product_id]
             continue
-        supplier_id = str(item.get("supplierId") or item.get("supplier_id") or "").strip()
-        name = str(item.get("name") or item.get("ingredient") or item.get("ingredient_name_raw") or "").strip()
+        supplier_id = _ingredient_supplier_id(item)
+        name = _ingredient_name(item)
         if supplier_id and name:
-            name_key = _normalize_text(name)
-            candidate = name_lookup.get((supplier_id, name_key))
+            candidate = name_lookup.get((supplier_id, _normalize_text(name)))
             if candidate:
                 item["supplierCode"] = candidate
 
-    return payload
+
+class _PhaseTimings:
+    """Wall-clock milliseconds per import phase, reported as `timings_ms`."""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.values: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.values[name] = round(self.values.get(name, 0) + elapsed_ms, 1)
+
+    def as_dict(self) -> dict[str, float]:
+        return {**self.values, "total": round((time.perf_counter() - self._started) * 1000, 1)}
+
+
+@dataclass
+class _SnapshotRow:
+    fiche_id: uuid.UUID
+    title: str
+    category: Any
+    portions: Decimal | None
+    source_updated_at: datetime | None
+    payload: dict[str, Any]
+    label: str
+    source_etag: str = ""
+    snapshot_hash: str = ""
+
+
+def _upsert_snapshot_rows(rows: list[_SnapshotRow], *, refresh_existing: bool) -> dict[str, Any]:
+    """
+    Insert new (fiche_product_id, snapshot_hash) versions and, with refresh_existing, rewrite the metadata
+    of existing ones. Existing rows are read once (without payloads); writes go through bulk_create with
+    ignore_conflicts / update_conflicts on the unique constraint, then the is_current pointer is moved.
+    Ingredients lists are stored once per content digest in RecipeIngredientBlock.
+    """
+    existing: dict[tuple[uuid.UUID, str], dict[str, Any]] = {}
+    fiche_ids = sorted({row.fiche_id for row in rows})
+    for start in range(0, len(fiche_ids), SNAPSHOT_UPSERT_BATCH_SIZE):
+        chunk = fiche_ids[start : start + SNAPSHOT_UPSERT_BATCH_SIZE]
+        for values in RecipeSnapshot.objects.filter(fiche_product_id__in=chunk).values(
+            "fiche_product_id", "snapshot_hash", *SNAPSHOT_METADATA_FIELDS, "source_etag"
+        ):
+            existing[(values["fiche_product_id"], values["snapshot_hash"])] = values
+
+    to_create: list[RecipeSnapshot] = []
+    to_refresh: list[RecipeSnapshot] = []
+    etag_only: list[RecipeSnapshot] = []
+    blocks: dict[str, RecipeIngredientBlock] = {}
+    seen: set[tuple[uuid.UUID, str]] = set()
+    created = 0
+    refreshed = 0
+    skipped_existing = 0
+    examples: list[str] = []
+    for row in rows:
+        key = (row.fiche_id, row.snapshot_hash)
+        current = existing.get(key)
+        if key in seen:
+            skipped_existing += 1
+            continue
+        seen.add(key)
+        payload, block = RecipeIngredientBlock.split_payload(row.payload)
+        snapshot = RecipeSnapshot(
+            fiche_product_id=row.fiche_id,
+            snapshot_hash=row.snapshot_hash,
+            title=row.title,
+            normalized_title=normalize_recipe_title(row.title),
+            category=row.category,
+            portions=row.portions,
+            source_updated_at=row.source_updated_at,
+            source_etag=row.source_etag or (current or {}).get("source_etag", ""),
+            payload=payload,
+            ingredients_block_id=block.digest if block is not None else None,
+        )
+        if block is not None and (current is None or refresh_existing):
+            blocks.setdefault(block.digest, block)
+        if current is None:
+            to_create.append(snapshot)
+            created += 1
+            if len(examples) < 5:
+                examples.append(row.label)
+            continue
+        # Same hash means same payload, so only the metadata columns can differ.
+        if refresh_existing and any(current[field] != getattr(snapshot, field) for field in SNAPSHOT_METADATA_FIELDS):
+            to_refresh.append(snapshot)
+            refreshed += 1
+            continue
+        skipped_existing += 1
+        if row.source_etag and row.source_etag != current["source_etag"]:
+            etag_only.append(snapshot)
+
+    unique_fields = ["fiche_product_id", "snapshot_hash"]
+    with transaction.atomic():
+        # Blocks are content-addressed: a digest already stored holds the same list.
+        RecipeIngredientBlock.objects.bulk_create(
+            blocks.values(), batch_size=SNAPSHOT_UPSERT_BATCH_SIZE, ignore_conflicts=True
+        )
+        RecipeSnapshot.objects.bulk_create(to_create, batch_size=SNAPSHOT_UPSERT_BATCH_SIZE, ignore_conflicts=True)
+        for batch, update_fields in (
+            (
+                to_refresh,
+                [*SNAPSHOT_METADATA_FIELDS, "normalized_title", "source_etag", "payload", "ingredients_block", "updated_at"],
+            ),
+            (etag_only, ["source_etag", "updated_at"]),
+        ):
+            if batch:
+                RecipeSnapshot.objects.bulk_create(
+                    batch,
+                    batch_size=SNAPSHOT_UPSERT_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=update_fields,
+                )
+        # New versions and refreshed source_updated_at values can change which version is current.
+        changed_fiche_ids = sorted({snapshot.fiche_product_id for snapshot in (*to_create, *to_refresh)})
+        for start in range(0, len(changed_fiche_ids), SNAPSHOT_UPSERT_BATCH_SIZE):
+            RecipeSnapshot.refresh_current(changed_fiche_ids[start : start + SNAPSHOT_UPSERT_BATCH_SIZE])
+    return {
+        "created": created,
+        "refreshed": refreshed,
+        "skipped_existing": skipped_existing,
+        "examples": examples,
+    }
+
+
+def _store_snapshot_rows(rows: list[_SnapshotRow], *, refresh_existing: bool, timings: _PhaseTimings) -> dict[str, Any]:
+    with timings.phase("enrich"):
+        _enrich_payloads_supplier_codes([row.payload for row in rows])
+    with timings.phase("hash"):
+        for row in rows:
+            row.snapshot_hash = _snapshot_hash(row.payload)
+    with timings.phase("upsert"):
+        return _upsert_snapshot_rows(rows, refresh_existing=refresh_existing)
+
+
+def _snapshot_rows_from_db(rows) -> tuple[list[_SnapshotRow], dict[str, int]]:
+    """Parse fiches DB rows (id, title, data, updated_at) into snapshot rows, counting the rejected ones."""
+    counters = {"invalid_ids": 0, "remapped_ids": 0, "invalid_payloads": 0}
+    snapshot_rows: list[_SnapshotRow] = []
+    for fiche_id_raw, title, data, updated_at in rows:
+        fiche_id, was_remapped = _normalize_fiche_id(fiche_id_raw)
+        if not fiche_id:
+            counters["invalid_ids"] += 1
+            continue
+        if was_remapped:
+            counters["remapped_ids"] += 1
+
+        payload = data
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload)
+            except json.JSONDecodeError:
+                counters["invalid_payloads"] += 1
+                continue
+        if not isinstance(payload, dict):
+            counters["invalid_payloads"] += 1
+            continue
+
+        source_updated_at = None
+        if updated_at:
+            source_updated_at = updated_at if not isinstance(updated_at, str) else parse_datetime(updated_at)
+        snapshot_rows.append(
+            _SnapshotRow(
+                fiche_id=fiche_id,
+                title=str(title or payload.get("title") or "").strip(),
+                category=payload.get("category"),
+                portions=_to_decimal(payload.get("portions")),
+                source_updated_at=source_updated_at,
+                payload=payload,
+                label=str(title or payload.get("title") or fiche_id),
+            )
+        )
+    return snapshot_rows, counters
 
 
 def import_recipe_snapshots_from_v11_envelope(
-    envelope: dict[str, Any], refresh_existing: bool = False
+    envelope: dict[str, Any], refresh_existing: bool = False, source_etags: dict[str, str] | None = None
 ) -> dict[str, Any]:
     export_version = str(envelope.get("export_version") or "").strip()
     if export_version != "1.1":
@@ -274,85 +512,54 @@ def import_recipe_snapshots_from_v11_envelope(
     if not isinstance(fiches, list):
         return {"ok": False, "detail": "Invalid envelope: 'fiches' must be an array."}
 
-    created = 0
-    refreshed = 0
-    skipped_existing = 0
+    timings = _PhaseTimings()
     invalid_ids = 0
     remapped_ids = 0
     invalid_payloads = 0
-    examples: list[str] = []
+    rows: list[_SnapshotRow] = []
 
-    for fiche in fiches:
-        if not isinstance(fiche, dict):
-            invalid_payloads += 1
-            continue
+    with timings.phase("parse"):
+        for fiche in fiches:
+            if not isinstance(fiche, dict):
+                invalid_payloads += 1
+                continue
 
-        fiche_id_raw = fiche.get("fiche_id")
-        fiche_id, was_remapped = _normalize_fiche_id(fiche_id_raw)
-        if not fiche_id:
-            invalid_ids += 1
-            continue
-        if was_remapped:
-            remapped_ids += 1
-
-        payload = _normalize_fiche_payload_from_v11(fiche)
-        payload = _enrich_payload_supplier_codes(payload)
-        snapshot_hash = _snapshot_hash(payload)
-        title = str(fiche.get("title") or "").strip()
-        source_updated_at = parse_datetime(str(fiche.get("updated_at") or "")) if fiche.get("updated_at") else None
-        portions = _to_decimal(fiche.get("portions"))
-
-        snapshot, was_created = RecipeSnapshot.objects.get_or_create(
-            fiche_product_id=fiche_id,
-            snapshot_hash=snapshot_hash,
-            defaults={
-                "title": title,
-                "category": fiche.get("category"),
-                "portions": portions,
-                "source_updated_at": source_updated_at,
-                "payload": payload,
-            },
-        )
-        if was_created:
-            created += 1
-            if len(examples) < 5:
-                examples.append(title or str(fiche_id))
-        else:
-            if refresh_existing:
-                update_fields: list[str] = []
-                if snapshot.title != title:
-                    snapshot.title = title
-                    update_fields.append("title")
-                if snapshot.category != fiche.get("category"):
-                    snapshot.category = fiche.get("category")
-                    update_fields.append("category")
-                if snapshot.portions != portions:
-                    snapshot.portions = portions
-                    update_fields.append("portions")
-                if snapshot.source_updated_at != source_updated_at:
-                    snapshot.source_updated_at = source_updated_at
-                    update_fields.append("source_updated_at")
-                if snapshot.payload != payload:
-                    snapshot.payload = payload
-                    update_fields.append("payload")
-                if update_fields:
-                    snapshot.save(update_fields=update_fields)
-                    refreshed += 1
-                else:
-                    skipped_existing += 1
-            else:
-                skipped_existing += 1
+            fiche_id_raw = fiche.get("fiche_id")
+            fiche_id, was_remapped = _normalize_fiche_id(fiche_id_raw)
+            if not fiche_id:
+                invalid_ids += 1
+                continue
+            if was_remapped:
+                remapped_ids += 1
+
+            title = str(fiche.get("title") or "").strip()
+            rows.append(
+                _SnapshotRow(
+                    fiche_id=fiche_id,
+                    title=title,
+                    category=fiche.get("category"),
+                    portions=_to_decimal(fiche.get("portions")),
+                    source_updated_at=(
+                        parse_datetime(str(fiche.get("updated_at") or "")) if fiche.get("updated_at") else None
+                    ),
+                    payload=_normalize_fiche_payload_from_v11(fiche),
+                    label=title or str(fiche_id),
+                    source_etag=(source_etags or {}).get(str(fiche_id_raw), ""),
+                )
+            )
 
+    stored = _store_snapshot_rows(rows, refresh_existing=refresh_existing, timings=timings)
     return {
         "ok": True,
         "total_read": len(fiches),
-        "created": created,
-        "refreshed": refreshed,
-        "skipped_existing": skipped_existing,
+        "created": stored["created"],
+        "refreshed": stored["refreshed"],
+        "skipped_existing": stored["skipped_existing"],
         "invalid_ids": invalid_ids,
         "remapped_ids": remapped_ids,
         "invalid_payloads": invalid_payloads,
-        "examples": examples,
+        "examples": stored["examples"],
+        "timings_ms": timings.as_dict(),
     }
 
 
@@ -383,98 +590,170 @@ def import_recipe_snapshots(query: str = "", limit: int = 500, refresh_existing:
     sql += f" ORDER BY {updated_col} DESC NULLS LAST LIMIT %s"
     params.append(limit)
 
+    timings = _PhaseTimings()
     try:
-        with connections["fiches"].cursor() as cursor:
+        with timings.phase("read"), connections["fiches"].cursor() as cursor:
             cursor.execute(sql, params)
             rows = cursor.fetchall()
     except Exception as exc:
         return {"ok": False, "detail": f"Impossibile leggere DB fiches: {exc}"}
 
-    created = 0
-    refreshed = 0
-    skipped_existing = 0
-    invalid_ids = 0
-    remapped_ids = 0
-    invalid_payloads = 0
-    examples: list[str] = []
+    with timings.phase("parse"):
+        snapshot_rows, counters = _snapshot_rows_from_db(rows)
 
-    for fiche_id_raw, title, data, updated_at in rows:
-        fiche_id, was_remapped = _normalize_fiche_id(fiche_id_raw)
-        if not fiche_id:
-            invalid_ids += 1
-            continue
-        if was_remapped:
-            remapped_ids += 1
+    stored = _store_snapshot_rows(snapshot_rows, refresh_existing=refresh_existing, timings=timings)
+    return {
+        "ok": True,
+        "total_read": len(rows),
+        "created": stored["created"],
+        "refreshed": stored["refreshed"],
+        "skipped_existing": stored["skipped_existing"],
+        **counters,
+        "examples": stored["examples"],
+        "timings_ms": timings.as_dict(),
+    }
 
-        payload = data
-        if isinstance(payload, str):
-            try:
-                payload = json.loads(payload)
-            except json.JSONDecodeError:
-                invalid_payloads += 1
-                continue
-        if not isinstance(payload, dict):
-            invalid_payloads += 1
-            continue
 
-        payload = _enrich_payload_supplier_codes(payload)
-        snapshot_hash = _snapshot_hash(payload)
-        source_updated_at = None
-        if updated_at:
-            source_updated_at = updated_at if not isinstance(updated_at, str) else parse_datetime(updated_at)
+RECIPE_WATERMARK_SOURCE = "fiches:recipe_snapshots"
 
-        snapshot, was_created = RecipeSnapshot.objects.get_or_create(
-            fiche_product_id=fiche_id,
-            snapshot_hash=snapshot_hash,
-            defaults={
-                "title": str(title or payload.get("title") or "").strip(),
-                "category": payload.get("category"),
-                "portions": _to_decimal(payload.get("portions")),
-                "source_updated_at": source_updated_at,
-                "payload": payload,
-            },
-        )
-        if was_created:
-            created += 1
-            if len(examples) < 5:
-                examples.append(str(title or payload.get("title") or fiche_id))
-        else:
-            if refresh_existing:
-                next_title = str(title or payload.get("title") or "").strip()
-                next_category = payload.get("category")
-                next_portions = _to_decimal(payload.get("portions"))
-                update_fields: list[str] = []
-                if snapshot.title != next_title:
-                    snapshot.title = next_title
-                    update_fields.append("title")
-                if snapshot.category != next_category:
-                    snapshot.category = next_category
-                    update_fields.append("category")
-                if snapshot.portions != next_portions:
-                    snapshot.portions = next_portions
-                    update_fields.append("portions")
-                if snapshot.source_updated_at != source_updated_at:
-                    snapshot.source_updated_at = source_updated_at
-                    update_fields.append("source_updated_at")
-                if snapshot.payload != payload:
-                    snapshot.payload = payload
-                    update_fields.append("payload")
-                if update_fields:
-                    snapshot.save(update_fields=update_fields)
-                    refreshed += 1
-                else:
-                    skipped_existing += 1
-            else:
-                skipped_existing += 1
+
+def _apply_incremental_page(rows, watermark: SyncWatermark, *, timings: _PhaseTimings) -> dict[str, Any]:
+    """
+    Store one keyset page of (id, title, data, updated_at, active) fiches DB rows and advance the watermark
+    past its last row. Inactive rows only flip source_active on the local versions of that fiche.
+    """
+    active_rows = [row[:4] for row in rows if row[4] is not False]
+    inactive_ids = {_normalize_fiche_id(row[0])[0] for row in rows if row[4] is False} - {None}
+
+    with timings.phase("parse"):
+        snapshot_rows, counters = _snapshot_rows_from_db(active_rows)
+    stored = _store_snapshot_rows(snapshot_rows, refresh_existing=True, timings=timings)
+
+    last_id, _title, _data, last_updated_at, _active = rows[-1]
+    if isinstance(last_updated_at, str):
+        last_updated_at = parse_datetime(last_updated_at)
+    with timings.phase("flags"), transaction.atomic():
+        reactivated = RecipeSnapshot.objects.filter(
+            fiche_product_id__in={row.fiche_id for row in snapshot_rows}, source_active=False
+        ).update(source_active=True, updated_at=datetime.now(dt_timezone.utc))
+        deactivated = 0
+        if inactive_ids:
+            deactivated = RecipeSnapshot.objects.filter(fiche_product_id__in=inactive_ids, source_active=True).update(
+                source_active=False, updated_at=datetime.now(dt_timezone.utc)
+            )
+        watermark.last_updated_at = last_updated_at
+        watermark.last_id = str(last_id)
+        watermark.synced_at = datetime.now(dt_timezone.utc)
+        watermark.save(update_fields=["last_updated_at", "last_id", "synced_at", "updated_at"])
+    return {
+        **stored,
+        **counters,
+        "reactivated": reactivated,
+        "deactivated": deactivated,
+    }
+
+
+def _deactivate_missing_fiches(source_ids: set[uuid.UUID]) -> int:
+    return (
+        RecipeSnapshot.objects.filter(source_active=True)
+        .exclude(fiche_product_id__in=source_ids)
+        .update(source_active=False, updated_at=datetime.now(dt_timezone.utc))
+    )
+
+
+def sync_recipe_snapshots_incremental(
+    *,
+    page_size: int = 500,
+    max_pages: int = 20,
+    detect_deletions: bool = False,
+    reset: bool = False,
+) -> dict[str, Any]:
+    """
+    Import only the fiches changed since the stored watermark, reading the fiches DB in
+    (updated_at, id) keyset pages. The watermark is saved after every page, so an interrupted
+    run resumes where it stopped. With the API configured, the API importer is used instead:
+    it already skips unchanged fiches by updatedAt and ETag.
+    """
+    if getattr(settings, "FICHES_API_BASE_URL", "").strip():
+        return import_recipe_snapshots_from_api(limit=5000)
+
+    if "fiches" not in connections.databases:
+        return {"ok": False, "detail": "FICHES DB non configurato."}
+
+    table_name = _safe_identifier(getattr(settings, "FICHES_RECIPE_TABLE", "public.fiches"), "public.fiches")
+    id_col = _safe_identifier(getattr(settings, "FICHES_RECIPE_ID_COLUMN", "id"), "id")
+    title_col = _safe_identifier(getattr(settings, "FICHES_RECIPE_TITLE_COLUMN", "title"), "title")
+    data_col = _safe_identifier(getattr(settings, "FICHES_RECIPE_DATA_COLUMN", "data"), "data")
+    updated_col = _safe_identifier(getattr(settings, "FICHES_RECIPE_UPDATED_AT_COLUMN", "updated_at"), "updated_at")
+    active_col = _safe_optional_identifier(getattr(settings, "FICHES_RECIPE_ACTIVE_COLUMN", ""))
+
+    page_size = max(1, min(int(page_size), 5000))
+    max_pages = max(1, int(max_pages))
+    watermark, _created = SyncWatermark.objects.get_or_create(source=RECIPE_WATERMARK_SOURCE)
+    if reset:
+        watermark.last_updated_at = None
+        watermark.last_id = ""
+        watermark.save(update_fields=["last_updated_at", "last_id", "updated_at"])
+
+    select_sql = (
+        f"SELECT {id_col}::text, {title_col}, {data_col}, {updated_col}, "
+        f"{f'{active_col} IS NOT FALSE' if active_col else 'TRUE'} "
+        f"FROM {table_name} WHERE {data_col} IS NOT NULL AND {updated_col} IS NOT NULL"
+    )
+    order_sql = f" ORDER BY {updated_col} ASC, {id_col}::text ASC LIMIT %s"
+
+    totals = {
+        "total_read": 0,
+        "created": 0,
+        "refreshed": 0,
+        "skipped_existing": 0,
+        "invalid_ids": 0,
+        "remapped_ids": 0,
+        "invalid_payloads": 0,
+        "reactivated": 0,
+        "deactivated": 0,
+    }
+    examples: list[str] = []
+    timings = _PhaseTimings()
+    pages = 0
+    has_more = True
+    try:
+        with connections["fiches"].cursor() as cursor:
+            while has_more and pages < max_pages:
+                sql, params = select_sql, []
+                if watermark.last_updated_at is not None:
+                    sql += f" AND ({updated_col}, {id_col}::text) > (%s, %s)"
+                    params += [watermark.last_updated_at, watermark.last_id]
+                with timings.phase("read"):
+                    cursor.execute(sql + order_sql, [*params, page_size])
+                    rows = cursor.fetchall()
+                has_more = len(rows) == page_size
+                if not rows:
+                    break
+                pages += 1
+                page = _apply_incremental_page(rows, watermark, timings=timings)
+                totals["total_read"] += len(rows)
+                for key in totals.keys() - {"total_read"}:
+                    totals[key] += page[key]
+                examples.extend(page["examples"][: 5 - len(examples)])
+
+            if detect_deletions and not has_more:
+                with timings.phase("deletions"):
+                    cursor.execute(f"SELECT {id_col}::text FROM {table_name}")
+                    source_ids = {_normalize_fiche_id(row[0])[0] for row in cursor.fetchall()} - {None}
+                    totals["deactivated"] += _deactivate_missing_fiches(source_ids)
+    except Exception as exc:
+        return {"ok": False, "detail": f"Impossibile leggere DB fiches: {exc}", **totals, "pages": pages}
 
     return {
         "ok": True,
-        "total_read": len(rows),
-        "created": created,
-        "refreshed": refreshed,
-        "skipped_existing": skipped_existing,
-        "invalid_ids": invalid_ids,
-        "remapped_ids": remapped_ids,
-        "invalid_payloads": invalid_payloads,
+        **totals,
+        "pages": pages,
+        "has_more": has_more,
+        "watermark": {
+            "last_updated_at": watermark.last_updated_at.isoformat() if watermark.last_updated_at else None,
+            "last_id": watermark.last_id,
+        },
         "examples": examples,
+        "timings_ms": timings.as_dict(),
     }
@@ -97,7 +97,9 @@ def fetch_recipe_titles(query: str = "", limit: int = 30) -> list[dict[str, obje
             # Fallback to local snapshots when fiches DB is unavailable in current env/test.
             pass
 
-    queryset = RecipeSnapshot.objects.values("fiche_product_id", "title", "portions", "category")
+    queryset = RecipeSnapshot.objects.filter(is_current=True, source_active=True).values(
+        "fiche_product_id", "title", "portions", "category"
+    )
     if query:
         queryset = queryset.filter(title__icontains=query)
     titles = queryset.order_by("title").distinct()[:limit]
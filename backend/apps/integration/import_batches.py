@@ -4,8 +4,24 @@ from django.utils import timezone
 
 from apps.integration.models import IntegrationImportBatch
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only where orjson is missing
+    orjson = None
+
+# Datetimes and dataclasses go through default=str, as they do with the stdlib encoder.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+)
+
 
 def normalize_payload(data):
+    """JSON-safe copy of `data`: json.loads(json.dumps(data, default=str)), through orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(orjson.dumps(data, default=str, option=_ORJSON_OPTIONS))
+        except orjson.JSONEncodeError:
+            pass
     return json.loads(json.dumps(data, default=str))
 
 
@@ -0,0 +1,87 @@
+import io
+import mimetypes
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.integration.services.ocr_preprocessing import preprocess_for_extraction
+
+
+def _synthetic_corpus() -> list[tuple[str, str, bytes]]:
+    try:
+        from PIL import Image, ImageDraw
+        from pypdf import PdfWriter
+    except Exception as exc:
+        raise CommandError(f"Synthetic corpus needs Pillow and pypdf: {exc}") from exc
+
+    corpus: list[tuple[str, str, bytes]] = []
+    for name, size in (("phone-label-12mp.jpg", (4032, 3024)), ("phone-label-8mp.jpg", (3264, 2448))):
+        image = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(image)
+        for row in range(0, size[1], 48):
+            draw.text((40, row), "LOT A23-4471  DLC 12/11/2026  POIDS NET 2,350 KG", fill="black")
+        exif = image.getexif()
+        exif[0x0112] = 1
+        exif[0x010F] = "PhoneMaker"
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=95, exif=exif)
+        corpus.append((name, "image/jpeg", buffer.getvalue()))
+
+    scan = io.BytesIO()
+    Image.new("RGB", (1240, 1754), "white").save(scan, format="PDF", resolution=150)
+    scan.seek(0)
+    writer = PdfWriter(clone_from=scan)
+    for _ in range(3):
+        writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    corpus.append(("invoice-with-blank-annex.pdf", "application/pdf", buffer.getvalue()))
+    return corpus
+
+
+def _directory_corpus(path: Path) -> list[tuple[str, str, bytes]]:
+    if not path.is_dir():
+        raise CommandError(f"{path} is not a directory.")
+    corpus = []
+    for item in sorted(path.iterdir()):
+        if not item.is_file():
+            continue
+        content_type = mimetypes.guess_type(item.name)[0] or "application/octet-stream"
+        corpus.append((item.name, content_type, item.read_bytes()))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = "Misura riduzione byte e tempi del preprocessing OCR su una cartella di file (o su un corpus sintetico)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="", help="Cartella con immagini/PDF reali. Senza, usa un corpus sintetico.")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        path = str(options["path"] or "").strip()
+        corpus = _directory_corpus(Path(path)) if path else _synthetic_corpus()
+        if not corpus:
+            raise CommandError("Corpus is empty.")
+        repeat = max(1, int(options["repeat"]))
+
+        total_before = 0
+        total_after = 0
+        for name, content_type, data in corpus:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                prepared = preprocess_for_extraction(data, content_type)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+            total_before += prepared.original_bytes
+            total_after += prepared.processed_bytes
+            ratio = prepared.processed_bytes / prepared.original_bytes if prepared.original_bytes else 1
+            self.stdout.write(
+                f"{name} {content_type} before={prepared.original_bytes} after={prepared.processed_bytes} "
+                f"ratio={ratio:.3f} ms={elapsed_ms:.1f} steps={','.join(prepared.steps) or '-'}"
+                + (f" skipped={prepared.skipped_reason}" if prepared.skipped_reason else "")
+            )
+        ratio = total_after / total_before if total_before else 1
+        self.stdout.write(
+            self.style.SUCCESS(f"TOTAL files={len(corpus)} before={total_before} after={total_after} ratio={ratio:.3f}")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.integration.services.extraction_queue import default_worker_id, run_extraction_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Esegue le estrazioni Claude in coda (EXTRACTION_QUEUE_ASYNC=true). "
+        "Avviare piu processi per lavorare in parallelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--worker-id", default="", help="Identificativo del worker (default host:pid).")
+        parser.add_argument("--once", action="store_true", help="Svuota la coda eseguibile e termina.")
+        parser.add_argument("--max-jobs", type=int, default=None)
+        parser.add_argument("--poll-seconds", type=float, default=None)
+
+    def handle(self, *args, **options):
+        worker_id = str(options["worker_id"] or "").strip() or default_worker_id()
+        self.stdout.write(f"Extraction worker {worker_id} started.")
+        processed = run_extraction_worker(
+            worker_id=worker_id,
+            once=bool(options["once"]),
+            max_jobs=options["max_jobs"],
+            poll_seconds=options["poll_seconds"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Extraction worker {worker_id} processed={processed}"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.integration.fiches_snapshots import sync_recipe_snapshots_incremental
+
+
+class Command(BaseCommand):
+    help = "Importa solo le fiches modificate dall'ultimo watermark (updated_at, id) e aggiorna lo stato attivo."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=500)
+        parser.add_argument("--max-pages", type=int, default=20)
+        parser.add_argument(
+            "--detect-deletions",
+            action="store_true",
+            dest="detect_deletions",
+            help="Disattiva gli snapshot delle fiches non piu presenti nel DB sorgente.",
+        )
+        parser.add_argument("--reset", action="store_true", help="Riparte dall'inizio ignorando il watermark salvato.")
+
+    def handle(self, *args, **options):
+        result = sync_recipe_snapshots_incremental(
+            page_size=options["page_size"],
+            max_pages=options["max_pages"],
+            detect_deletions=bool(options["detect_deletions"]),
+            reset=bool(options["reset"]),
+        )
+        if not result.get("ok"):
+            raise CommandError(result.get("detail", "Sync failed"))
+
+        watermark = result.get("watermark") or {}
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. read={result.get('total_read', 0)} created={result.get('created', 0)} "
+                f"refreshed={result.get('refreshed', 0)} deactivated={result.get('deactivated', 0)} "
+                f"pages={result.get('pages', '-')} has_more={result.get('has_more', False)} "
+                f"watermark={watermark.get('last_updated_at')}"
+            )
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:38
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0007_extraction_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractionCacheEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_sha256', models.CharField(max_length=64)),
+                ('document_type', models.CharField(choices=[('goods_receipt', 'goods_receipt'), ('invoice', 'invoice'), ('label_capture', 'label_capture')], max_length=32)),
+                ('model', models.CharField(max_length=128)),
+                ('prompt_version', models.CharField(max_length=64)),
+                ('extractor_version', models.CharField(blank=True, max_length=32, null=True)),
+                ('raw_payload', models.JSONField(blank=True, default=dict)),
+                ('normalized_payload', models.JSONField(blank=True, default=dict)),
+                ('confidence', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'integration_extraction_cache_entry',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('file_sha256', 'document_type', 'model', 'prompt_version'), name='uq_extraction_cache_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0008_extraction_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipesnapshot',
+            name='source_etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
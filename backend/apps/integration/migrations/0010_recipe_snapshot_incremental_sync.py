@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:15
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0009_recipe_snapshot_source_etag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncWatermark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source', models.CharField(max_length=64, unique=True)),
+                ('last_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('last_id', models.CharField(blank=True, default='', max_length=255)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'integration_sync_watermark',
+                'ordering': ['source'],
+            },
+        ),
+        migrations.AddField(
+            model_name='recipesnapshot',
+            name='source_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+
+def _normalize(value):
+    # Frozen copy of apps.integration.models.normalize_recipe_title.
+    return " ".join(str(value or "").split()).casefold()
+
+
+def fill_current_pointer(apps, schema_editor):
+    RecipeSnapshot = apps.get_model("integration", "RecipeSnapshot")
+    seen = set()
+    pending = []
+    for snapshot in (
+        RecipeSnapshot.objects.order_by("fiche_product_id", "-source_updated_at", "-created_at")
+        .only("id", "fiche_product_id", "title")
+        .iterator(chunk_size=2000)
+    ):
+        snapshot.normalized_title = _normalize(snapshot.title)
+        snapshot.is_current = snapshot.fiche_product_id not in seen
+        seen.add(snapshot.fiche_product_id)
+        pending.append(snapshot)
+        if len(pending) >= 500:
+            RecipeSnapshot.objects.bulk_update(pending, ["normalized_title", "is_current"])
+            pending = []
+    RecipeSnapshot.objects.bulk_update(pending, ["normalized_title", "is_current"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("integration", "0010_recipe_snapshot_incremental_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipesnapshot",
+            name="is_current",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="recipesnapshot",
+            name="normalized_title",
+            field=models.CharField(blank=True, default="", editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_current_pointer, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="recipesnapshot",
+            index=models.Index(
+                condition=models.Q(("is_current", True)),
+                fields=["normalized_title"],
+                name="idx_recipe_snap_current_title",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="recipesnapshot",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_current", True)),
+                fields=("fiche_product_id",),
+                name="uq_integration_recipe_snapshot_current",
+            ),
+        ),
+    ]
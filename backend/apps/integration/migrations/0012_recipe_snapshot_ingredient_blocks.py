@@ -0,0 +1,76 @@
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _digest(ingredients):
+    # Frozen copy of apps.integration.models.RecipeIngredientBlock.digest_for.
+    serialized = json.dumps(ingredients, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def compact_payloads(apps, schema_editor):
+    RecipeSnapshot = apps.get_model("integration", "RecipeSnapshot")
+    RecipeIngredientBlock = apps.get_model("integration", "RecipeIngredientBlock")
+    snapshot_ids = list(
+        RecipeSnapshot.objects.filter(ingredients_block__isnull=True).order_by("id").values_list("id", flat=True)
+    )
+    for start in range(0, len(snapshot_ids), 200):
+        blocks = {}
+        pending = []
+        for snapshot in RecipeSnapshot.objects.filter(id__in=snapshot_ids[start : start + 200]).only("id", "payload"):
+            payload = snapshot.payload
+            ingredients = payload.get("ingredients") if isinstance(payload, dict) else None
+            if not isinstance(ingredients, list):
+                continue
+            digest = _digest(ingredients)
+            blocks.setdefault(digest, RecipeIngredientBlock(digest=digest, ingredients=ingredients))
+            snapshot.payload = {key: value for key, value in payload.items() if key != "ingredients"}
+            snapshot.ingredients_block_id = digest
+            pending.append(snapshot)
+        RecipeIngredientBlock.objects.bulk_create(blocks.values(), ignore_conflicts=True)
+        RecipeSnapshot.objects.bulk_update(pending, ["payload", "ingredients_block"])
+
+
+def expand_payloads(apps, schema_editor):
+    RecipeSnapshot = apps.get_model("integration", "RecipeSnapshot")
+    pending = []
+    for snapshot in RecipeSnapshot.objects.filter(ingredients_block__isnull=False).select_related("ingredients_block"):
+        snapshot.payload = {**snapshot.payload, "ingredients": snapshot.ingredients_block.ingredients}
+        snapshot.ingredients_block = None
+        pending.append(snapshot)
+    RecipeSnapshot.objects.bulk_update(pending, ["payload", "ingredients_block"], batch_size=200)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("integration", "0011_recipe_snapshot_current_pointer"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecipeIngredientBlock",
+            fields=[
+                ("digest", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("ingredients", models.JSONField(blank=True, default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "integration_recipe_ingredient_block",
+            },
+        ),
+        migrations.AddField(
+            model_name="recipesnapshot",
+            name="ingredients_block",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="snapshots",
+                to="integration.recipeingredientblock",
+            ),
+        ),
+        migrations.RunPython(compact_payloads, expand_payloads),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("integration", "0012_recipe_snapshot_ingredient_blocks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipesnapshot",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,6 +1,9 @@
-﻿import uuid
+﻿import hashlib
+import json
+import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from apps.catalog.models import SupplierProduct
 from apps.core.models import Site
@@ -42,30 +45,186 @@ class IntegrationImportBatch(models.Model):
         return f"{self.source}:{self.import_type}:{self.status}"
 
 
+def normalize_recipe_title(value: str | None) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+class RecipeIngredientBlock(models.Model):
+    """Content-addressed ingredients list shared by every snapshot version (and fiche) that carries it."""
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    ingredients = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "integration_recipe_ingredient_block"
+
+    def __str__(self) -> str:
+        return self.digest
+
+    @staticmethod
+    def digest_for(ingredients: list) -> str:
+        serialized = json.dumps(ingredients, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def split_payload(cls, payload: dict) -> tuple[dict, "RecipeIngredientBlock | None"]:
+        """
+        (payload without its top-level ingredients list, unsaved block holding that list).
+        Payloads in other shapes are returned whole, with no block.
+        """
+        ingredients = payload.get("ingredients") if isinstance(payload, dict) else None
+        if not isinstance(ingredients, list):
+            return payload, None
+        body = {key: value for key, value in payload.items() if key != "ingredients"}
+        return body, cls(digest=cls.digest_for(ingredients), ingredients=ingredients)
+
+
 class RecipeSnapshot(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     fiche_product_id = models.UUIDField()
     title = models.CharField(max_length=255)
+    # normalize_recipe_title(title); bulk writers must set it themselves since bulk_create skips save().
+    normalized_title = models.CharField(max_length=255, blank=True, default="", editable=False)
     category = models.CharField(max_length=128, blank=True, null=True)
     portions = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     snapshot_hash = models.CharField(max_length=128)
     source_updated_at = models.DateTimeField(blank=True, null=True)
+    # ETag of the fiches API response this version came from, sent back as If-None-Match.
+    source_etag = models.CharField(max_length=255, blank=True, default="")
+    # False once the fiche is deactivated or deleted at the source (applies to all its versions).
+    source_active = models.BooleanField(default=True)
+    # Marks the latest version of each fiche (by source_updated_at, then created_at); see refresh_current().
+    is_current = models.BooleanField(default=False, editable=False)
+    # Imported versions keep their ingredients list in a shared block and the rest of the fiche in payload;
+    # use full_payload to read the whole document.
     payload = models.JSONField(default=dict, blank=True)
+    ingredients_block = models.ForeignKey(
+        RecipeIngredientBlock,
+        on_delete=models.PROTECT,
+        related_name="snapshots",
+        blank=True,
+        null=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every write, bulk ones included (they must list it or set it explicitly); read by ETags.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    LATEST_FIRST = ("-source_updated_at", "-created_at")
 
     class Meta:
         db_table = "integration_recipe_snapshot"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["normalized_title"],
+                condition=models.Q(is_current=True),
+                name="idx_recipe_snap_current_title",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["fiche_product_id", "snapshot_hash"],
                 name="uq_integration_recipe_snapshot_fiche_hash",
-            )
+            ),
+            models.UniqueConstraint(
+                fields=["fiche_product_id"],
+                condition=models.Q(is_current=True),
+                name="uq_integration_recipe_snapshot_current",
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.title} [{self.snapshot_hash}]"
 
+    @property
+    def full_payload(self) -> dict:
+        payload = self.payload if isinstance(self.payload, dict) else {}
+        if self.ingredients_block_id is None:
+            return payload
+        return {**payload, "ingredients": self.ingredients_block.ingredients}
+
+    def save(self, *args, **kwargs):
+        self.normalized_title = normalize_recipe_title(self.title)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+            if "title" in update_fields:
+                kwargs["update_fields"].add("normalized_title")
+        # Only these columns (or a new row) can change which version of the fiche is current.
+        moves_current = (
+            self._state.adding
+            or update_fields is None
+            or not {"fiche_product_id", "source_updated_at", "created_at"}.isdisjoint(update_fields)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if moves_current:
+                self.is_current = self.pk in type(self).refresh_current([self.fiche_product_id])
+
+    @classmethod
+    def refresh_current(cls, fiche_product_ids) -> set[uuid.UUID]:
+        """Move the is_current flag of the given fiches to their latest version; returns the current ids."""
+        fiche_product_ids = list({*fiche_product_ids})
+        if not fiche_product_ids:
+            return set()
+        latest: dict[uuid.UUID, uuid.UUID] = {}
+        for snapshot_id, fiche_product_id in (
+            cls.objects.filter(fiche_product_id__in=fiche_product_ids)
+            .order_by("fiche_product_id", *cls.LATEST_FIRST)
+            .values_list("id", "fiche_product_id")
+        ):
+            latest.setdefault(fiche_product_id, snapshot_id)
+        with transaction.atomic():
+            # Clear first: the partial unique constraint allows one current row per fiche.
+            cls.objects.filter(fiche_product_id__in=fiche_product_ids, is_current=True).exclude(
+                id__in=latest.values()
+            ).update(is_current=False, updated_at=timezone.now())
+            cls.objects.filter(id__in=latest.values(), is_current=False).update(is_current=True, updated_at=timezone.now())
+        return set(latest.values())
+
+    @classmethod
+    def _current(cls, with_payload: bool):
+        queryset = cls.objects.filter(is_current=True)
+        return queryset.select_related("ingredients_block") if with_payload else queryset.defer("payload")
+
+    @classmethod
+    def current_for_fiche(cls, fiche_product_id, *, with_payload: bool = True):
+        return cls._current(with_payload).filter(fiche_product_id=fiche_product_id).first()
+
+    @classmethod
+    def current_for_title(cls, title: str | None, *, partial: bool = False, with_payload: bool = True):
+        """Latest current version of an active fiche whose title matches exactly (or contains it, with partial)."""
+        normalized = normalize_recipe_title(title)
+        if not normalized:
+            return None
+        lookup = "normalized_title__contains" if partial else "normalized_title"
+        return (
+            cls._current(with_payload)
+            .filter(source_active=True, **{lookup: normalized})
+            .order_by(*cls.LATEST_FIRST)
+            .first()
+        )
+
+
+class SyncWatermark(models.Model):
+    """Keyset position (source updated_at, source id) reached by an incremental import."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    source = models.CharField(max_length=64, unique=True)
+    last_updated_at = models.DateTimeField(blank=True, null=True)
+    last_id = models.CharField(max_length=255, blank=True, default="")
+    synced_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "integration_sync_watermark"
+        ordering = ["source"]
+
+    def __str__(self) -> str:
+        return f"{self.source}@{self.last_updated_at}"
+
 
 class RecipeIngredientLink(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -136,6 +295,7 @@ class IntegrationDocument(models.Model):
 
 class ExtractionStatus(models.TextChoices):
     PENDING = "pending", "pending"
+    RUNNING = "running", "running"
     SUCCEEDED = "succeeded", "succeeded"
     FAILED = "failed", "failed"
 
@@ -150,17 +310,55 @@ class DocumentExtraction(models.Model):
     normalized_payload = models.JSONField(default=dict, blank=True)
     confidence = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=1)
+    available_at = models.DateTimeField(blank=True, null=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=128, blank=True, null=True)
+    callback_url = models.URLField(max_length=500, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "integration_document_extraction"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="idx_extraction_queue"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.document_id}:{self.extractor_name}:{self.status}"
 
 
+class ExtractionCacheEntry(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file_sha256 = models.CharField(max_length=64)
+    document_type = models.CharField(max_length=32, choices=DocumentType.choices)
+    model = models.CharField(max_length=128)
+    prompt_version = models.CharField(max_length=64)
+    extractor_version = models.CharField(max_length=32, blank=True, null=True)
+    raw_payload = models.JSONField(default=dict, blank=True)
+    normalized_payload = models.JSONField(default=dict, blank=True)
+    confidence = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    last_hit_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "integration_extraction_cache_entry"
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["file_sha256", "document_type", "model", "prompt_version"],
+                name="uq_extraction_cache_key",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.document_type}:{self.file_sha256[:12]}:{self.model}"
+
+
 class ReconciliationDecisionStatus(models.TextChoices):
     REVIEW_REQUIRED = "review_required", "review_required"
     IGNORED = "ignored", "ignored"
@@ -1,12 +1,27 @@
 import base64
+import hashlib
 import json
+import logging
 import os
 import re
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Protocol
 
 from apps.integration.models import DocumentType, IntegrationDocument
 from apps.integration.services.document_storage import read_document_bytes
+from apps.integration.services.extraction_cache import (
+    ExtractionCacheKey,
+    extraction_cache_enabled,
+    lookup_cached_extraction,
+    store_cached_extraction,
+)
+from apps.integration.services.ocr_preprocessing import (
+    PreprocessedFile,
+    preprocess_for_extraction,
+    preprocessing_profile,
+)
+
+logger = logging.getLogger(__name__)
 
 PURCHASING_PRODUCT_CATEGORIES = [
     "epicerie",
@@ -30,6 +45,8 @@ class ClaudeExtractionResult:
     confidence: float | None = None
     error_message: str = ""
     extractor_version: str = "claude-v1"
+    # Transient failures (API/network errors) may be retried by the extraction queue.
+    retryable: bool = False
 
 
 def _build_schema_hint(document_type: str) -> dict[str, Any]:
@@ -152,47 +169,42 @@ def _extract_json_blob(text: str) -> dict[str, Any]:
     return {}
 
 
-def _read_document_bytes(document: IntegrationDocument) -> bytes:
-    file_bytes, _content_type = read_document_bytes(document)
-    return file_bytes
-
-
-def _run_claude_extraction(document: IntegrationDocument, file_bytes: bytes) -> ClaudeExtractionResult:
-    api_key = (os.getenv("ANTHROPIC_API_KEY") or "").strip()
-    if not api_key:
-        return ClaudeExtractionResult(
-            status="failed",
-            raw_payload={},
-            normalized_payload={},
-            error_message="ANTHROPIC_API_KEY is not configured.",
-        )
+def _resolve_model() -> str:
+    return os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-latest").strip()
 
-    try:
-        from anthropic import Anthropic
-    except Exception:
-        return ClaudeExtractionResult(
-            status="failed",
-            raw_payload={},
-            normalized_payload={},
-            error_message="anthropic SDK not installed.",
-        )
 
-    model = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-latest").strip()
+def _resolve_max_tokens() -> int:
     try:
-        max_tokens = int((os.getenv("ANTHROPIC_MAX_TOKENS", "12000") or "12000").strip())
+        return int((os.getenv("ANTHROPIC_MAX_TOKENS", "12000") or "12000").strip())
     except ValueError:
-        max_tokens = 12000
-    schema_hint = _build_schema_hint(document.document_type)
-    if document.document_type == DocumentType.INVOICE:
-        document_label = "invoice"
-    elif document.document_type == DocumentType.GOODS_RECEIPT:
-        document_label = "delivery note"
-    else:
-        document_label = "food traceability label"
-    prompt = (
-        "You are an OCR extraction engine for restaurant purchasing documents. "
-        f"Extract data from this {document_label} and return exactly one JSON object. "
-        "No markdown, no prose, no code fences, JSON only. "
+        return 12000
+
+
+OCR_ENGINE_INSTRUCTION = "You are an OCR extraction engine for restaurant purchasing documents. "
+JSON_ONLY_INSTRUCTION = "No markdown, no prose, no code fences, JSON only. "
+
+
+def _document_label(document_type: str) -> str:
+    if document_type == DocumentType.INVOICE:
+        return "invoice"
+    if document_type == DocumentType.GOODS_RECEIPT:
+        return "delivery note"
+    return "food traceability label"
+
+
+def _build_prompt(document_type: str) -> str:
+    return (
+        OCR_ENGINE_INSTRUCTION
+        + f"Extract data from this {_document_label(document_type)} and return exactly one JSON object. "
+        + JSON_ONLY_INSTRUCTION
+        + _extraction_rules(document_type)
+    )
+
+
+def _extraction_rules(document_type: str) -> str:
+    """Field rules and target schema shared by the single-document and label batch prompts."""
+    schema_hint = _build_schema_hint(document_type)
+    return (
         "Rules: keep decimal values as strings using dot separator; use null when not found; preserve line ordering; "
         "extract every visible line item with quantity and unit if present. "
         f"When a product category can be inferred from the line item, set product_category using only one of these values: {', '.join(PURCHASING_PRODUCT_CATEGORIES)}. "
@@ -205,12 +217,24 @@ def _run_claude_extraction(document: IntegrationDocument, file_bytes: bytes) ->
         "If supplier/site UUIDs are not present in the file, keep them as null. "
         f"Target schema: {json.dumps(schema_hint)}"
     )
-    content_type = (document.content_type or "application/pdf").strip().lower()
+
+
+def extraction_prompt_version(document_type: str) -> str:
+    """Short digest of the prompt (schema included) and preprocessing profile; changes with either."""
+    fingerprint = f"{_build_prompt(document_type)}|{preprocessing_profile()}"
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_document_bytes(document: IntegrationDocument) -> bytes:
+    file_bytes, _content_type = read_document_bytes(document)
+    return file_bytes
+
+
+def _source_block(content_type: str, file_bytes: bytes) -> dict[str, Any]:
     encoded = base64.b64encode(file_bytes).decode("ascii")
-    client = Anthropic(api_key=api_key)
     supported_image_types = {"image/jpeg", "image/png", "image/gif", "image/webp"}
     if content_type in supported_image_types:
-        source_block = {
+        return {
             "type": "image",
             "source": {
                 "type": "base64",
@@ -218,15 +242,47 @@ def _run_claude_extraction(document: IntegrationDocument, file_bytes: bytes) ->
                 "data": encoded,
             },
         }
-    else:
-        source_block = {
-            "type": "document",
-            "source": {
-                "type": "base64",
-                "media_type": "application/pdf",
-                "data": encoded,
-            },
-        }
+    return {
+        "type": "document",
+        "source": {
+            "type": "base64",
+            "media_type": "application/pdf",
+            "data": encoded,
+        },
+    }
+
+
+def _run_claude_extraction(
+    document: IntegrationDocument,
+    file_bytes: bytes,
+    content_type: str | None = None,
+) -> ClaudeExtractionResult:
+    api_key = (os.getenv("ANTHROPIC_API_KEY") or "").strip()
+    if not api_key:
+        return ClaudeExtractionResult(
+            status="failed",
+            raw_payload={},
+            normalized_payload={},
+            error_message="ANTHROPIC_API_KEY is not configured.",
+        )
+
+    try:
+        from anthropic import Anthropic
+    except Exception:
+        return ClaudeExtractionResult(
+            status="failed",
+            raw_payload={},
+            normalized_payload={},
+            error_message="anthropic SDK not installed.",
+        )
+
+    model = _resolve_model()
+    max_tokens = _resolve_max_tokens()
+    schema_hint = _build_schema_hint(document.document_type)
+    prompt = _build_prompt(document.document_type)
+    content_type = (content_type or document.content_type or "application/pdf").strip().lower()
+    client = Anthropic(api_key=api_key)
+    source_block = _source_block(content_type, file_bytes)
 
     try:
         response = client.messages.create(
@@ -249,6 +305,7 @@ def _run_claude_extraction(document: IntegrationDocument, file_bytes: bytes) ->
             raw_payload={"error": str(exc)},
             normalized_payload={},
             error_message=f"Claude API call failed: {exc}",
+            retryable=True,
         )
 
     text_chunks: list[str] = []
@@ -299,24 +356,237 @@ def _run_claude_extraction(document: IntegrationDocument, file_bytes: bytes) ->
     )
 
 
-def run_claude_extraction(document: IntegrationDocument) -> ClaudeExtractionResult:
+@dataclass
+class PreparedExtraction:
+    document: IntegrationDocument
+    # Set when no API call is needed (mock payload, cache hit or missing file).
+    result: ClaudeExtractionResult | None = None
+    cache_key: ExtractionCacheKey | None = None
+    file: PreprocessedFile | None = None
+
+
+def prepare_extraction(document: IntegrationDocument) -> PreparedExtraction:
     # Deterministic bypass for local tests/manual dry runs without external API calls.
     mock_payload = document.metadata.get("mock_claude_normalized_payload") if isinstance(document.metadata, dict) else None
     if isinstance(mock_payload, dict) and mock_payload:
-        return ClaudeExtractionResult(
-            status="succeeded",
-            raw_payload={"source": "mock"},
-            normalized_payload=mock_payload,
-            confidence=99.0,
-            extractor_version="mock",
+        return PreparedExtraction(
+            document=document,
+            result=ClaudeExtractionResult(
+                status="succeeded",
+                raw_payload={"source": "mock"},
+                normalized_payload=mock_payload,
+                confidence=99.0,
+                extractor_version="mock",
+            ),
         )
 
-    file_bytes = _read_document_bytes(document)
+    file_bytes: bytes | None = None
+    cache_key: ExtractionCacheKey | None = None
+    if extraction_cache_enabled():
+        metadata = document.metadata if isinstance(document.metadata, dict) else {}
+        file_sha256 = str(metadata.get("file_sha256") or "").strip()
+        if not file_sha256:
+            file_bytes = _read_document_bytes(document)
+            if file_bytes:
+                file_sha256 = hashlib.sha256(file_bytes).hexdigest()
+                document.metadata = {**metadata, "file_sha256": file_sha256}
+                document.save(update_fields=["metadata", "updated_at"])
+        if file_sha256:
+            cache_key = ExtractionCacheKey(
+                file_sha256=file_sha256,
+                document_type=document.document_type,
+                model=_resolve_model(),
+                prompt_version=extraction_prompt_version(document.document_type),
+            )
+            entry = lookup_cached_extraction(cache_key)
+            if entry is not None:
+                return PreparedExtraction(
+                    document=document,
+                    cache_key=cache_key,
+                    result=ClaudeExtractionResult(
+                        status="succeeded",
+                        raw_payload={**(entry.raw_payload or {}), "cache": "hit", "cache_entry_id": str(entry.id)},
+                        normalized_payload=entry.normalized_payload,
+                        confidence=float(entry.confidence) if entry.confidence is not None else None,
+                        extractor_version=entry.extractor_version or cache_key.model,
+                    ),
+                )
+
+    if file_bytes is None:
+        file_bytes = _read_document_bytes(document)
     if not file_bytes:
-        return ClaudeExtractionResult(
-            status="failed",
-            raw_payload={},
-            normalized_payload={},
-            error_message="Document file is missing or empty.",
+        return PreparedExtraction(
+            document=document,
+            result=ClaudeExtractionResult(
+                status="failed",
+                raw_payload={},
+                normalized_payload={},
+                error_message="Document file is missing or empty.",
+            ),
+        )
+    return PreparedExtraction(
+        document=document,
+        cache_key=cache_key,
+        file=preprocess_for_extraction(file_bytes, document.content_type or ""),
+    )
+
+
+def finalize_extraction(prepared: PreparedExtraction, result: ClaudeExtractionResult) -> ClaudeExtractionResult:
+    if prepared.file is not None:
+        result.raw_payload = {**result.raw_payload, "preprocessing": prepared.file.as_payload()}
+    if prepared.cache_key is not None:
+        if result.status == "succeeded":
+            store_cached_extraction(
+                prepared.cache_key,
+                extractor_version=result.extractor_version,
+                raw_payload=result.raw_payload,
+                normalized_payload=result.normalized_payload,
+                confidence=result.confidence,
+            )
+        result.raw_payload = {**result.raw_payload, "cache": "miss"}
+    return result
+
+
+def run_claude_extraction(document: IntegrationDocument) -> ClaudeExtractionResult:
+    prepared = prepare_extraction(document)
+    if prepared.result is not None:
+        return prepared.result
+    result = _run_claude_extraction(document, prepared.file.data, content_type=prepared.file.content_type)
+    return finalize_extraction(prepared, result)
+
+
+@dataclass
+class LabelBatchResponse:
+    # One normalized payload per submitted image, None when the image was not answered.
+    payloads: list[dict[str, Any] | None]
+    raw_payload: dict[str, Any]
+    model: str
+
+
+class LabelBatchBackend(Protocol):
+    def extract_labels(self, images: list[tuple[str, bytes]]) -> LabelBatchResponse:
+        ...
+
+
+def _build_label_batch_prompt(image_count: int) -> str:
+    # Own framing: the single-document "exactly one JSON object" instruction would contradict the labels list.
+    return (
+        OCR_ENGINE_INSTRUCTION
+        + f"You will receive {image_count} separate {_document_label(DocumentType.LABEL_CAPTURE)} images, "
+        "each preceded by its image_index. Extract each label independently and never mix values between images. "
+        'Return a single JSON object of the form {"labels": [...]} holding one entry per image, '
+        "each entry following the target schema below plus an integer image_index field. "
+        + JSON_ONLY_INSTRUCTION
+        + _extraction_rules(DocumentType.LABEL_CAPTURE)
+    )
+
+
+class AnthropicLabelBatchBackend:
+    """Sends several label images in a single messages.create call with one shared instruction prompt."""
+
+    def extract_labels(self, images: list[tuple[str, bytes]]) -> LabelBatchResponse:
+        api_key = (os.getenv("ANTHROPIC_API_KEY") or "").strip()
+        if not api_key:
+            raise RuntimeError("ANTHROPIC_API_KEY is not configured.")
+        from anthropic import Anthropic
+
+        model = _resolve_model()
+        content: list[dict[str, Any]] = [{"type": "text", "text": _build_label_batch_prompt(len(images))}]
+        for index, (content_type, file_bytes) in enumerate(images):
+            content.append({"type": "text", "text": f"image_index {index}:"})
+            content.append(_source_block(content_type, file_bytes))
+        response = Anthropic(api_key=api_key).messages.create(
+            model=model,
+            max_tokens=_resolve_max_tokens(),
+            temperature=0,
+            messages=[{"role": "user", "content": content}],
         )
-    return _run_claude_extraction(document, file_bytes)
+        output_text = "\n".join(
+            getattr(block, "text", "")
+            for block in getattr(response, "content", []) or []
+            if getattr(block, "type", "") == "text"
+        )
+        labels = _extract_json_blob(output_text).get("labels")
+        payloads: list[dict[str, Any] | None] = [None] * len(images)
+        for position, item in enumerate(labels if isinstance(labels, list) else []):
+            if not isinstance(item, dict):
+                continue
+            item = dict(item)
+            try:
+                index = int(item.pop("image_index", position))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(images) and payloads[index] is None and item:
+                payloads[index] = item
+        return LabelBatchResponse(payloads=payloads, raw_payload={"response_text": output_text}, model=model)
+
+
+def run_label_batch_extraction(
+    documents: list[IntegrationDocument],
+    *,
+    backend: LabelBatchBackend | None = None,
+) -> list[ClaudeExtractionResult]:
+    """
+    Extract several label captures with one batched request. Images the batch did not
+    answer (or every image, if the batch call fails) fall back to single-document calls.
+    """
+    prepared = [_prepare_or_crash(document) for document in documents]
+    results: list[ClaudeExtractionResult | None] = [item.result for item in prepared]
+    batch_indexes = [
+        index
+        for index, item in enumerate(prepared)
+        if item.result is None and item.document.document_type == DocumentType.LABEL_CAPTURE
+    ]
+    if len(batch_indexes) > 1:
+        backend = backend or AnthropicLabelBatchBackend()
+        try:
+            response = backend.extract_labels(
+                [(prepared[index].file.content_type, prepared[index].file.data) for index in batch_indexes]
+            )
+        except Exception as exc:
+            logger.warning("Label batch extraction failed, falling back to single calls: %s", exc)
+            response = None
+        for position, index in enumerate(batch_indexes):
+            payload = response.payloads[position] if response and position < len(response.payloads) else None
+            if not payload:
+                continue
+            results[index] = finalize_extraction(
+                prepared[index],
+                ClaudeExtractionResult(
+                    status="succeeded",
+                    raw_payload={**response.raw_payload, "batch": {"size": len(batch_indexes), "index": position}},
+                    normalized_payload=payload,
+                    extractor_version=response.model,
+                ),
+            )
+
+    for index, item in enumerate(prepared):
+        if results[index] is None:
+            # Caught per document: one broken fallback call must not fail the rest of the batch.
+            try:
+                results[index] = finalize_extraction(
+                    item,
+                    _run_claude_extraction(item.document, item.file.data, content_type=item.file.content_type),
+                )
+            except Exception as exc:
+                logger.exception("Label extraction crashed for document %s", item.document.pk)
+                results[index] = crash_result(exc)
+    return results
+
+
+def crash_result(exc: Exception) -> ClaudeExtractionResult:
+    return ClaudeExtractionResult(
+        status="failed",
+        raw_payload={"error": str(exc)},
+        normalized_payload={},
+        error_message=f"Claude extraction crashed: {exc}",
+        retryable=True,
+    )
+
+
+def _prepare_or_crash(document: IntegrationDocument) -> PreparedExtraction:
+    try:
+        return prepare_extraction(document)
+    except Exception as exc:
+        logger.exception("Label extraction crashed for document %s", document.pk)
+        return PreparedExtraction(document=document, result=crash_result(exc))
@@ -1,16 +1,68 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import os
+from collections.abc import Iterator
+
 from django.conf import settings
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 
 from apps.integration.models import IntegrationDocument
 from apps.integration.services.drive_client import DriveClient, DriveClientError
 
 
+DOCUMENT_STREAM_CHUNK_SIZE = 256 * 1024
+
+
 def _metadata_copy(document: IntegrationDocument) -> dict:
     return document.metadata.copy() if isinstance(document.metadata, dict) else {}
 
 
+class _HashingReader:
+    """Read-through wrapper computing SHA-256 and byte count while the stream is consumed."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.digest = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        if chunk:
+            self.digest.update(chunk)
+            self.bytes_read += len(chunk)
+        return chunk
+
+
+def _stream_size(stream) -> int:
+    size = getattr(stream, "size", None)
+    if isinstance(size, int):
+        return size
+    position = stream.tell()
+    end = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return end - position
+
+
+def _iter_file_chunks(handle, chunk_size: int) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _drive_client_for_document(document: IntegrationDocument, metadata: dict) -> DriveClient:
+    return DriveClient(
+        folder_id=str(metadata.get("storage_drive_folder_id") or settings.GOOGLE_DRIVE_FOLDER_ID).strip()
+        or resolve_drive_folder_id_for_document_type(document.document_type)
+    )
+
+
 def drive_storage_enabled() -> bool:
     return bool(
         settings.GOOGLE_DRIVE_UPLOAD_FOLDER_ID
@@ -34,17 +86,32 @@ def persist_document_binary(
     document: IntegrationDocument,
     filename: str,
     content_type: str,
-    binary: bytes,
+    binary: bytes | None = None,
+    stream=None,
+    size: int | None = None,
     metadata_updates: dict | None = None,
 ) -> IntegrationDocument:
+    """
+    Store a document binary on Drive (when configured) or in local media storage.
+    Pass either ``binary`` or a readable ``stream``; streams are copied chunk by chunk
+    and hashed on the fly so large scans never sit fully in memory.
+    """
     metadata = _metadata_copy(document)
     if isinstance(metadata_updates, dict):
         metadata.update(metadata_updates)
 
+    if stream is None:
+        stream = io.BytesIO(binary or b"")
+        size = len(binary or b"")
+    elif size is None:
+        size = _stream_size(stream)
+    reader = _HashingReader(stream)
+
     if drive_storage_enabled():
         target_folder_id = resolve_drive_folder_id_for_document_type(document.document_type)
         client = DriveClient(folder_id=target_folder_id)
-        uploaded = client.upload_file(filename=filename, binary=binary, content_type=content_type)
+        uploaded = client.upload_stream(filename=filename, stream=reader, size=size, content_type=content_type)
+        metadata["file_sha256"] = reader.digest.hexdigest()
         metadata.update(
             {
                 "storage_provider": "google_drive",
@@ -59,7 +126,8 @@ def persist_document_binary(
         document.save(update_fields=["metadata", "storage_path", "updated_at"])
         return document
 
-    document.file.save(filename, ContentFile(binary), save=False)
+    document.file.save(filename, File(reader, name=filename), save=False)
+    metadata["file_sha256"] = reader.digest.hexdigest()
     document.storage_path = document.file.name
     document.metadata = metadata
     document.save(update_fields=["file", "storage_path", "metadata", "updated_at"])
@@ -96,29 +164,47 @@ def link_document_to_existing_drive_file(
     return document
 
 
-def read_document_bytes(document: IntegrationDocument) -> tuple[bytes, str]:
+def open_document_stream(
+    document: IntegrationDocument,
+    *,
+    chunk_size: int = DOCUMENT_STREAM_CHUNK_SIZE,
+) -> tuple[Iterator[bytes] | None, str, int | None]:
+    """Return (chunk iterator, content type, content length) or a None iterator when no binary exists."""
     metadata = _metadata_copy(document)
+    fallback_content_type = (document.content_type or "application/octet-stream").strip()
     drive_file_id = str(metadata.get("storage_drive_file_id") or metadata.get("drive_file_id") or "").strip()
     if drive_file_id:
-        client = DriveClient(
-            folder_id=str(metadata.get("storage_drive_folder_id") or settings.GOOGLE_DRIVE_FOLDER_ID).strip()
-            or resolve_drive_folder_id_for_document_type(document.document_type)
-        )
-        headers, binary = client.download_file(drive_file_id)
-        content_type = (headers.get("Content-Type") or document.content_type or "application/octet-stream").strip()
-        return binary, content_type
+        client = _drive_client_for_document(document, metadata)
+        headers, chunks = client.stream_download(drive_file_id, chunk_size=chunk_size)
+        content_type = (headers.get("Content-Type") or fallback_content_type).strip()
+        try:
+            content_length = int(headers.get("Content-Length") or "")
+        except ValueError:
+            content_length = None
+        return chunks, content_type, content_length
 
     if document.file:
         try:
-            document.file.open("rb")
-            try:
-                return document.file.read(), (document.content_type or "application/octet-stream").strip()
-            finally:
-                document.file.close()
+            handle = document.file.storage.open(document.file.name, "rb")
         except FileNotFoundError:
-            return b"", (document.content_type or "application/octet-stream").strip()
+            return None, fallback_content_type, None
+        try:
+            content_length = document.file.storage.size(document.file.name)
+        except (FileNotFoundError, NotImplementedError):
+            content_length = None
+        if content_length == 0:
+            handle.close()
+            return None, fallback_content_type, None
+        return _iter_file_chunks(handle, chunk_size), fallback_content_type, content_length
 
-    return b"", (document.content_type or "application/octet-stream").strip()
+    return None, fallback_content_type, None
+
+
+def read_document_bytes(document: IntegrationDocument) -> tuple[bytes, str]:
+    chunks, content_type, _content_length = open_document_stream(document)
+    if chunks is None:
+        return b"", content_type
+    return b"".join(chunks), content_type
 
 
 def delete_document_binary(document: IntegrationDocument) -> None:
@@ -1,10 +1,18 @@
 import json
 import socket
+import time
 from urllib import error, parse, request
 
 from django.conf import settings
 
 
+DRIVE_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# Resumable upload chunks must be multiples of 256 KiB (Drive API requirement).
+DRIVE_UPLOAD_CHUNK_GRANULARITY = 256 * 1024
+DRIVE_UPLOAD_MAX_RETRIES = 4
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
 class DriveClientError(Exception):
     def __init__(self, status_code: int, payload):
         self.status_code = status_code
@@ -34,6 +42,30 @@ def _detail_from_payload(payload, fallback: str):
     return fallback
 
 
+def _resumable_chunk_size(value) -> int:
+    try:
+        requested = int(value)
+    except (TypeError, ValueError):
+        requested = 0
+    blocks = max(1, requested // DRIVE_UPLOAD_CHUNK_GRANULARITY)
+    return blocks * DRIVE_UPLOAD_CHUNK_GRANULARITY
+
+
+def _committed_offset(headers: dict) -> int:
+    # Drive reports the persisted byte range as "bytes=0-N"; no header means nothing was stored yet.
+    raw = ""
+    for key, value in headers.items():
+        if key.lower() == "range":
+            raw = str(value or "").strip()
+            break
+    if "-" not in raw:
+        return 0
+    try:
+        return int(raw.rsplit("-", 1)[1]) + 1
+    except ValueError:
+        return 0
+
+
 class DriveClient:
     def __init__(self, *, folder_id: str | None = None):
         self.folder_id = (folder_id or settings.GOOGLE_DRIVE_FOLDER_ID).strip()
@@ -120,25 +152,47 @@ class DriveClient:
     def list_folder_files(self, *, limit: int = 80):
         return list(self.iter_folder_files(limit=limit))
 
-    def _authorized_request(self, *, url: str, method: str, headers: dict | None = None, data: bytes | None = None):
-        token = self._access_token()
-        request_headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    def _authorized_open(self, *, url: str, method: str, headers: dict | None = None, data: bytes | None = None, token: str = ""):
+        request_headers = {"Authorization": f"Bearer {token or self._access_token()}", "Accept": "application/json"}
         if isinstance(headers, dict):
             request_headers.update(headers)
         req = request.Request(url=url, method=method, headers=request_headers, data=data)
         try:
-            with request.urlopen(req, timeout=self.timeout) as resp:
-                return dict(resp.headers.items()), resp.read()
+            return request.urlopen(req, timeout=self.timeout)
         except error.HTTPError as exc:
             body = _json_loads(exc.read())
             raise DriveClientError(exc.code, {"detail": _detail_from_payload(body, "Google Drive request failed."), "raw": body}) from exc
         except (error.URLError, TimeoutError, socket.timeout) as exc:
             raise DriveClientError(502, {"detail": f"Cannot reach Google Drive API: {exc}"}) from exc
 
+    def _authorized_request(self, *, url: str, method: str, headers: dict | None = None, data: bytes | None = None):
+        with self._authorized_open(url=url, method=method, headers=headers, data=data) as resp:
+            return dict(resp.headers.items()), resp.read()
+
     def download_file(self, file_id: str):
         url = f"https://www.googleapis.com/drive/v3/files/{parse.quote(file_id)}?alt=media&supportsAllDrives=true"
         return self._authorized_request(url=url, method="GET", headers={"Accept": "*/*"})
 
+    def stream_download(self, file_id: str, *, chunk_size: int = DRIVE_DOWNLOAD_CHUNK_SIZE):
+        """Open a media download and return (headers, chunk iterator) without buffering the file."""
+        url = f"https://www.googleapis.com/drive/v3/files/{parse.quote(file_id)}?alt=media&supportsAllDrives=true"
+        resp = self._authorized_open(url=url, method="GET", headers={"Accept": "*/*"})
+
+        def _iter_chunks():
+            try:
+                while True:
+                    try:
+                        chunk = resp.read(chunk_size)
+                    except (error.URLError, TimeoutError, socket.timeout) as exc:
+                        raise DriveClientError(502, {"detail": f"Google Drive download interrupted: {exc}"}) from exc
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                resp.close()
+
+        return dict(resp.headers.items()), _iter_chunks()
+
     def upload_file(self, *, filename: str, binary: bytes, content_type: str = "application/octet-stream"):
         boundary = "cookops-google-drive-upload"
         metadata = json.dumps({"name": filename, "parents": [self.folder_id]}).encode("utf-8")
@@ -158,6 +212,121 @@ class DriveClient:
             headers={"Content-Type": f"multipart/related; boundary={boundary}", "Accept": "application/json"},
             data=body,
         )
+        return self._uploaded_payload(raw)
+
+    def upload_stream(
+        self,
+        *,
+        filename: str,
+        stream,
+        size: int,
+        content_type: str = "application/octet-stream",
+        chunk_size: int | None = None,
+    ):
+        """
+        Upload a file-like object through a Drive resumable session.
+        Only one chunk is held in memory at a time; transient failures resume from the
+        offset Drive reports as committed instead of restarting the upload.
+        """
+        effective_chunk_size = _resumable_chunk_size(chunk_size or settings.GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE)
+        if size <= effective_chunk_size:
+            return self.upload_file(filename=filename, binary=stream.read(), content_type=content_type)
+
+        token = self._access_token()
+        session_url = self._start_resumable_session(
+            token=token,
+            filename=filename,
+            content_type=content_type,
+            size=size,
+        )
+        offset = 0
+        while offset < size:
+            chunk = stream.read(min(effective_chunk_size, size - offset))
+            if not chunk:
+                raise DriveClientError(400, {"detail": "Upload stream ended before the declared size."})
+            chunk_start = offset
+            chunk_end = chunk_start + len(chunk)
+            attempts = 0
+            probe = False
+            while offset < chunk_end:
+                try:
+                    status_code, headers, raw = self._send_upload_chunk(
+                        session_url=session_url,
+                        token=token,
+                        data=b"" if probe else chunk[offset - chunk_start :],
+                        offset=None if probe else offset,
+                        size=size,
+                    )
+                except DriveClientError as exc:
+                    attempts += 1
+                    if exc.status_code not in RETRYABLE_STATUS_CODES or attempts > DRIVE_UPLOAD_MAX_RETRIES:
+                        raise
+                    time.sleep(min(2 ** attempts, 16))
+                    probe = True
+                    continue
+                probe = False
+                if status_code in (200, 201):
+                    return self._uploaded_payload(raw)
+                committed = max(chunk_start, _committed_offset(headers))
+                if committed <= offset:
+                    # A 308 that commits nothing new counts against the same cap as transient errors.
+                    attempts += 1
+                    if attempts > DRIVE_UPLOAD_MAX_RETRIES:
+                        raise DriveClientError(
+                            502, {"detail": f"Google Drive resumable upload stalled at byte {offset} of {size}."}
+                        )
+                    time.sleep(min(2 ** attempts, 16))
+                offset = committed
+        raise DriveClientError(502, {"detail": "Google Drive resumable upload did not complete."})
+
+    def _start_resumable_session(self, *, token: str, filename: str, content_type: str, size: int) -> str:
+        metadata = json.dumps({"name": filename, "parents": [self.folder_id]}).encode("utf-8")
+        url = "https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&supportsAllDrives=true&fields=id,name,mimeType,webViewLink"
+        with self._authorized_open(
+            url=url,
+            method="POST",
+            headers={
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Type": content_type,
+                "X-Upload-Content-Length": str(size),
+            },
+            data=metadata,
+            token=token,
+        ) as resp:
+            session_url = str(resp.headers.get("Location") or "").strip()
+        if not session_url:
+            raise DriveClientError(502, {"detail": "Google Drive did not return a resumable upload session."})
+        return session_url
+
+    def _send_upload_chunk(self, *, session_url: str, token: str, data: bytes, offset: int | None, size: int):
+        # offset=None sends an empty status probe ("bytes */size") to ask Drive how much it already stored.
+        if offset is None:
+            content_range = f"bytes */{size}"
+        else:
+            content_range = f"bytes {offset}-{offset + len(data) - 1}/{size}"
+        req = request.Request(
+            url=session_url,
+            method="PUT",
+            data=data,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Length": str(len(data)),
+                "Content-Range": content_range,
+            },
+        )
+        try:
+            with request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, dict(resp.headers.items()), resp.read()
+        except error.HTTPError as exc:
+            if exc.code == 308:
+                return 308, dict(exc.headers.items()), b""
+            body = _json_loads(exc.read())
+            raise DriveClientError(exc.code, {"detail": _detail_from_payload(body, "Google Drive upload chunk failed."), "raw": body}) from exc
+        except (error.URLError, TimeoutError, socket.timeout) as exc:
+            raise DriveClientError(502, {"detail": f"Cannot reach Google Drive API: {exc}"}) from exc
+
+    @staticmethod
+    def _uploaded_payload(raw: bytes) -> dict:
         payload = _json_loads(raw)
         if not isinstance(payload, dict) or not str(payload.get("id") or "").strip():
             raise DriveClientError(502, {"detail": "Google Drive upload response did not include file id.", "raw": payload})
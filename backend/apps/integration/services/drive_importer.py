@@ -4,13 +4,18 @@ from dataclasses import dataclass
 
 from django.conf import settings
 from apps.core.models import Site
-from apps.integration.models import DocumentExtraction, DocumentStatus, IntegrationDocument
-from apps.integration.services.claude_extractor import run_claude_extraction
+from apps.integration.models import DocumentExtraction, DocumentType, IntegrationDocument
 from apps.integration.services.document_storage import (
     link_document_to_existing_drive_file,
     resolve_drive_folder_id_for_document_type,
 )
 from apps.integration.services.drive_client import DriveClient, DriveClientError
+from apps.integration.services.extraction_queue import (
+    enqueue_claude_extraction,
+    extraction_queue_async,
+    run_extraction_sync,
+    run_label_batch_sync,
+)
 
 
 def _document_exists_for_drive_file(site: Site, drive_file_id: str) -> bool:
@@ -80,6 +85,13 @@ def _create_drive_document(
     )
 
 
+def _record_extraction(created_row: dict, extraction: DocumentExtraction) -> None:
+    created_row["extraction_id"] = str(extraction.id)
+    created_row["extraction_status"] = extraction.status
+    if extraction.error_message:
+        created_row["extraction_error"] = extraction.error_message
+
+
 def import_drive_assets_for_site(
     *,
     site: Site,
@@ -96,8 +108,8 @@ def import_drive_assets_for_site(
     errors: list[dict] = []
     skipped_existing = 0
     skipped_invalid = 0
-    extracted_count = 0
     scanned_count = 0
+    deferred_labels: list[tuple[dict, IntegrationDocument]] = []
 
     for row in client.iter_folder_files(limit=scan_limit):
         scanned_count += 1
@@ -140,35 +152,25 @@ def import_drive_assets_for_site(
                 "extraction_status": "skipped",
             }
             if auto_extract:
-                result = run_claude_extraction(document)
-                extraction = DocumentExtraction.objects.create(
-                    document=document,
-                    extractor_name="claude",
-                    extractor_version=result.extractor_version,
-                    status=result.status,
-                    raw_payload=result.raw_payload,
-                    normalized_payload=result.normalized_payload,
-                    confidence=result.confidence,
-                    error_message=result.error_message,
-                )
-                document.status = (
-                    DocumentStatus.EXTRACTED
-                    if result.status == "succeeded"
-                    else DocumentStatus.FAILED
-                )
-                document.save(update_fields=["status", "updated_at"])
-                created_row["extraction_id"] = str(extraction.id)
-                created_row["extraction_status"] = extraction.status
-                if extraction.error_message:
-                    created_row["extraction_error"] = extraction.error_message
-                if extraction.status == "succeeded":
-                    extracted_count += 1
+                if extraction_queue_async():
+                    _record_extraction(created_row, enqueue_claude_extraction(document))
+                elif document_type == DocumentType.LABEL_CAPTURE:
+                    # Label photos are extracted together once the scan is done.
+                    deferred_labels.append((created_row, document))
+                else:
+                    _record_extraction(created_row, run_extraction_sync(document))
             created.append(created_row)
             if len(created) >= limit:
                 break
         except DriveClientError as exc:
             errors.append({"drive_file_id": drive_file_id, "detail": exc.payload})
 
+    if deferred_labels:
+        extractions = run_label_batch_sync([document for _row, document in deferred_labels])
+        for (created_row, _document), extraction in zip(deferred_labels, extractions):
+            _record_extraction(created_row, extraction)
+    extracted_count = sum(1 for row in created if row["extraction_status"] == "succeeded")
+
     return DriveImportResult(
         site=str(site.id),
         folder_id=client.folder_id,
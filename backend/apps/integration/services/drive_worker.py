@@ -10,6 +10,7 @@ from django.conf import settings
 from django.db import close_old_connections
 
 from apps.core.models import Site
+from apps.core.services.db_connections import release_thread_connections
 from apps.integration.services.drive_importer import import_drive_assets_for_site
 
 
@@ -61,6 +62,8 @@ def _worker_loop() -> None:
                         )
         except Exception:
             logger.exception("Drive import worker cycle failed")
+        finally:
+            release_thread_connections()
         time.sleep(interval)
 
 
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.integration.models import DocumentExtraction, ExtractionCacheEntry
+
+
+@dataclass(frozen=True)
+class ExtractionCacheKey:
+    file_sha256: str
+    document_type: str
+    model: str
+    prompt_version: str
+
+    def as_dict(self) -> dict[str, str]:
+        return asdict(self)
+
+
+def extraction_cache_enabled() -> bool:
+    return bool(getattr(settings, "EXTRACTION_CACHE_ENABLED", True))
+
+
+def lookup_cached_extraction(key: ExtractionCacheKey) -> ExtractionCacheEntry | None:
+    entry = ExtractionCacheEntry.objects.filter(**key.as_dict()).first()
+    if entry is not None:
+        ExtractionCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F("hit_count") + 1,
+            last_hit_at=timezone.now(),
+        )
+    return entry
+
+
+def store_cached_extraction(
+    key: ExtractionCacheKey,
+    *,
+    extractor_version: str,
+    raw_payload: dict[str, Any],
+    normalized_payload: dict[str, Any],
+    confidence: float | None,
+) -> ExtractionCacheEntry:
+    # First writer wins: two workers extracting the same file concurrently store one entry.
+    entry, _created = ExtractionCacheEntry.objects.get_or_create(
+        **key.as_dict(),
+        defaults={
+            "extractor_version": extractor_version,
+            "raw_payload": raw_payload,
+            "normalized_payload": normalized_payload,
+            "confidence": confidence,
+        },
+    )
+    return entry
+
+
+def extraction_cache_stats(*, since: datetime | None = None) -> dict[str, Any]:
+    extractions = DocumentExtraction.objects.filter(extractor_name="claude")
+    if since is not None:
+        extractions = extractions.filter(created_at__gte=since)
+    hits = extractions.filter(raw_payload__cache="hit").count()
+    misses = extractions.filter(raw_payload__cache="miss").count()
+    lookups = hits + misses
+    return {
+        "enabled": extraction_cache_enabled(),
+        "since": since.isoformat() if since else None,
+        "entries": ExtractionCacheEntry.objects.count(),
+        "lookups": lookups,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+        "total_entry_hits": ExtractionCacheEntry.objects.aggregate(total=Sum("hit_count"))["total"] or 0,
+    }
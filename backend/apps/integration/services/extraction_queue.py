@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from apps.core.services.db_connections import release_thread_connections
+from apps.integration.models import (
+    DocumentExtraction,
+    DocumentStatus,
+    DocumentType,
+    ExtractionStatus,
+    IntegrationDocument,
+)
+from apps.integration.services.claude_extractor import (
+    ClaudeExtractionResult,
+    crash_result,
+    run_claude_extraction,
+    run_label_batch_extraction,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CLAUDE_EXTRACTOR_NAME = "claude"
+
+
+def extraction_queue_async() -> bool:
+    return bool(getattr(settings, "EXTRACTION_QUEUE_ASYNC", False))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _retry_delay_seconds(attempts: int) -> int:
+    base = max(1, int(settings.EXTRACTION_QUEUE_RETRY_BASE_SECONDS))
+    ceiling = max(base, int(settings.EXTRACTION_QUEUE_RETRY_MAX_SECONDS))
+    return min(ceiling, base * 2 ** max(0, attempts - 1))
+
+
+def _queued_jobs():
+    # Only jobs created by the queue carry available_at; manual OCR extractions stay untouched.
+    return DocumentExtraction.objects.filter(extractor_name=CLAUDE_EXTRACTOR_NAME, available_at__isnull=False)
+
+
+def enqueue_claude_extraction(
+    document: IntegrationDocument,
+    *,
+    callback_url: str = "",
+    max_attempts: int | None = None,
+) -> DocumentExtraction:
+    extraction = DocumentExtraction.objects.create(
+        document=document,
+        extractor_name=CLAUDE_EXTRACTOR_NAME,
+        status=ExtractionStatus.PENDING,
+        max_attempts=max(1, int(max_attempts or settings.EXTRACTION_QUEUE_MAX_ATTEMPTS)),
+        available_at=timezone.now(),
+        callback_url=callback_url or None,
+    )
+    document.status = DocumentStatus.PROCESSING
+    document.save(update_fields=["status", "updated_at"])
+    return extraction
+
+
+def _create_sync_job(document: IntegrationDocument, *, callback_url: str = "") -> DocumentExtraction:
+    now = timezone.now()
+    return DocumentExtraction.objects.create(
+        document=document,
+        extractor_name=CLAUDE_EXTRACTOR_NAME,
+        status=ExtractionStatus.RUNNING,
+        attempts=1,
+        max_attempts=1,
+        available_at=now,
+        locked_at=now,
+        locked_by="sync",
+        callback_url=callback_url or None,
+    )
+
+
+def run_extraction_sync(document: IntegrationDocument, *, callback_url: str = "") -> DocumentExtraction:
+    """Run one extraction inline, bypassing the workers (tests and EXTRACTION_QUEUE_ASYNC=false)."""
+    return process_extraction_job(_create_sync_job(document, callback_url=callback_url))
+
+
+def run_label_batch_sync(documents: list[IntegrationDocument]) -> list[DocumentExtraction]:
+    """Inline counterpart of the worker label batching, in chunks of EXTRACTION_LABEL_BATCH_SIZE."""
+    batch_size = max(1, int(settings.EXTRACTION_LABEL_BATCH_SIZE))
+    extractions: list[DocumentExtraction] = []
+    for start in range(0, len(documents), batch_size):
+        jobs = [_create_sync_job(document) for document in documents[start : start + batch_size]]
+        extractions.extend(process_extraction_batch(jobs))
+    return extractions
+
+
+def release_stale_jobs() -> int:
+    """Give back jobs whose worker died mid-run; jobs out of attempts are failed instead."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=int(settings.EXTRACTION_QUEUE_LOCK_TIMEOUT_SECONDS))
+    released = 0
+    stale = _queued_jobs().filter(status=ExtractionStatus.RUNNING, locked_at__lt=cutoff).select_related("document")
+    for job in stale:
+        if job.attempts >= job.max_attempts:
+            _finish_job(
+                job,
+                ClaudeExtractionResult(
+                    status=ExtractionStatus.FAILED,
+                    raw_payload=job.raw_payload or {},
+                    normalized_payload={},
+                    error_message="Extraction worker stopped before completing the job.",
+                ),
+            )
+        else:
+            job.status = ExtractionStatus.PENDING
+            job.available_at = now
+            job.locked_at = None
+            job.locked_by = None
+            job.save(update_fields=["status", "available_at", "locked_at", "locked_by", "updated_at"])
+        released += 1
+    return released
+
+
+def claim_next_job(worker_id: str) -> DocumentExtraction | None:
+    """
+    Lock the next runnable job. Sites with fewer running jobs go first, then the site
+    waiting longest, so one site uploading a large batch cannot starve the others.
+    """
+    now = timezone.now()
+    ready = _queued_jobs().filter(status=ExtractionStatus.PENDING, available_at__lte=now)
+    running_by_site = {
+        row["document__site_id"]: row["total"]
+        for row in _queued_jobs()
+        .filter(status=ExtractionStatus.RUNNING)
+        .values("document__site_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    }
+    waiting_sites = sorted(
+        ready.values("document__site_id").annotate(oldest=Min("available_at")).order_by(),
+        key=lambda row: (running_by_site.get(row["document__site_id"], 0), row["oldest"]),
+    )
+    for row in waiting_sites:
+        with transaction.atomic():
+            job = (
+                ready.filter(document__site_id=row["document__site_id"])
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("available_at", "created_at")
+                .first()
+            )
+            if job is None:
+                continue
+            _mark_claimed(job, worker_id, now)
+            return job
+    return None
+
+
+def _mark_claimed(job: DocumentExtraction, worker_id: str, now) -> None:
+    job.status = ExtractionStatus.RUNNING
+    job.attempts += 1
+    job.locked_at = now
+    job.locked_by = worker_id
+    job.save(update_fields=["status", "attempts", "locked_at", "locked_by", "updated_at"])
+
+
+def claim_label_batch(job: DocumentExtraction, worker_id: str) -> list[DocumentExtraction]:
+    """Join other ready label captures of the same site to an already claimed job."""
+    batch_size = int(settings.EXTRACTION_LABEL_BATCH_SIZE)
+    if batch_size <= 1 or job.document.document_type != DocumentType.LABEL_CAPTURE:
+        return [job]
+    now = timezone.now()
+    with transaction.atomic():
+        companions = list(
+            _queued_jobs()
+            .filter(
+                status=ExtractionStatus.PENDING,
+                available_at__lte=now,
+                document__site_id=job.document.site_id,
+                document__document_type=DocumentType.LABEL_CAPTURE,
+            )
+            .exclude(pk=job.pk)
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("available_at", "created_at")[: batch_size - 1]
+        )
+        for companion in companions:
+            _mark_claimed(companion, worker_id, now)
+    return [job, *companions]
+
+
+def process_extraction_job(job: DocumentExtraction) -> DocumentExtraction:
+    document = job.document
+    try:
+        result = run_claude_extraction(document)
+    except Exception as exc:
+        logger.exception("Claude extraction crashed for document=%s", document.id)
+        result = crash_result(exc)
+    return _apply_result(job, result)
+
+
+def process_extraction_batch(jobs: list[DocumentExtraction]) -> list[DocumentExtraction]:
+    if len(jobs) == 1:
+        return [process_extraction_job(jobs[0])]
+    try:
+        results = run_label_batch_extraction([job.document for job in jobs])
+    except Exception as exc:
+        logger.exception("Label batch extraction crashed for %s jobs", len(jobs))
+        results = [crash_result(exc) for _ in jobs]
+    return [_apply_result(job, result) for job, result in zip(jobs, results)]
+
+
+def _apply_result(job: DocumentExtraction, result: ClaudeExtractionResult) -> DocumentExtraction:
+    if result.status != ExtractionStatus.SUCCEEDED and result.retryable and job.attempts < job.max_attempts:
+        job.status = ExtractionStatus.PENDING
+        job.raw_payload = result.raw_payload
+        job.error_message = result.error_message
+        job.available_at = timezone.now() + timedelta(seconds=_retry_delay_seconds(job.attempts))
+        job.locked_at = None
+        job.locked_by = None
+        job.save(
+            update_fields=[
+                "status",
+                "raw_payload",
+                "error_message",
+                "available_at",
+                "locked_at",
+                "locked_by",
+                "updated_at",
+            ]
+        )
+        return job
+    return _finish_job(job, result)
+
+
+def _finish_job(job: DocumentExtraction, result: ClaudeExtractionResult) -> DocumentExtraction:
+    succeeded = result.status == ExtractionStatus.SUCCEEDED
+    job.status = ExtractionStatus.SUCCEEDED if succeeded else ExtractionStatus.FAILED
+    job.extractor_version = result.extractor_version
+    job.raw_payload = result.raw_payload
+    job.normalized_payload = result.normalized_payload
+    job.confidence = result.confidence
+    job.error_message = result.error_message
+    job.locked_at = None
+    job.locked_by = None
+    job.save()
+    document = job.document
+    document.status = DocumentStatus.EXTRACTED if succeeded else DocumentStatus.FAILED
+    document.save(update_fields=["status", "updated_at"])
+    _notify_job_finished(job)
+    return job
+
+
+def is_allowed_callback_url(url: str) -> bool:
+    """Per-request callbacks may only target hosts listed in EXTRACTION_QUEUE_CALLBACK_ALLOWED_HOSTS."""
+    parts = urlsplit(url or "")
+    return parts.scheme in {"http", "https"} and (parts.hostname or "") in settings.EXTRACTION_QUEUE_CALLBACK_ALLOWED_HOSTS
+
+
+def _notify_job_finished(job: DocumentExtraction) -> None:
+    callback_url = settings.EXTRACTION_QUEUE_CALLBACK_URL
+    if job.callback_url:
+        if is_allowed_callback_url(job.callback_url):
+            callback_url = job.callback_url
+        else:
+            logger.warning("Extraction callback host not allowed extraction=%s url=%s", job.id, job.callback_url)
+    if not callback_url:
+        return
+    body = json.dumps(
+        {
+            "extraction_id": str(job.id),
+            "document_id": str(job.document_id),
+            "site": str(job.document.site_id),
+            "document_type": job.document.document_type,
+            "status": job.status,
+            "attempts": job.attempts,
+            "error_message": job.error_message or "",
+        }
+    ).encode("utf-8")
+    request = urllib.request.Request(
+        callback_url,
+        data=body,
+        method="POST",
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=settings.EXTRACTION_QUEUE_CALLBACK_TIMEOUT_SECONDS):
+            pass
+    except (urllib.error.URLError, OSError, ValueError) as exc:
+        logger.warning("Extraction callback failed extraction=%s url=%s: %s", job.id, callback_url, exc)
+
+
+def run_extraction_worker(
+    *,
+    worker_id: str = "",
+    once: bool = False,
+    max_jobs: int | None = None,
+    poll_seconds: float | None = None,
+) -> int:
+    """Process queued jobs until stopped; with once=True, drain the runnable queue and return."""
+    worker_id = worker_id or default_worker_id()
+    poll = max(0.5, float(settings.EXTRACTION_QUEUE_POLL_SECONDS if poll_seconds is None else poll_seconds))
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        if not connection.in_atomic_block:
+            close_old_connections()
+        release_stale_jobs()
+        job = claim_next_job(worker_id)
+        if job is None:
+            if once:
+                break
+            release_thread_connections()
+            time.sleep(poll)
+            continue
+        for job in process_extraction_batch(claim_label_batch(job, worker_id)):
+            processed += 1
+            logger.info(
+                "Extraction worker=%s extraction=%s document=%s status=%s attempts=%s",
+                worker_id,
+                job.id,
+                job.document_id,
+                job.status,
+                job.attempts,
+            )
+    return processed
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 8.0
+
+
+class FichesApiError(Exception):
+    def __init__(self, detail: str, status_code: int | None = None, retryable: bool = False):
+        self.detail = detail
+        self.status_code = status_code
+        self.retryable = retryable
+        super().__init__(detail)
+
+
+@dataclass
+class FicheFetchResult:
+    summary: dict[str, Any]
+    status: str  # "fetched" | "not_modified" | "failed"
+    payload: Any = None
+    etag: str = ""
+    error: str = ""
+
+    @property
+    def fiche_id(self) -> str:
+        return str(self.summary.get("id") or "").strip()
+
+
+class FichesApiClient:
+    """
+    GET-only JSON client for the fiches API. Each worker thread keeps its own keep-alive
+    connection; connection errors and RETRYABLE_STATUS_CODES are retried with full jitter.
+    """
+
+    def __init__(self, base_url: str, *, timeout: float | None = None, max_retries: int | None = None):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in {"http", "https"} or not parts.netloc:
+            raise FichesApiError(f"Invalid FICHES_API_BASE_URL: {base_url!r}")
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._base_path = parts.path
+        self.timeout = float(settings.FICHES_API_TIMEOUT_SECONDS if timeout is None else timeout)
+        self.max_retries = int(settings.FICHES_API_MAX_RETRIES if max_retries is None else max_retries)
+        self._local = threading.local()
+        self._connections: list[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connection_class(self._netloc, timeout=self.timeout)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _drop_connection(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+    def _get_once(self, path: str, headers: dict[str, str]) -> tuple[int, Any, str]:
+        try:
+            connection = self._connection()
+            connection.request("GET", f"{self._base_path}{path}", headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            # Also covers keep-alive sockets the server closed while idle.
+            self._drop_connection()
+            raise FichesApiError(f"Fiches API unreachable: {exc}", retryable=True) from exc
+        if response.will_close:
+            self._drop_connection()
+
+        etag = response.getheader("ETag") or ""
+        if response.status == 304:
+            return response.status, None, etag
+        if not 200 <= response.status < 300:
+            raise FichesApiError(
+                f"Fiches API HTTP error: {response.status}",
+                status_code=response.status,
+                retryable=response.status in RETRYABLE_STATUS_CODES,
+            )
+        try:
+            return response.status, json.loads(body.decode("utf-8")), etag
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise FichesApiError("Fiches API returned invalid JSON.", status_code=response.status) from exc
+
+    def get_json(self, path: str, *, etag: str = "") -> tuple[int, Any, str]:
+        """(status, payload, etag); with a matching `etag` the server may answer 304 and payload is None."""
+        headers = {"Accept": "application/json"}
+        if etag:
+            headers["If-None-Match"] = etag
+        attempt = 0
+        while True:
+            try:
+                return self._get_once(path, headers)
+            except FichesApiError as exc:
+                attempt += 1
+                if not exc.retryable or attempt > self.max_retries:
+                    raise
+            time.sleep(random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt)))
+
+    def fetch_fiches(
+        self,
+        summaries: list[dict[str, Any]],
+        *,
+        etags: dict[str, str] | None = None,
+        workers: int | None = None,
+    ) -> list[FicheFetchResult]:
+        """Fetch /fiches/<id> for every listing summary on a bounded pool; results keep the input order."""
+        etags = etags or {}
+
+        def fetch_one(summary: dict[str, Any]) -> FicheFetchResult:
+            fiche_id = str(summary.get("id") or "").strip()
+            try:
+                status_code, payload, etag = self.get_json(
+                    f"/fiches/{quote(fiche_id, safe='')}",
+                    etag=etags.get(fiche_id, ""),
+                )
+            except FichesApiError as exc:
+                return FicheFetchResult(summary, "failed", error=exc.detail)
+            if status_code == 304:
+                return FicheFetchResult(summary, "not_modified", etag=etag)
+            if not isinstance(payload, dict):
+                return FicheFetchResult(summary, "failed", error="Fiches API returned an invalid fiche payload.")
+            return FicheFetchResult(summary, "fetched", payload=payload, etag=etag)
+
+        if not summaries:
+            return []
+        max_workers = max(1, min(int(settings.FICHES_API_WORKERS if workers is None else workers), len(summaries)))
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fiches-fetch") as executor:
+                return list(executor.map(fetch_one, summaries))
+        finally:
+            self.close()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+
+
+REENCODABLE_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+
+@dataclass
+class PreprocessedFile:
+    data: bytes
+    content_type: str
+    original_bytes: int
+    steps: list[str] = field(default_factory=list)
+    skipped_reason: str = ""
+
+    @property
+    def processed_bytes(self) -> int:
+        return len(self.data)
+
+    def as_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "original_bytes": self.original_bytes,
+            "processed_bytes": self.processed_bytes,
+            "content_type": self.content_type,
+            "steps": self.steps,
+        }
+        if self.skipped_reason:
+            payload["skipped_reason"] = self.skipped_reason
+        return payload
+
+
+def preprocessing_profile() -> str:
+    """Settings that change the bytes sent to Claude; part of the extraction cache key."""
+    if not settings.OCR_PREPROCESSING_ENABLED:
+        return "off"
+    return (
+        f"img{settings.OCR_IMAGE_MAX_EDGE}q{settings.OCR_IMAGE_JPEG_QUALITY}"
+        f"-pdf{'drop' if settings.OCR_PDF_DROP_BLANK_PAGES else 'keep'}"
+    )
+
+
+def preprocess_for_extraction(file_bytes: bytes, content_type: str) -> PreprocessedFile:
+    normalized_type = (content_type or "application/pdf").strip().lower()
+    original = PreprocessedFile(data=file_bytes, content_type=normalized_type, original_bytes=len(file_bytes))
+    if not settings.OCR_PREPROCESSING_ENABLED:
+        original.skipped_reason = "disabled"
+        return original
+    if normalized_type in REENCODABLE_IMAGE_TYPES:
+        return _preprocess_image(original)
+    if normalized_type == "application/pdf" and settings.OCR_PDF_DROP_BLANK_PAGES:
+        return _drop_blank_pdf_pages(original)
+    return original
+
+
+def _preprocess_image(original: PreprocessedFile) -> PreprocessedFile:
+    try:
+        from PIL import Image, ImageOps
+    except Exception:
+        original.skipped_reason = "Pillow not installed."
+        return original
+
+    try:
+        image = Image.open(io.BytesIO(original.data))
+        image.load()
+    except Exception as exc:
+        original.skipped_reason = f"Unreadable image: {exc}"
+        return original
+
+    steps: list[str] = []
+    has_metadata = bool(image.info.get("exif") or image.getexif())
+    if has_metadata:
+        # Bake the orientation into the pixels before the EXIF block is dropped.
+        image = ImageOps.exif_transpose(image)
+        steps.append("strip_exif")
+
+    max_edge = max(1, int(settings.OCR_IMAGE_MAX_EDGE))
+    if max(image.size) > max_edge:
+        original_size = image.size
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        steps.append(f"downscale:{original_size[0]}x{original_size[1]}->{image.size[0]}x{image.size[1]}")
+
+    if not steps:
+        return original
+
+    output = io.BytesIO()
+    if image.mode in {"RGBA", "LA", "P"} and original.content_type == "image/png":
+        image.save(output, format="PNG", optimize=True)
+        content_type = "image/png"
+    else:
+        image.convert("RGB").save(
+            output,
+            format="JPEG",
+            quality=int(settings.OCR_IMAGE_JPEG_QUALITY),
+            optimize=True,
+        )
+        content_type = "image/jpeg"
+    return PreprocessedFile(
+        data=output.getvalue(),
+        content_type=content_type,
+        original_bytes=original.original_bytes,
+        steps=steps,
+    )
+
+
+def _page_is_blank(page) -> bool:
+    if (page.extract_text() or "").strip():
+        return False
+    resources = page.get("/Resources")
+    resources = resources.get_object() if resources is not None else {}
+    xobjects = resources.get("/XObject") if hasattr(resources, "get") else None
+    return not xobjects
+
+
+def _drop_blank_pdf_pages(original: PreprocessedFile) -> PreprocessedFile:
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except Exception:
+        original.skipped_reason = "pypdf not installed."
+        return original
+
+    try:
+        reader = PdfReader(io.BytesIO(original.data))
+        blank_pages = [index for index, page in enumerate(reader.pages) if _page_is_blank(page)]
+    except Exception as exc:
+        original.skipped_reason = f"Unreadable PDF: {exc}"
+        return original
+
+    if not blank_pages or len(blank_pages) == len(reader.pages):
+        return original
+
+    writer = PdfWriter()
+    for index, page in enumerate(reader.pages):
+        if index not in blank_pages:
+            writer.add_page(page)
+    output = io.BytesIO()
+    writer.write(output)
+    return PreprocessedFile(
+        data=output.getvalue(),
+        content_type=original.content_type,
+        original_bytes=original.original_bytes,
+        steps=[f"drop_blank_pages:{','.join(str(index + 1) for index in blank_pages)}"],
+    )
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+TRACCIA_CACHE_ALIAS = "traccia"
+HACCP_API_PREFIX = "/api/v1/haccp/"
+ALL_RESOURCES = "*"
+
+# A write to the key resource also makes these lists stale.
+DEPENDENT_RESOURCES = {
+    "sites": (ALL_RESOURCES,),
+    "sectors": ("cold-points", "temperature-readings"),
+    "cold-points": ("temperature-readings",),
+    "ocr-results": ("lifecycle-events",),
+    "label-sessions": ("lifecycle-events", "schedules"),
+    "traceability-validations": ("lifecycle-events", "ocr-results"),
+}
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Exception | None = None
+
+
+_inflight: dict[str, _InFlight] = {}
+_inflight_lock = threading.Lock()
+
+
+def traccia_cache_enabled() -> bool:
+    return float(settings.TRACCIA_CACHE_TTL_SECONDS) > 0
+
+
+def traccia_resource(path: str) -> str:
+    """First path segment after /api/v1/haccp/, e.g. "cold-points" for /api/v1/haccp/cold-points/12/."""
+    clean_path = path if path.startswith("/") else f"/{path}"
+    if clean_path.startswith(HACCP_API_PREFIX):
+        clean_path = clean_path[len(HACCP_API_PREFIX) :]
+    return clean_path.strip("/").split("/", 1)[0]
+
+
+def _generation_key(resource: str) -> str:
+    return f"traccia:generation:{resource}"
+
+
+def _cache_key(cache, path: str, params: dict | None, headers: dict | None) -> str:
+    resource = traccia_resource(path)
+    generations = cache.get_many([_generation_key(ALL_RESOURCES), _generation_key(resource)])
+    fingerprint = json.dumps(
+        [
+            path,
+            sorted((str(k), str(v)) for k, v in (params or {}).items() if v not in (None, "")),
+            sorted((str(k), str(v)) for k, v in (headers or {}).items() if v is not None),
+        ]
+    )
+    return "traccia:{}:{}:{}:{}".format(
+        resource,
+        generations.get(_generation_key(ALL_RESOURCES), 0),
+        generations.get(_generation_key(resource), 0),
+        hashlib.sha256(fingerprint.encode("utf-8")).hexdigest(),
+    )
+
+
+def cached_request_json(client, path: str, *, params: dict | None = None, headers: dict | None = None):
+    """
+    GET through the Traccia cache. Successful responses are kept for TRACCIA_CACHE_TTL_SECONDS;
+    concurrent identical misses in this process share a single upstream call.
+    """
+    if not traccia_cache_enabled():
+        return client.request_json("GET", path, params=params, headers=headers)
+
+    cache = caches[TRACCIA_CACHE_ALIAS]
+    key = _cache_key(cache, path, params, headers)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1]
+
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _InFlight()
+
+    if not leader:
+        if flight.done.wait(timeout=float(settings.TRACCIA_TIMEOUT_SECONDS) + 1):
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        return client.request_json("GET", path, params=params, headers=headers)
+
+    try:
+        code, payload = client.request_json("GET", path, params=params, headers=headers)
+        if 200 <= code < 300:
+            cache.set(key, [code, payload], timeout=float(settings.TRACCIA_CACHE_TTL_SECONDS))
+        flight.result = (code, payload)
+        return code, payload
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+
+def invalidate_traccia_cache(path: str) -> None:
+    """Drop cached lists for the resource written at `path` (and the lists derived from it)."""
+    if not traccia_cache_enabled():
+        return
+    cache = caches[TRACCIA_CACHE_ALIAS]
+    resource = traccia_resource(path)
+    for target in (resource, *DEPENDENT_RESOURCES.get(resource, ())):
+        key = _generation_key(target)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
@@ -0,0 +1,86 @@
+import io
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.integration.services.drive_client import DriveClient, DriveClientError
+
+
+@override_settings(
+    GOOGLE_DRIVE_FOLDER_ID="folder-001",
+    GOOGLE_DRIVE_OAUTH_CLIENT_ID="client-id",
+    GOOGLE_DRIVE_OAUTH_CLIENT_SECRET="client-secret",
+    GOOGLE_DRIVE_OAUTH_REFRESH_TOKEN="refresh-token",
+    GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE=256 * 1024,
+)
+class DriveClientStreamingTests(SimpleTestCase):
+    def setUp(self):
+        self.client = DriveClient()
+
+    @patch("apps.integration.services.drive_client.time.sleep")
+    def test_upload_stream_sends_chunks_and_resumes_after_transient_error(self, _sleep):
+        chunk = 256 * 1024
+        payload = bytes(range(256)) * (chunk * 2 // 256) + b"tail"
+        sent_ranges = []
+        responses = [
+            (308, {"Range": f"bytes=0-{chunk - 1}"}, b""),
+            DriveClientError(503, {"detail": "backend error"}),
+            (308, {"Range": f"bytes=0-{chunk + 1023}"}, b""),
+            (308, {"Range": f"bytes=0-{2 * chunk - 1}"}, b""),
+            (200, {}, b'{"id": "drive-123", "webViewLink": "https://drive/123"}'),
+        ]
+
+        def fake_send(*, session_url, token, data, offset, size):
+            sent_ranges.append((offset, len(data)))
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with patch.object(self.client, "_access_token", return_value="token"), patch.object(
+            self.client, "_start_resumable_session", return_value="https://upload.example/session"
+        ), patch.object(self.client, "_send_upload_chunk", side_effect=fake_send):
+            uploaded = self.client.upload_stream(
+                filename="scan.pdf",
+                stream=io.BytesIO(payload),
+                size=len(payload),
+                content_type="application/pdf",
+            )
+
+        self.assertEqual(uploaded["id"], "drive-123")
+        self.assertEqual(
+            sent_ranges,
+            [
+                (0, chunk),
+                (chunk, chunk),
+                (None, 0),
+                (chunk + 1024, chunk - 1024),
+                (2 * chunk, 4),
+            ],
+        )
+
+    def test_upload_stream_uses_multipart_for_single_chunk_files(self):
+        with patch.object(self.client, "upload_file", return_value={"id": "drive-small"}) as upload_mock:
+            uploaded = self.client.upload_stream(filename="label.jpg", stream=io.BytesIO(b"jpeg"), size=4)
+
+        self.assertEqual(uploaded["id"], "drive-small")
+        upload_mock.assert_called_once_with(filename="label.jpg", binary=b"jpeg", content_type="application/octet-stream")
+
+    @patch("apps.integration.services.drive_client.time.sleep")
+    def test_upload_stream_gives_up_when_drive_stops_committing(self, _sleep):
+        chunk = 256 * 1024
+        calls = []
+
+        def fake_send(*, session_url, token, data, offset, size):
+            calls.append(offset)
+            return 308, {"Range": f"bytes=0-{chunk - 1}"}, b""
+
+        with patch.object(self.client, "_access_token", return_value="token"), patch.object(
+            self.client, "_start_resumable_session", return_value="https://upload.example/session"
+        ), patch.object(self.client, "_send_upload_chunk", side_effect=fake_send):
+            with self.assertRaises(DriveClientError) as ctx:
+                self.client.upload_stream(filename="scan.pdf", stream=io.BytesIO(b"x" * (2 * chunk)), size=2 * chunk)
+
+        self.assertEqual(ctx.exception.status_code, 502)
+        # First chunk committed, then the initial send plus DRIVE_UPLOAD_MAX_RETRIES retries of the second.
+        self.assertEqual(len(calls), 6)
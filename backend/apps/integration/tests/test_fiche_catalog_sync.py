@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from apps.catalog.models import Supplier, SupplierProduct
+from apps.integration.fiches_catalog import (
+    import_supplier_catalog_from_fiches,
+    latest_catalog_watermark,
+    sync_supplier_catalog,
+)
+from apps.integration.import_batches import complete_batch, start_batch
+
+METRO_ID = "6d1f1a9e-8f0e-4c55-9a6a-0d4f4b0c0001"
+ATS_ID = "6d1f1a9e-8f0e-4c55-9a6a-0d4f4b0c0002"
+TOMATO_ID = "0b9d2c44-1111-4e3a-8a2b-5f0c00000001"
+BASIL_ID = "0b9d2c44-1111-4e3a-8a2b-5f0c00000002"
+
+
+class _FichesOnDefaultConnection:
+    """Serves the test database as the fiches source."""
+
+    databases = {"fiches": {}}
+
+    def __getitem__(self, alias):
+        return connection
+
+
+class FicheCatalogSyncTests(TestCase):
+    def _supplier_rows(self):
+        return [(METRO_ID, "Metro"), (ATS_ID, "Ats-Cash")]
+
+    def _product_rows(self, tomato_price="5"):
+        return [
+            (TOMATO_ID, METRO_ID, "Tomates", "TOM-1", "kg", "kg", tomato_price, "2.10"),
+            (BASIL_ID, ATS_ID, "Basilico", None, "pz", None, None, None),
+        ]
+
+    def test_first_sync_creates_rows_and_reuses_normalized_supplier(self):
+        existing = Supplier.objects.create(name="ATS CASH", metadata={"note": "manual"})
+
+        result = sync_supplier_catalog(self._supplier_rows(), self._product_rows())
+
+        self.assertTrue(result["ok"])
+        self.assertEqual((result["supplier_created"], result["supplier_updated"]), (1, 1))
+        self.assertEqual(result["product_created"], 2)
+        metro = Supplier.objects.get(pk=METRO_ID)
+        self.assertEqual(metro.normalized_name, "METRO")
+        existing.refresh_from_db()
+        self.assertEqual(existing.metadata, {"note": "manual", "source": "fiches", "fiches_supplier_id": ATS_ID})
+        basil = SupplierProduct.objects.get(pk=BASIL_ID)
+        self.assertEqual((basil.supplier_id, basil.uom), (existing.id, "pc"))
+
+    def test_resync_only_writes_changed_rows(self):
+        sync_supplier_catalog(self._supplier_rows(), self._product_rows())
+        basil_updated_at = SupplierProduct.objects.get(pk=BASIL_ID).updated_at
+
+        unchanged = sync_supplier_catalog(self._supplier_rows(), self._product_rows())
+        changed = sync_supplier_catalog(self._supplier_rows(), self._product_rows(tomato_price="6"))
+
+        self.assertEqual((unchanged["supplier_unchanged"], unchanged["product_unchanged"]), (2, 2))
+        self.assertEqual((unchanged["product_created"], unchanged["product_updated"]), (0, 0))
+        self.assertEqual((changed["product_updated"], changed["product_unchanged"]), (1, 1))
+        self.assertEqual(SupplierProduct.objects.get(pk=TOMATO_ID).pack_qty, Decimal("6"))
+        self.assertEqual(SupplierProduct.objects.get(pk=BASIL_ID).updated_at, basil_updated_at)
+
+    def test_incremental_rows_resolve_suppliers_by_fiches_id(self):
+        sync_supplier_catalog(self._supplier_rows(), self._product_rows())
+        local_metro = Supplier.objects.get(pk=METRO_ID)
+        local_metro.name = "Metro Italia"
+        local_metro.save(update_fields=["name"])
+        new_product_id = "0b9d2c44-1111-4e3a-8a2b-5f0c00000003"
+
+        result = sync_supplier_catalog(
+            [],
+            [(new_product_id, METRO_ID, "Carote", "CAR-1", "kg", "kg", None, None)],
+        )
+
+        self.assertEqual((result["product_created"], result["products_without_supplier"]), (1, 0))
+        self.assertEqual(SupplierProduct.objects.get(pk=new_product_id).supplier_id, local_metro.id)
+
+    def test_latest_catalog_watermark_reads_last_completed_import(self):
+        self.assertIsNone(latest_catalog_watermark())
+        batch = start_batch("fiches", "supplier_catalog", "", {})
+        complete_batch(batch, 201, {"ok": True, "source_max_updated_at": "2026-03-01T08:00:00+00:00"})
+
+        self.assertEqual(latest_catalog_watermark(), datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc))
+
+    def test_full_import_reads_sources_without_updated_at_column(self):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE suppliers (id uuid PRIMARY KEY, name text)")
+            cursor.execute(
+                "CREATE TABLE supplier_products (id uuid PRIMARY KEY, supplier_id uuid, name text, source_code text, "
+                "source_unit text, unit text, source_price numeric, unit_price numeric)"
+            )
+            cursor.execute("INSERT INTO suppliers VALUES (%s, 'Metro')", [METRO_ID])
+            cursor.execute(
+                "INSERT INTO supplier_products VALUES (%s, %s, 'Tomates', 'TOM-1', 'kg', 'kg', 5, 2.10)",
+                [TOMATO_ID, METRO_ID],
+            )
+
+        with mock.patch("apps.integration.fiches_catalog.connections", _FichesOnDefaultConnection()):
+            result = import_supplier_catalog_from_fiches()
+
+        self.assertTrue(result["ok"], result.get("detail"))
+        self.assertEqual((result["supplier_created"], result["product_created"]), (1, 1))
+        self.assertIsNone(result["source_max_updated_at"])
+
+    def test_full_import_rejects_updated_since(self):
+        with mock.patch("apps.integration.fiches_catalog.connections", _FichesOnDefaultConnection()):
+            result = import_supplier_catalog_from_fiches(
+                updated_since=datetime(2026, 3, 1, tzinfo=timezone.utc), incremental=False
+            )
+
+        self.assertFalse(result["ok"])
+        self.assertIn("updated_since", result["detail"])
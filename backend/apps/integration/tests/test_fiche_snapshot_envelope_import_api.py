@@ -1,9 +1,13 @@
+import copy
 import uuid
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
-from apps.integration.models import IntegrationImportBatch, RecipeSnapshot
+from apps.integration.fiches_snapshots import import_recipe_snapshots_from_v11_envelope
+from apps.integration.models import IntegrationImportBatch, RecipeIngredientBlock, RecipeSnapshot
 
 
 class FicheSnapshotEnvelopeImportApiTests(TestCase):
@@ -115,3 +119,56 @@ class FicheSnapshotEnvelopeImportApiTests(TestCase):
         )
         self.assertEqual(response.status_code, 400)
         self.assertIn("export_version", response.json()["detail"])
+
+    def test_import_envelope_batches_writes_and_reports_phase_timings(self):
+        def envelope_with(count):
+            envelope = self._envelope()
+            template = envelope["fiches"][0]
+            envelope["fiches"] = []
+            for index in range(count):
+                fiche = copy.deepcopy(template)
+                fiche["fiche_id"] = str(uuid.uuid4())
+                fiche["title"] = f"Pizza {index}"
+                envelope["fiches"].append(fiche)
+            return envelope
+
+        with CaptureQueriesContext(connection) as small:
+            small_result = import_recipe_snapshots_from_v11_envelope(envelope_with(2))
+        large_envelope = envelope_with(40)
+        large_envelope["fiches"].append(copy.deepcopy(large_envelope["fiches"][0]))
+        with CaptureQueriesContext(connection) as large:
+            large_result = import_recipe_snapshots_from_v11_envelope(large_envelope)
+
+        self.assertEqual(small_result["created"], 2)
+        self.assertEqual((large_result["created"], large_result["skipped_existing"]), (40, 1))
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertEqual(set(large_result["timings_ms"]), {"parse", "enrich", "hash", "upsert", "total"})
+
+    def test_import_envelope_refresh_updates_existing_snapshot_metadata(self):
+        import_recipe_snapshots_from_v11_envelope(self._envelope())
+        envelope = self._envelope()
+        envelope["fiches"][0]["updated_at"] = "2026-03-02T09:00:00Z"
+
+        skipped = import_recipe_snapshots_from_v11_envelope(envelope)
+        refreshed = import_recipe_snapshots_from_v11_envelope(envelope, refresh_existing=True)
+
+        self.assertEqual((skipped["refreshed"], skipped["skipped_existing"]), (0, 1))
+        self.assertEqual((refreshed["refreshed"], refreshed["skipped_existing"]), (1, 0))
+        snapshot = RecipeSnapshot.objects.get(fiche_product_id=self.fiche_id)
+        self.assertEqual(snapshot.source_updated_at.isoformat(), "2026-03-02T09:00:00+00:00")
+
+    def test_import_envelope_shares_ingredient_blocks_between_versions(self):
+        first = self._envelope()
+        second = self._envelope()
+        second["fiches"][0]["procedure_steps"] = ["Impasta", "Inforna"]
+
+        import_recipe_snapshots_from_v11_envelope(first)
+        import_recipe_snapshots_from_v11_envelope(second)
+
+        snapshots = list(RecipeSnapshot.objects.filter(fiche_product_id=self.fiche_id))
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(RecipeIngredientBlock.objects.count(), 1)
+        self.assertEqual({snapshot.ingredients_block_id for snapshot in snapshots}, {RecipeIngredientBlock.objects.get().pk})
+        for snapshot in snapshots:
+            self.assertNotIn("ingredients", snapshot.payload)
+            self.assertEqual(snapshot.full_payload["ingredients"][0]["ingredient_name_raw"], "Farina")
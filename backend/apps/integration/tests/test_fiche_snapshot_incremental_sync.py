@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from django.test import TestCase
+
+from apps.integration.fiches_snapshots import (
+    RECIPE_WATERMARK_SOURCE,
+    _apply_incremental_page,
+    _deactivate_missing_fiches,
+    _PhaseTimings,
+)
+from apps.integration.fiches_titles import fetch_recipe_titles
+from apps.integration.models import RecipeSnapshot, SyncWatermark
+
+TARTE_ID = "11111111-1111-4111-8111-111111111111"
+FLAN_ID = "33333333-3333-4333-8333-333333333333"
+
+
+def _row(fiche_id, title, updated_at, active=True, portions=4):
+    return (fiche_id, title, {"title": title, "portions": portions, "ingredients": []}, updated_at, active)
+
+
+class FicheSnapshotIncrementalSyncTests(TestCase):
+    def setUp(self):
+        self.watermark = SyncWatermark.objects.create(source=RECIPE_WATERMARK_SOURCE)
+
+    def test_page_stores_changed_fiches_and_advances_watermark(self):
+        result = _apply_incremental_page(
+            [
+                _row(TARTE_ID, "Tarte tatin", datetime(2026, 3, 1, 8, tzinfo=timezone.utc)),
+                _row(FLAN_ID, "Flan", datetime(2026, 3, 1, 9, tzinfo=timezone.utc)),
+            ],
+            self.watermark,
+            timings=_PhaseTimings(),
+        )
+
+        self.assertEqual((result["created"], result["deactivated"]), (2, 0))
+        self.watermark.refresh_from_db()
+        self.assertEqual(self.watermark.last_updated_at, datetime(2026, 3, 1, 9, tzinfo=timezone.utc))
+        self.assertEqual(self.watermark.last_id, FLAN_ID)
+        self.assertIsNotNone(self.watermark.synced_at)
+
+    def test_inactive_rows_flip_every_version_and_reactivate_on_return(self):
+        _apply_incremental_page(
+            [_row(FLAN_ID, "Flan", "2026-03-01T09:00:00Z"), _row(FLAN_ID, "Flan", "2026-03-01T09:30:00Z", portions=6)],
+            self.watermark,
+            timings=_PhaseTimings(),
+        )
+
+        deactivated = _apply_incremental_page(
+            [_row(FLAN_ID, "Flan", "2026-03-02T09:00:00Z", active=False)], self.watermark, timings=_PhaseTimings()
+        )
+        self.assertEqual((deactivated["created"], deactivated["deactivated"]), (0, 2))
+        self.assertFalse(RecipeSnapshot.objects.filter(fiche_product_id=FLAN_ID, source_active=True).exists())
+        self.assertEqual(fetch_recipe_titles(query="Flan"), [])
+
+        reactivated = _apply_incremental_page(
+            [_row(FLAN_ID, "Flan", "2026-03-03T09:00:00Z", active=None, portions=6)],
+            self.watermark,
+            timings=_PhaseTimings(),
+        )
+        self.assertEqual(reactivated["reactivated"], 2)
+        self.assertTrue(fetch_recipe_titles(query="Flan"))
+
+    def test_deactivate_missing_fiches_keeps_source_ids(self):
+        _apply_incremental_page(
+            [_row(TARTE_ID, "Tarte tatin", "2026-03-01T08:00:00Z"), _row(FLAN_ID, "Flan", "2026-03-01T09:00:00Z")],
+            self.watermark,
+            timings=_PhaseTimings(),
+        )
+
+        self.assertEqual(_deactivate_missing_fiches({RecipeSnapshot.objects.get(title="Flan").fiche_product_id}), 1)
+        self.assertFalse(RecipeSnapshot.objects.get(fiche_product_id=TARTE_ID).source_active)
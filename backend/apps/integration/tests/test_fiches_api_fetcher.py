@@ -0,0 +1,107 @@
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.integration.fiches_snapshots import import_recipe_snapshots_from_api
+from apps.integration.models import RecipeSnapshot
+
+FICHES = {
+    "11111111-1111-4111-8111-111111111111": {"title": "Tarte tatin", "updatedAt": "2026-03-01T08:00:00Z"},
+    "22222222-2222-4222-8222-222222222222": {"title": "Soupe pistou", "updatedAt": "2026-03-01T09:00:00Z"},
+    "33333333-3333-4333-8333-333333333333": {"title": "Flan", "updatedAt": "2026-03-01T10:00:00Z"},
+}
+FLAKY_ID = "22222222-2222-4222-8222-222222222222"
+BROKEN_ID = "33333333-3333-4333-8333-333333333333"
+
+
+class _FakeFichesApi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen: list = []
+    ports_seen: set = set()
+    flaky_failures = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status_code, payload=None, etag=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status_code)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        cls.ports_seen.add(self.client_address[1])
+        if self.path == "/fiches":
+            return self._send(200, [{"id": key, **value} for key, value in FICHES.items()])
+        fiche_id = self.path.rsplit("/", 1)[-1]
+        if fiche_id == BROKEN_ID:
+            return self._send(404, {"detail": "gone"})
+        if fiche_id == FLAKY_ID and cls.flaky_failures:
+            cls.flaky_failures -= 1
+            return self._send(503, {"detail": "busy"})
+        etag = f'"v1-{fiche_id[:4]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, etag=etag)
+        fiche = FICHES[fiche_id]
+        return self._send(200, {"id": fiche_id, "title": fiche["title"], "updatedAt": fiche["updatedAt"]}, etag=etag)
+
+
+class FichesApiFetcherTests(TestCase):
+    def setUp(self):
+        _FakeFichesApi.requests_seen = []
+        _FakeFichesApi.ports_seen = set()
+        _FakeFichesApi.flaky_failures = 1
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeFichesApi)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        settings_override = override_settings(FICHES_API_BASE_URL=base_url, FICHES_API_WORKERS=2, FICHES_API_MAX_RETRIES=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    @patch("apps.integration.services.fiches_api_client.time.sleep")
+    def test_fetches_concurrently_retries_and_reports_failures_per_fiche(self, _sleep):
+        result = import_recipe_snapshots_from_api(limit=10)
+
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["created"], 2)
+        self.assertEqual(
+            result["fetch"],
+            {"listed": 3, "requested": 3, "fetched": 2, "not_modified": 0, "skipped_unchanged": 0, "failed": 1},
+        )
+        self.assertEqual(
+            result["fetch_failures"],
+            [{"fiche_id": BROKEN_ID, "title": "Flan", "detail": "Fiches API HTTP error: 404"}],
+        )
+        flaky_calls = [path for path, _etag in _FakeFichesApi.requests_seen if path.endswith(FLAKY_ID)]
+        self.assertEqual(len(flaky_calls), 2)
+        # 1 listing + 4 fiche requests over at most 1 + 2 keep-alive connections.
+        self.assertLessEqual(len(_FakeFichesApi.ports_seen), 3)
+        snapshot = RecipeSnapshot.objects.get(fiche_product_id="11111111-1111-4111-8111-111111111111")
+        self.assertEqual(snapshot.source_etag, '"v1-1111"')
+
+    @patch("apps.integration.services.fiches_api_client.time.sleep")
+    def test_skips_unchanged_fiches_by_updated_at_and_etag(self, _sleep):
+        import_recipe_snapshots_from_api(limit=10)
+        RecipeSnapshot.objects.filter(fiche_product_id=FLAKY_ID).update(
+            source_updated_at=datetime(2026, 2, 1, tzinfo=timezone.utc)
+        )
+        _FakeFichesApi.requests_seen = []
+
+        result = import_recipe_snapshots_from_api(limit=10)
+
+        self.assertEqual(result["fetch"]["skipped_unchanged"], 1)
+        self.assertEqual(result["fetch"]["not_modified"], 1)
+        self.assertEqual(result["created"], 0)
+        self.assertIn((f"/fiches/{FLAKY_ID}", '"v1-2222"'), _FakeFichesApi.requests_seen)
+        self.assertNotIn("/fiches/11111111-1111-4111-8111-111111111111", [p for p, _ in _FakeFichesApi.requests_seen])
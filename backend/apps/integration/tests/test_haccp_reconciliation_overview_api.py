@@ -276,3 +276,27 @@ class HaccpReconciliationOverviewApiTests(APITestCase):
         self.assertEqual(len(body["results"][0]["invoices"]), 1)
         self.assertEqual(body["results"][0]["invoices"][0]["invoice_number"], "FAC-LOT-1")
         self.assertEqual(body["results"][0]["invoices"][0]["supplier_lot_code"], "060326")
+
+    @override_settings(TRACCIA_CACHE_TTL_SECONDS=0)
+    @patch("apps.integration.api.v1.haccp_views.TracciaClient.request_json")
+    def test_overview_returns_304_when_traccia_and_local_documents_are_unchanged(self, request_json_mock):
+        lifecycle = (status.HTTP_200_OK, {"results": [{"id": "evt-1", "product_label": "Basilico", "qty_unit": "kg"}]})
+        schedules = (status.HTTP_200_OK, {"results": []})
+        request_json_mock.side_effect = [lifecycle, schedules, lifecycle, schedules, lifecycle, schedules]
+        url = f"/api/v1/haccp/traccia/reconciliation-overview/?site={self.site.id}"
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        receipt = GoodsReceipt.objects.create(
+            site=self.site,
+            supplier=self.supplier,
+            delivery_note_number="BL-ETAG",
+            received_at="2026-03-08T07:00:00Z",
+        )
+        GoodsReceiptLine.objects.create(receipt=receipt, raw_product_name="Basilico", qty_value="1.000", qty_unit="kg")
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.json()["summary"]["goods_receipt_lines"], 1)
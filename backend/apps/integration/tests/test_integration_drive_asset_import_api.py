@@ -17,7 +17,7 @@ class IntegrationDriveAssetImportApiTests(APITestCase):
         self.client.credentials(HTTP_X_API_KEY="dev-api-key")
         self.site = Site.objects.create(name="Central Site", code="CENTRAL")
 
-    @patch("apps.integration.services.drive_importer.run_claude_extraction")
+    @patch("apps.integration.services.extraction_queue.run_claude_extraction")
     @patch("apps.integration.services.drive_importer.DriveClient")
     def test_import_drive_assets_creates_documents(self, client_cls, extract_mock):
         client = client_cls.return_value
@@ -65,7 +65,7 @@ class IntegrationDriveAssetImportApiTests(APITestCase):
             1,
         )
 
-    @patch("apps.integration.services.drive_importer.run_claude_extraction")
+    @patch("apps.integration.services.extraction_queue.run_claude_extraction")
     @patch("apps.integration.services.drive_importer.DriveClient")
     def test_import_drive_assets_skips_existing_drive_file(self, client_cls, extract_mock):
         IntegrationDocument.objects.create(
@@ -100,7 +100,7 @@ class IntegrationDriveAssetImportApiTests(APITestCase):
         client.download_file.assert_not_called()
         extract_mock.assert_not_called()
 
-    @patch("apps.integration.services.drive_importer.run_claude_extraction")
+    @patch("apps.integration.services.extraction_queue.run_claude_extraction")
     @patch("apps.integration.services.drive_importer.DriveClient")
     def test_import_drive_assets_scans_past_existing_rows_to_find_new_files(self, client_cls, extract_mock):
         IntegrationDocument.objects.create(
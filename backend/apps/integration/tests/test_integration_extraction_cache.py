@@ -0,0 +1,92 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Site
+from apps.integration.models import DocumentExtraction, ExtractionCacheEntry, IntegrationDocument
+from apps.integration.services.claude_extractor import ClaudeExtractionResult
+
+
+FILE_BYTES = b"%PDF-same-delivery-note"
+
+
+class IntegrationExtractionCacheTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="Cache Site", code="SITE-CACHE")
+
+    def _document(self, filename, document_type="goods_receipt"):
+        return IntegrationDocument.objects.create(
+            site=self.site,
+            document_type=document_type,
+            source="upload",
+            filename=filename,
+            status="uploaded",
+        )
+
+    def _extract(self, document):
+        return self.client.post(f"/api/v1/integration/documents/{document.id}/extract-claude/", {}, format="json")
+
+    @patch("apps.integration.services.claude_extractor._read_document_bytes", return_value=FILE_BYTES)
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    def test_duplicate_file_reuses_cached_result(self, run_mock, _read_mock):
+        run_mock.return_value = ClaudeExtractionResult(
+            status="succeeded",
+            raw_payload={"response_text": "{}"},
+            normalized_payload={"delivery_note_number": "BL-CACHE-001"},
+            extractor_version="claude-test",
+        )
+
+        first = self._extract(self._document("drive-copy.pdf"))
+        second_document = self._document("manual-upload.pdf")
+        second = self._extract(second_document)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(run_mock.call_count, 1)
+        self.assertEqual(first.json()["raw_payload"]["cache"], "miss")
+        self.assertEqual(second.json()["raw_payload"]["cache"], "hit")
+        self.assertEqual(second.json()["normalized_payload"]["delivery_note_number"], "BL-CACHE-001")
+        self.assertEqual(DocumentExtraction.objects.count(), 2)
+        second_document.refresh_from_db()
+        self.assertEqual(second_document.metadata["file_sha256"], hashlib.sha256(FILE_BYTES).hexdigest())
+        entry = ExtractionCacheEntry.objects.get()
+        self.assertEqual(entry.hit_count, 1)
+
+        stats = self.client.get("/api/v1/integration/extraction-cache/stats/")
+        self.assertEqual(stats.status_code, status.HTTP_200_OK)
+        self.assertEqual(stats.json()["hits"], 1)
+        self.assertEqual(stats.json()["misses"], 1)
+        self.assertEqual(stats.json()["hit_rate"], 0.5)
+
+    @patch("apps.integration.services.claude_extractor._read_document_bytes", return_value=FILE_BYTES)
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    def test_cache_key_includes_document_type_and_model(self, run_mock, _read_mock):
+        run_mock.return_value = ClaudeExtractionResult(status="succeeded", raw_payload={}, normalized_payload={"ok": True})
+
+        self._extract(self._document("a.pdf"))
+        self._extract(self._document("b.pdf", document_type="invoice"))
+        with patch.dict(os.environ, {"ANTHROPIC_MODEL": "claude-other-model"}):
+            self._extract(self._document("c.pdf"))
+
+        self.assertEqual(run_mock.call_count, 3)
+        self.assertEqual(ExtractionCacheEntry.objects.count(), 3)
+
+    @patch("apps.integration.services.claude_extractor._read_document_bytes", return_value=FILE_BYTES)
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    def test_failed_extractions_are_not_cached(self, run_mock, _read_mock):
+        run_mock.return_value = ClaudeExtractionResult(
+            status="failed",
+            raw_payload={},
+            normalized_payload={},
+            error_message="Claude response did not contain a valid JSON object.",
+        )
+
+        self._extract(self._document("a.pdf"))
+        self._extract(self._document("b.pdf"))
+
+        self.assertEqual(run_mock.call_count, 2)
+        self.assertFalse(ExtractionCacheEntry.objects.exists())
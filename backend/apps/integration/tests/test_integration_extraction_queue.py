@@ -0,0 +1,193 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Site
+from apps.integration.models import DocumentExtraction, DocumentStatus, ExtractionStatus, IntegrationDocument
+from apps.integration.services.claude_extractor import ClaudeExtractionResult
+from apps.integration.services.extraction_queue import (
+    claim_next_job,
+    enqueue_claude_extraction,
+    process_extraction_job,
+    release_stale_jobs,
+    run_extraction_worker,
+)
+
+
+def _mock_payload(site):
+    return {
+        "site": str(site.id),
+        "delivery_note_number": "BL-QUEUE-001",
+        "lines": [{"raw_product_name": "Milk", "qty_value": "1.000", "qty_unit": "l"}],
+    }
+
+
+@override_settings(EXTRACTION_QUEUE_ASYNC=True, EXTRACTION_QUEUE_MAX_ATTEMPTS=3, EXTRACTION_QUEUE_RETRY_BASE_SECONDS=30)
+class IntegrationExtractionQueueTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="Queue Site", code="SITE-QUEUE")
+        self.other_site = Site.objects.create(name="Other Site", code="SITE-OTHER")
+
+    def _document(self, site=None, **metadata):
+        return IntegrationDocument.objects.create(
+            site=site or self.site,
+            document_type="goods_receipt",
+            source="api",
+            filename="bl-queue.pdf",
+            status="uploaded",
+            metadata=metadata,
+        )
+
+    def test_extract_claude_enqueues_and_worker_completes_job(self):
+        document = self._document(mock_claude_normalized_payload=_mock_payload(self.site))
+
+        response = self.client.post(
+            f"/api/v1/integration/documents/{document.id}/extract-claude/",
+            {"idempotency_key": "queue-001"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()["status"], ExtractionStatus.PENDING)
+        document.refresh_from_db()
+        self.assertEqual(document.status, DocumentStatus.PROCESSING)
+
+        self.assertEqual(run_extraction_worker(worker_id="test-worker", once=True), 1)
+
+        poll = self.client.get(f"/api/v1/integration/extractions/{response.json()['id']}/")
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.json()["status"], ExtractionStatus.SUCCEEDED)
+        self.assertEqual(poll.json()["attempts"], 1)
+        self.assertEqual(poll.json()["normalized_payload"]["delivery_note_number"], "BL-QUEUE-001")
+        document.refresh_from_db()
+        self.assertEqual(document.status, DocumentStatus.EXTRACTED)
+
+    @patch("apps.integration.services.extraction_queue.run_claude_extraction")
+    def test_transient_failure_is_retried_with_backoff(self, extract_mock):
+        extract_mock.side_effect = [
+            ClaudeExtractionResult(
+                status="failed",
+                raw_payload={"error": "overloaded"},
+                normalized_payload={},
+                error_message="Claude API call failed: overloaded",
+                retryable=True,
+            ),
+            ClaudeExtractionResult(status="succeeded", raw_payload={}, normalized_payload={"ok": True}),
+        ]
+        job = enqueue_claude_extraction(self._document())
+
+        job = process_extraction_job(claim_next_job("test-worker"))
+
+        self.assertEqual(job.status, ExtractionStatus.PENDING)
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=20))
+        self.assertIsNone(claim_next_job("test-worker"))
+
+        DocumentExtraction.objects.filter(pk=job.pk).update(available_at=timezone.now())
+        job = process_extraction_job(claim_next_job("test-worker"))
+
+        self.assertEqual(job.status, ExtractionStatus.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+
+    @patch("apps.integration.services.extraction_queue.run_claude_extraction")
+    def test_permanent_failure_is_not_retried(self, extract_mock):
+        extract_mock.return_value = ClaudeExtractionResult(
+            status="failed",
+            raw_payload={},
+            normalized_payload={},
+            error_message="Document file is missing or empty.",
+        )
+        enqueue_claude_extraction(self._document())
+
+        job = process_extraction_job(claim_next_job("test-worker"))
+
+        self.assertEqual(job.status, ExtractionStatus.FAILED)
+        self.assertEqual(job.document.status, DocumentStatus.FAILED)
+
+    @override_settings(EXTRACTION_QUEUE_MAX_ATTEMPTS=1)
+    @patch("apps.integration.services.extraction_queue.run_claude_extraction")
+    def test_post_after_exhausted_job_enqueues_a_new_one(self, extract_mock):
+        extract_mock.return_value = ClaudeExtractionResult(
+            status="failed",
+            raw_payload={"error": "overloaded"},
+            normalized_payload={},
+            error_message="Claude API call failed: overloaded",
+            retryable=True,
+        )
+        document = self._document()
+        url = f"/api/v1/integration/documents/{document.id}/extract-claude/"
+        first = self.client.post(url, {}, format="json")
+        failed = process_extraction_job(claim_next_job("test-worker"))
+        self.assertEqual(failed.status, ExtractionStatus.FAILED)
+
+        retry = self.client.post(url, {}, format="json")
+
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotEqual(retry.json()["id"], first.json()["id"])
+        self.assertEqual(
+            DocumentExtraction.objects.get(pk=retry.json()["id"]).status, ExtractionStatus.PENDING
+        )
+        replay = self.client.post(url, {}, format="json")
+        self.assertEqual(replay.json()["id"], retry.json()["id"])
+
+    def test_claim_prefers_sites_without_running_jobs(self):
+        for _ in range(3):
+            enqueue_claude_extraction(self._document())
+        other_job = enqueue_claude_extraction(self._document(site=self.other_site))
+
+        first = claim_next_job("worker-a")
+        second = claim_next_job("worker-b")
+
+        self.assertEqual(first.document.site_id, self.site.id)
+        self.assertEqual(second.pk, other_job.pk)
+
+    def test_stale_running_job_is_released(self):
+        job = enqueue_claude_extraction(self._document())
+        claimed = claim_next_job("worker-dead")
+        DocumentExtraction.objects.filter(pk=claimed.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_stale_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExtractionStatus.PENDING)
+        self.assertIsNone(job.locked_by)
+
+    def test_manual_pending_extractions_are_not_claimed(self):
+        DocumentExtraction.objects.create(document=self._document(), extractor_name="ocr-engine", status="pending")
+
+        self.assertIsNone(claim_next_job("test-worker"))
+
+    @override_settings(EXTRACTION_QUEUE_CALLBACK_ALLOWED_HOSTS=["hooks.cookops.example"])
+    def test_callback_url_outside_allowlist_is_rejected(self):
+        document = self._document(mock_claude_normalized_payload=_mock_payload(self.site))
+
+        rejected = self.client.post(
+            f"/api/v1/integration/documents/{document.id}/extract-claude/",
+            {"idempotency_key": "queue-cb-001", "callback_url": "http://169.254.169.254/latest/meta-data/"},
+            format="json",
+        )
+        accepted = self.client.post(
+            f"/api/v1/integration/documents/{document.id}/extract-claude/",
+            {"idempotency_key": "queue-cb-002", "callback_url": "https://hooks.cookops.example/extractions"},
+            format="json",
+        )
+
+        self.assertEqual(rejected.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("callback_url", rejected.json()["field_errors"])
+        self.assertEqual(accepted.status_code, status.HTTP_202_ACCEPTED)
+
+    @patch("apps.integration.services.extraction_queue.urllib.request.urlopen")
+    def test_stored_callback_outside_allowlist_is_not_called(self, urlopen_mock):
+        job = enqueue_claude_extraction(
+            self._document(mock_claude_normalized_payload=_mock_payload(self.site)),
+            callback_url="http://10.0.0.5/internal",
+        )
+
+        process_extraction_job(claim_next_job("test-worker"))
+
+        self.assertEqual(job.callback_url, "http://10.0.0.5/internal")
+        urlopen_mock.assert_not_called()
@@ -0,0 +1,146 @@
+import hashlib
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.core.models import Site
+from apps.integration.models import ExtractionStatus, IntegrationDocument
+from apps.integration.services.claude_extractor import (
+    AnthropicLabelBatchBackend,
+    ClaudeExtractionResult,
+    LabelBatchResponse,
+    _build_label_batch_prompt,
+    run_label_batch_extraction,
+)
+from apps.integration.services.extraction_queue import enqueue_claude_extraction, run_extraction_worker
+
+
+def _file_bytes(document):
+    return f"jpeg:{document.filename}".encode()
+
+
+def _sha(filename):
+    return hashlib.sha256(f"jpeg:{filename}".encode()).hexdigest()
+
+
+class FakeLabelBatchBackend:
+    """Offline backend: answers images from a {file sha256: payload} map, leaves the rest unanswered."""
+
+    def __init__(self, payloads_by_sha256, *, model="fake-label-batch"):
+        self.payloads_by_sha256 = payloads_by_sha256
+        self.model = model
+        self.calls = []
+
+    def extract_labels(self, images):
+        self.calls.append(len(images))
+        return LabelBatchResponse(
+            payloads=[self.payloads_by_sha256.get(hashlib.sha256(data).hexdigest()) for _, data in images],
+            raw_payload={"source": "fake"},
+            model=self.model,
+        )
+
+
+@override_settings(EXTRACTION_CACHE_ENABLED=False, EXTRACTION_LABEL_BATCH_SIZE=8)
+@patch("apps.integration.services.claude_extractor._read_document_bytes", side_effect=_file_bytes)
+class LabelBatchExtractionTests(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(name="Label Site", code="SITE-LABEL")
+
+    def _labels(self, count):
+        return [
+            IntegrationDocument.objects.create(
+                site=self.site,
+                document_type="label_capture",
+                source="drive",
+                filename=f"label-{index}.jpg",
+                content_type="image/jpeg",
+                status="uploaded",
+            )
+            for index in range(count)
+        ]
+
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    def test_batch_splits_results_and_falls_back_for_unanswered_images(self, single_mock, _read_mock):
+        single_mock.return_value = ClaudeExtractionResult(
+            status="succeeded",
+            raw_payload={},
+            normalized_payload={"product_guess": "single"},
+        )
+        backend = FakeLabelBatchBackend(
+            {
+                _sha("label-0.jpg"): {"product_guess": "Beurre doux"},
+                _sha("label-2.jpg"): {"product_guess": "Creme 35%"},
+            }
+        )
+
+        results = run_label_batch_extraction(self._labels(3), backend=backend)
+
+        self.assertEqual(backend.calls, [3])
+        self.assertEqual([result.normalized_payload["product_guess"] for result in results], ["Beurre doux", "single", "Creme 35%"])
+        self.assertEqual(results[2].raw_payload["batch"], {"size": 3, "index": 2})
+        self.assertEqual(single_mock.call_count, 1)
+
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    def test_batch_failure_falls_back_to_single_calls(self, single_mock, _read_mock):
+        single_mock.return_value = ClaudeExtractionResult(status="succeeded", raw_payload={}, normalized_payload={"ok": True})
+
+        class BrokenBackend:
+            def extract_labels(self, images):
+                raise RuntimeError("overloaded")
+
+        results = run_label_batch_extraction(self._labels(2), backend=BrokenBackend())
+
+        self.assertEqual(single_mock.call_count, 2)
+        self.assertTrue(all(result.status == "succeeded" for result in results))
+
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    def test_crashing_fallback_only_fails_its_own_document(self, single_mock, _read_mock):
+        single_mock.side_effect = [
+            RuntimeError("corrupt image"),
+            ClaudeExtractionResult(status="succeeded", raw_payload={}, normalized_payload={"ok": True}),
+        ]
+
+        results = run_label_batch_extraction(self._labels(2), backend=FakeLabelBatchBackend({}))
+
+        self.assertEqual([result.status for result in results], ["failed", "succeeded"])
+        self.assertIn("corrupt image", results[0].error_message)
+        self.assertTrue(results[0].retryable)
+
+    @override_settings(EXTRACTION_QUEUE_ASYNC=True)
+    def test_worker_sends_queued_labels_of_a_site_in_one_request(self, _read_mock):
+        documents = self._labels(3)
+        jobs = [enqueue_claude_extraction(document) for document in documents]
+        backend = FakeLabelBatchBackend({_sha(document.filename): {"product_guess": document.filename} for document in documents})
+
+        with patch("apps.integration.services.claude_extractor.AnthropicLabelBatchBackend", return_value=backend):
+            processed = run_extraction_worker(worker_id="test-worker", once=True)
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(backend.calls, [3])
+        for job, document in zip(jobs, documents):
+            job.refresh_from_db()
+            self.assertEqual(job.status, ExtractionStatus.SUCCEEDED)
+            self.assertEqual(job.normalized_payload["product_guess"], document.filename)
+
+
+class AnthropicLabelBatchBackendTests(SimpleTestCase):
+    def test_prompt_asks_for_a_labels_object_only(self):
+        prompt = _build_label_batch_prompt(3)
+
+        self.assertIn('{"labels": [...]}', prompt)
+        self.assertNotIn("exactly one JSON object", prompt)
+
+    @patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"})
+    def test_raw_response_text_is_kept_for_audit(self):
+        output_text = '{"labels": [{"image_index": 0, "product_guess": "Beurre"}]}'
+        client = MagicMock()
+        client.messages.create.return_value = SimpleNamespace(content=[SimpleNamespace(type="text", text=output_text)])
+        anthropic_module = SimpleNamespace(Anthropic=MagicMock(return_value=client))
+
+        with patch.dict(sys.modules, {"anthropic": anthropic_module}):
+            response = AnthropicLabelBatchBackend().extract_labels([("image/jpeg", b"a"), ("image/jpeg", b"b")])
+
+        self.assertEqual(response.raw_payload["response_text"], output_text)
+        self.assertEqual(response.payloads, [{"product_guess": "Beurre"}, None])
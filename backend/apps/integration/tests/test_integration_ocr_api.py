@@ -1,4 +1,6 @@
-﻿import tempfile
+﻿import hashlib
+import io
+import tempfile
 from pathlib import Path
 
 from django.test import override_settings
@@ -9,6 +11,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 
 from apps.core.models import Site
 from apps.integration.models import DocumentExtraction, IntegrationDocument
+from apps.integration.services.document_storage import persist_document_binary, read_document_bytes
 
 
 @override_settings(MEDIA_ROOT=Path(tempfile.gettempdir()) / "cookops_test_media")
@@ -51,6 +54,50 @@ class IntegrationOcrApiTests(APITestCase):
         self.assertEqual(file_response.status_code, status.HTTP_200_OK)
         self.assertEqual(b"".join(file_response.streaming_content) if hasattr(file_response, "streaming_content") else file_response.content, b"dummy-pdf-content")
 
+    def test_document_file_is_streamed_and_hashed_on_upload(self):
+        content = b"%PDF-" + b"x" * 300_000
+        response = self.client.post(
+            "/api/v1/integration/documents/",
+            {
+                "site": str(self.site.id),
+                "document_type": "invoice",
+                "source": "upload",
+                "file": SimpleUploadedFile("scan.pdf", content, content_type="application/pdf"),
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        document = IntegrationDocument.objects.get(pk=response.json()["id"])
+        self.assertEqual(document.metadata["file_sha256"], hashlib.sha256(content).hexdigest())
+
+        file_response = self.client.get(f"/api/v1/integration/documents/{document.id}/file/")
+
+        self.assertEqual(file_response.status_code, status.HTTP_200_OK)
+        self.assertTrue(file_response.streaming)
+        self.assertEqual(file_response["Content-Length"], str(len(content)))
+        self.assertEqual(b"".join(file_response.streaming_content), content)
+
+    def test_persist_document_binary_hashes_stream_incrementally(self):
+        document = IntegrationDocument.objects.create(
+            site=self.site,
+            document_type="invoice",
+            source="api",
+            filename="stream.pdf",
+            status="uploaded",
+        )
+        content = b"chunked-bytes" * 10_000
+
+        persist_document_binary(
+            document=document,
+            filename="stream.pdf",
+            content_type="application/pdf",
+            stream=io.BytesIO(content),
+        )
+
+        document.refresh_from_db()
+        self.assertEqual(document.metadata["file_sha256"], hashlib.sha256(content).hexdigest())
+        self.assertEqual(read_document_bytes(document)[0], content)
+
     def test_create_extraction_returns_201(self):
         document = IntegrationDocument.objects.create(
             site=self.site,
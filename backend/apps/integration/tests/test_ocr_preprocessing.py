@@ -0,0 +1,98 @@
+import io
+from unittest.mock import patch
+
+from django.test import override_settings
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Site
+from apps.integration.models import IntegrationDocument
+from apps.integration.services.claude_extractor import ClaudeExtractionResult
+from apps.integration.services.ocr_preprocessing import preprocess_for_extraction
+
+
+def _jpeg(size, *, with_exif=True):
+    image = Image.new("RGB", size, "white")
+    options = {}
+    if with_exif:
+        exif = image.getexif()
+        exif[0x010F] = "PhoneMaker"
+        options["exif"] = exif
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95, **options)
+    return buffer.getvalue()
+
+
+def _pdf_with_blank_annex():
+    scan = io.BytesIO()
+    Image.new("RGB", (620, 877), "white").save(scan, format="PDF")
+    scan.seek(0)
+    writer = PdfWriter(clone_from=scan)
+    writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@override_settings(OCR_PREPROCESSING_ENABLED=True, OCR_IMAGE_MAX_EDGE=1000, OCR_IMAGE_JPEG_QUALITY=85)
+class OcrPreprocessingTests(APITestCase):
+    def test_large_photo_is_downscaled_and_exif_stripped(self):
+        original = _jpeg((4000, 3000))
+
+        prepared = preprocess_for_extraction(original, "image/jpeg")
+
+        self.assertEqual(prepared.content_type, "image/jpeg")
+        self.assertLess(prepared.processed_bytes, prepared.original_bytes)
+        image = Image.open(io.BytesIO(prepared.data))
+        self.assertEqual(image.size, (1000, 750))
+        self.assertFalse(image.getexif())
+        self.assertIn("strip_exif", prepared.steps)
+
+    def test_small_image_without_metadata_is_sent_unchanged(self):
+        original = _jpeg((800, 600), with_exif=False)
+
+        prepared = preprocess_for_extraction(original, "image/jpeg")
+
+        self.assertEqual(prepared.data, original)
+        self.assertEqual(prepared.steps, [])
+
+    @override_settings(OCR_PDF_DROP_BLANK_PAGES=True)
+    def test_blank_pdf_pages_are_dropped_when_enabled(self):
+        prepared = preprocess_for_extraction(_pdf_with_blank_annex(), "application/pdf")
+
+        self.assertEqual(len(PdfReader(io.BytesIO(prepared.data)).pages), 1)
+        self.assertEqual(prepared.steps, ["drop_blank_pages:2"])
+
+    def test_blank_pdf_pages_are_kept_by_default(self):
+        original = _pdf_with_blank_annex()
+
+        prepared = preprocess_for_extraction(original, "application/pdf")
+
+        self.assertEqual(prepared.data, original)
+
+    @patch("apps.integration.services.claude_extractor._run_claude_extraction")
+    @patch("apps.integration.services.claude_extractor._read_document_bytes")
+    def test_extraction_records_before_and_after_sizes(self, read_mock, run_mock):
+        read_mock.return_value = _jpeg((3000, 2000))
+        run_mock.return_value = ClaudeExtractionResult(status="succeeded", raw_payload={}, normalized_payload={"ok": True})
+        site = Site.objects.create(name="Prep Site", code="SITE-PREP")
+        document = IntegrationDocument.objects.create(
+            site=site,
+            document_type="label_capture",
+            source="upload",
+            filename="label.jpg",
+            content_type="image/jpeg",
+            status="uploaded",
+        )
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+
+        response = self.client.post(f"/api/v1/integration/documents/{document.id}/extract-claude/", {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        preprocessing = response.json()["raw_payload"]["preprocessing"]
+        self.assertEqual(preprocessing["original_bytes"], len(read_mock.return_value))
+        self.assertLess(preprocessing["processed_bytes"], preprocessing["original_bytes"])
+        sent_bytes = run_mock.call_args.args[1]
+        self.assertEqual(len(sent_bytes), preprocessing["processed_bytes"])
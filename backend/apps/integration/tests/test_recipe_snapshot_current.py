@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime, timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.integration.fiches_snapshots import import_recipe_snapshots_from_v11_envelope
+from apps.integration.models import RecipeSnapshot
+
+
+def _envelope(fiche_id, title, updated_at, qty="1 kg"):
+    return {
+        "export_version": "1.1",
+        "fiches": [
+            {
+                "fiche_id": str(fiche_id),
+                "updated_at": updated_at,
+                "title": title,
+                "category": "Pizze",
+                "ingredients": [{"ingredient_name_raw": "Farina", "quantity_raw": qty}],
+            }
+        ],
+    }
+
+
+class RecipeSnapshotCurrentPointerTests(TestCase):
+    def setUp(self):
+        self.fiche_id = uuid.uuid4()
+
+    def test_import_moves_current_pointer_to_latest_version(self):
+        import_recipe_snapshots_from_v11_envelope(_envelope(self.fiche_id, "Pizza  Margherita", "2026-03-01T08:00:00Z"))
+        import_recipe_snapshots_from_v11_envelope(
+            _envelope(self.fiche_id, "Pizza Margherita", "2026-03-02T08:00:00Z", qty="2 kg")
+        )
+        # An older version imported late does not take over.
+        import_recipe_snapshots_from_v11_envelope(
+            _envelope(self.fiche_id, "Pizza Margherita", "2026-02-01T08:00:00Z", qty="3 kg")
+        )
+
+        current = RecipeSnapshot.objects.filter(fiche_product_id=self.fiche_id, is_current=True)
+        self.assertEqual(current.count(), 1)
+        self.assertEqual(current.get().source_updated_at, datetime(2026, 3, 2, 8, tzinfo=timezone.utc))
+        self.assertEqual(RecipeSnapshot.current_for_fiche(self.fiche_id), current.get())
+
+    def test_title_lookups_are_normalized_and_single_query(self):
+        snapshot = RecipeSnapshot.objects.create(
+            fiche_product_id=self.fiche_id,
+            title="Pizza  Margherita ",
+            snapshot_hash="h1",
+            source_updated_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        )
+        self.assertTrue(snapshot.is_current)
+        self.assertEqual(snapshot.normalized_title, "pizza margherita")
+
+        with CaptureQueriesContext(connection) as queries:
+            exact = RecipeSnapshot.current_for_title("PIZZA margherita")
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual(exact, snapshot)
+        self.assertEqual(RecipeSnapshot.current_for_title("margherita", partial=True), snapshot)
+        self.assertIsNone(RecipeSnapshot.current_for_title("margherita"))
+
+        RecipeSnapshot.objects.filter(pk=snapshot.pk).update(source_active=False)
+        self.assertIsNone(RecipeSnapshot.current_for_title("Pizza Margherita"))
+        self.assertEqual(RecipeSnapshot.current_for_fiche(self.fiche_id), snapshot)
+
+    def test_saves_outside_version_columns_leave_the_current_pointer_alone(self):
+        older = RecipeSnapshot.objects.create(
+            fiche_product_id=self.fiche_id,
+            title="Pizza",
+            snapshot_hash="h1",
+            source_updated_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        )
+        newer = RecipeSnapshot.objects.create(
+            fiche_product_id=self.fiche_id,
+            title="Pizza",
+            snapshot_hash="h2",
+            source_updated_at=datetime(2026, 3, 2, tzinfo=timezone.utc),
+        )
+        self.assertTrue(newer.is_current)
+
+        newer.source_etag = '"v2"'
+        with CaptureQueriesContext(connection) as queries:
+            newer.save(update_fields=["source_etag"])
+        self.assertEqual([q["sql"].split()[0] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]], ["UPDATE"])
+
+        older.source_updated_at = datetime(2026, 3, 3, tzinfo=timezone.utc)
+        older.save(update_fields=["source_updated_at"])
+        self.assertTrue(older.is_current)
+        newer.refresh_from_db()
+        self.assertFalse(newer.is_current)
@@ -0,0 +1,86 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Site
+from apps.integration.services.traccia_client import TracciaClientError
+
+
+@override_settings(TRACCIA_API_BASE_URL="https://traccia.test", TRACCIA_CACHE_TTL_SECONDS=30)
+class TracciaCacheTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="Site Cache", code="SITE-CACHE")
+        caches["traccia"].clear()
+
+    @patch("apps.integration.api.v1.haccp_views.TracciaClient.request_json")
+    def test_repeated_list_is_served_from_cache_until_a_write_invalidates_it(self, request_json_mock):
+        request_json_mock.side_effect = [
+            (status.HTTP_200_OK, {"results": [{"id": "cp-1", "name": "Frigo 1"}]}),
+            (status.HTTP_200_OK, {"id": "sec-1", "name": "Cucina"}),
+            (status.HTTP_200_OK, {"results": [{"id": "cp-1", "name": "Frigo 1 bis"}]}),
+        ]
+        url = f"/api/v1/haccp/traccia/cold-points/?site={self.site.id}"
+
+        first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual(request_json_mock.call_count, 1)
+        self.assertEqual(first.json(), second.json())
+
+        patch_response = self.client.patch(
+            "/api/v1/haccp/traccia/sectors/11111111-1111-1111-1111-111111111111/",
+            {"name": "Cucina"},
+            format="json",
+        )
+        self.assertEqual(patch_response.status_code, status.HTTP_200_OK)
+
+        third = self.client.get(url)
+        self.assertEqual(request_json_mock.call_count, 3)
+        self.assertEqual(third.json()["results"][0]["name"], "Frigo 1 bis")
+
+    @patch("apps.integration.api.v1.haccp_views.TracciaClient.request_json")
+    def test_cache_key_includes_query_params_and_errors_are_not_cached(self, request_json_mock):
+        request_json_mock.side_effect = [
+            TracciaClientError(502, {"detail": "down"}),
+            (status.HTTP_200_OK, {"results": []}),
+            (status.HTTP_200_OK, {"results": [{"id": "r-1"}]}),
+        ]
+        url = f"/api/v1/haccp/traccia/temperature-readings/?site={self.site.id}"
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(self.client.get(url).json(), {"results": []})
+        self.assertEqual(self.client.get(f"{url}&cold_point=cp-1").json(), {"results": [{"id": "r-1"}]})
+        self.assertEqual(request_json_mock.call_count, 3)
+
+    def test_concurrent_identical_misses_share_one_upstream_call(self):
+        from apps.integration.services.traccia_cache import cached_request_json
+
+        calls = []
+
+        class SlowClient:
+            def request_json(self, method, path, params=None, data=None, headers=None):
+                calls.append(path)
+                time.sleep(0.2)
+                return status.HTTP_200_OK, {"results": ["sector"]}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cached_request_json(SlowClient(), "/api/v1/haccp/sectors/", params={"site": "s-1"})
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [(status.HTTP_200_OK, {"results": ["sector"]})] * 5)
@@ -15,6 +15,7 @@ from apps.inventory.api.v1.views import (
     StockPointDetailView,
     StockPointListCreateView,
     InventoryStockSummaryView,
+    InventoryTheoreticalConsumptionView,
 )
 
 
@@ -29,6 +30,11 @@ urlpatterns = [
         InventoryStockSummaryView.as_view(),
         name="inventory-stock-summary",
     ),
+    path(
+        "inventory/theoretical-consumption/",
+        InventoryTheoreticalConsumptionView.as_view(),
+        name="inventory-theoretical-consumption",
+    ),
     path(
         "inventory/inventories/apply/",
         InventoryApplyView.as_view(),
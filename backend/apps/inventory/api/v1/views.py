@@ -1,9 +1,10 @@
 from collections import defaultdict
-from datetime import datetime, time, timezone
+from datetime import date, datetime, time, timezone
 from decimal import Decimal, InvalidOperation
 import uuid
 
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
 from django.shortcuts import get_object_or_404
 from django.utils import timezone as dj_timezone
 from rest_framework import mixins, status, viewsets
@@ -11,6 +12,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.catalog.models import SupplierProduct
+from apps.catalog.services.product_search import search_supplier_products
+from apps.core.api.conditional import build_etag, catalog_markers, etag_matches, not_modified_response, with_etag
 from apps.inventory.api.v1.serializers import (
     InventoryCountLineBulkUpsertSerializer,
     InventoryCountLineSerializer,
@@ -29,6 +32,14 @@ from apps.inventory.models import (
     MovementType,
     StockPoint,
 )
+from apps.inventory.services.lot_allocation import FefoAllocator
+from apps.inventory.services.lot_ledger import record_lot_movements_bulk
+from apps.inventory.services.theoretical_consumption import (
+    MAX_CONSUMPTION_DAYS,
+    compute_theoretical_consumption,
+    post_theoretical_movements,
+    theoretical_variance,
+)
 from apps.core.models import Site
 from apps.purchasing.models import GoodsReceipt, GoodsReceiptLine, Invoice, InvoiceLine
 
@@ -101,11 +112,36 @@ def _current_stock_map_for_site(site_id: str) -> dict[tuple[str, str], dict[str,
     return rows
 
 
+def _stock_summary_markers(site_id: str) -> list:
+    """A few aggregates that change whenever the stock summary of the site would."""
+    movements = InventoryMovement.objects.filter(Q(site_id=site_id) | Q(lot__site_id=site_id)).aggregate(
+        count=Count("id"),
+        last_happened_at=Max("happened_at"),
+        qty=Sum("qty_value"),
+        qty_out=Sum("qty_value", filter=Q(movement_type=MovementType.OUT)),
+    )
+    goods_lines = GoodsReceiptLine.objects.filter(receipt__site_id=site_id).aggregate(
+        count=Count("id"), updated=Max("updated_at")
+    )
+    invoice_lines = InvoiceLine.objects.filter(invoice__site_id=site_id).aggregate(
+        count=Count("id"), updated=Max("updated_at")
+    )
+    # Header-only edits (supplier, dates) do not touch the lines.
+    headers = {
+        "goods_receipts": GoodsReceipt.objects.filter(site_id=site_id).aggregate(updated=Max("updated_at"))["updated"],
+        "invoices": Invoice.objects.filter(site_id=site_id).aggregate(updated=Max("updated_at"))["updated"],
+    }
+    return [movements, goods_lines, invoice_lines, headers, catalog_markers()]
+
+
 class InventoryStockSummaryView(APIView):
     def get(self, request):
         site_id = (request.query_params.get("site") or "").strip()
         if not site_id:
             return Response({"detail": "site query parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+        etag = build_etag(request, *_stock_summary_markers(site_id))
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
 
         movements = list(
             InventoryMovement.objects.select_related("supplier_product", "supplier_product__supplier")
@@ -218,7 +254,7 @@ class InventoryStockSummaryView(APIView):
             for row in grouped.values()
         ]
         results.sort(key=lambda item: (item["product_key"], item["qty_unit"]))
-        return Response({"results": results, "count": len(results)}, status=status.HTTP_200_OK)
+        return with_etag(Response({"results": results, "count": len(results)}, status=status.HTTP_200_OK), etag)
 
 
 class InventorySectorListCreateView(APIView):
@@ -323,14 +359,11 @@ class InventoryProductSearchView(APIView):
         if category:
             queryset = queryset.filter(category__iexact=category)
         if q:
-            queryset = queryset.filter(
-                Q(name__icontains=q)
-                | Q(supplier_sku__icontains=q)
-                | Q(supplier__name__icontains=q)
-                | Q(category__icontains=q)
-            )
+            queryset = search_supplier_products(queryset, q)
+        else:
+            queryset = queryset.order_by("supplier__name", "name")
         products = []
-        for product in queryset.order_by("supplier__name", "name")[: self.SEARCH_LIMIT * 3]:
+        for product in queryset[: self.SEARCH_LIMIT * 3]:
             key = (str(product.id), str(product.uom or "").strip().lower())
             current_row = stock_map.get(key, {"current_stock": Decimal("0"), "last_movement_at": None})
             current_stock = Decimal(str(current_row.get("current_stock") or "0"))
@@ -501,31 +534,43 @@ class InventorySessionCloseView(APIView):
             return Response({"detail": "cancelled session cannot be closed."}, status=status.HTTP_400_BAD_REQUEST)
         now = dj_timezone.now()
         created = 0
-        for line in session.lines.all():
-            delta = Decimal(str(line.delta_qty or "0"))
-            if delta == 0:
-                continue
-            InventoryMovement.objects.create(
-                site=session.site,
-                lot=None,
-                supplier_product=line.supplier_product,
-                supplier_code=line.supplier_product.supplier_sku,
-                raw_product_name=line.supplier_product.name,
-                movement_type=MovementType.IN if delta > 0 else MovementType.OUT,
-                qty_value=abs(delta),
-                qty_unit=line.qty_unit,
-                happened_at=now,
-                ref_type="inventory_session_close",
-                ref_id=str(session.id),
+        movements = []
+        lines = list(session.lines.all())
+        with transaction.atomic():
+            allocator = FefoAllocator.for_supplier_products(
+                session.site_id,
+                [line.supplier_product_id for line in lines if Decimal(str(line.delta_qty or "0")) < 0],
             )
-            created += 1
-        session.status = InventorySessionStatus.CLOSED
-        session.closed_at = now
-        session.save(update_fields=["status", "closed_at", "updated_at"])
+            for line in lines:
+                delta = Decimal(str(line.delta_qty or "0"))
+                if delta == 0:
+                    continue
+                base = {
+                    "site": session.site,
+                    "supplier_product": line.supplier_product,
+                    "supplier_code": line.supplier_product.supplier_sku,
+                    "raw_product_name": line.supplier_product.name,
+                    "qty_unit": line.qty_unit,
+                    "happened_at": now,
+                    "ref_type": "inventory_session_close",
+                    "ref_id": str(session.id),
+                }
+                if delta > 0:
+                    movements.append(InventoryMovement(lot=None, movement_type=MovementType.IN, qty_value=delta, **base))
+                else:
+                    # OUT deltas are split across the product's lots, earliest DLC first.
+                    for lot, qty in allocator.allocate((str(line.supplier_product_id), line.qty_unit), abs(delta)):
+                        movements.append(InventoryMovement(lot=lot, movement_type=MovementType.OUT, qty_value=qty, **base))
+                created += 1
+            record_lot_movements_bulk(movements)
+            session.status = InventorySessionStatus.CLOSED
+            session.closed_at = now
+            session.save(update_fields=["status", "closed_at", "updated_at"])
         return Response(
             {
                 "session_id": str(session.id),
                 "created_adjustments": created,
+                "lot_allocations": sum(1 for movement in movements if movement.lot_id),
                 "closed_at": now.isoformat().replace("+00:00", "Z"),
             },
             status=status.HTTP_200_OK,
@@ -568,47 +613,59 @@ class InventoryApplyView(APIView):
 
         adjustment_id = str(uuid.uuid4())
         applied = []
-        for idx, line in enumerate(lines):
-            if not isinstance(line, dict):
-                continue
-            product_key = str(line.get("supplier_code") or line.get("product_key") or line.get("raw_product_name") or "").strip()
-            qty_unit = str(line.get("qty_unit") or "").strip().lower()
-            if not product_key or not qty_unit:
-                continue
-            raw_qty = str(line.get("qty_value") or "").replace(",", ".").strip()
-            try:
-                target_qty = Decimal(raw_qty)
-            except (InvalidOperation, ValueError):
-                continue
-            current_qty = current_by_key.get((product_key, qty_unit), Decimal("0"))
-            delta = target_qty - current_qty
-            if delta == 0:
-                continue
-            movement_type = "IN" if delta > 0 else "OUT"
-            InventoryMovement.objects.create(
-                site_id=site_id,
-                lot=None,
-                supplier_product=None,
-                supplier_code=product_key if line.get("supplier_code") else None,
-                raw_product_name=product_key if not line.get("supplier_code") else str(line.get("raw_product_name") or ""),
-                movement_type=movement_type,
-                qty_value=abs(delta),
-                qty_unit=qty_unit,
-                happened_at=happened_at,
-                ref_type="inventory_adjustment",
-                ref_id=adjustment_id,
+        movements = []
+        with transaction.atomic():
+            allocator = FefoAllocator.for_supplier_codes(
+                site_id,
+                [line.get("supplier_code") for line in lines if isinstance(line, dict)],
             )
-            applied.append(
-                {
-                    "line": idx,
-                    "product_key": product_key,
-                    "qty_unit": qty_unit,
-                    "current_qty": f"{current_qty:.3f}",
-                    "target_qty": f"{target_qty:.3f}",
-                    "delta": f"{delta:.3f}",
+            for idx, line in enumerate(lines):
+                if not isinstance(line, dict):
+                    continue
+                product_key = str(line.get("supplier_code") or line.get("product_key") or line.get("raw_product_name") or "").strip()
+                qty_unit = str(line.get("qty_unit") or "").strip().lower()
+                if not product_key or not qty_unit:
+                    continue
+                raw_qty = str(line.get("qty_value") or "").replace(",", ".").strip()
+                try:
+                    target_qty = Decimal(raw_qty)
+                except (InvalidOperation, ValueError):
+                    continue
+                current_qty = current_by_key.get((product_key, qty_unit), Decimal("0"))
+                delta = target_qty - current_qty
+                if delta == 0:
+                    continue
+                movement_type = "IN" if delta > 0 else "OUT"
+                base = {
+                    "site_id": site_id,
+                    "supplier_product": None,
+                    "supplier_code": product_key if line.get("supplier_code") else None,
+                    "raw_product_name": product_key if not line.get("supplier_code") else str(line.get("raw_product_name") or ""),
                     "movement_type": movement_type,
+                    "qty_unit": qty_unit,
+                    "happened_at": happened_at,
+                    "ref_type": "inventory_adjustment",
+                    "ref_id": adjustment_id,
                 }
-            )
+                if movement_type == "OUT" and line.get("supplier_code"):
+                    lot_key = allocator.code_key(product_key, qty_unit, supplier_id=line.get("supplier_id") or line.get("supplier"))
+                    allocations = allocator.allocate(lot_key, abs(delta))
+                else:
+                    allocations = [(None, abs(delta))]
+                for lot, qty in allocations:
+                    movements.append(InventoryMovement(lot=lot, qty_value=qty, **base))
+                applied.append(
+                    {
+                        "line": idx,
+                        "product_key": product_key,
+                        "qty_unit": qty_unit,
+                        "current_qty": f"{current_qty:.3f}",
+                        "target_qty": f"{target_qty:.3f}",
+                        "delta": f"{delta:.3f}",
+                        "movement_type": movement_type,
+                    }
+                )
+            record_lot_movements_bulk(movements)
 
         return Response(
             {
@@ -693,3 +750,80 @@ class InventoryRebuildFromPurchasingView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+def _consumption_range(params) -> tuple[str, date, date] | Response:
+    site_id = str(params.get("site") or "").strip()
+    if not site_id:
+        return Response({"detail": "site is required."}, status=status.HTTP_400_BAD_REQUEST)
+    if not Site.objects.filter(pk=site_id).exists():
+        return Response({"detail": "site not found."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        start = date.fromisoformat(str(params.get("date") or ""))
+        end = date.fromisoformat(str(params.get("date_to") or start))
+    except ValueError:
+        return Response({"detail": "date and date_to must be YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+    if end < start:
+        return Response({"detail": "date_to must not be before date."}, status=status.HTTP_400_BAD_REQUEST)
+    if (end - start).days >= MAX_CONSUMPTION_DAYS:
+        return Response(
+            {"detail": f"Date range is limited to {MAX_CONSUMPTION_DAYS} days."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    return site_id, start, end
+
+
+class InventoryTheoreticalConsumptionView(APIView):
+    """Ingredient usage implied by POS sales and recipe BOMs, compared with (or posted as) OUT movements."""
+
+    def get(self, request):
+        parsed = _consumption_range(request.query_params)
+        if isinstance(parsed, Response):
+            return parsed
+        site_id, start, end = parsed
+        result = compute_theoretical_consumption(site_id, start, end)
+        days = [
+            {
+                "date": sales_date.isoformat(),
+                "rows": [
+                    {
+                        "ingredient": ingredient,
+                        "supplier": supplier or None,
+                        "supplier_code": supplier_code or None,
+                        "qty_total": f"{qty:.3f}",
+                        "unit": unit,
+                    }
+                    for (ingredient, supplier, supplier_code, unit), qty in sorted(usage.items())
+                ],
+            }
+            for sales_date, usage in result["days"].items()
+        ]
+        return Response(
+            {
+                "site": site_id,
+                "date": start.isoformat(),
+                "date_to": end.isoformat(),
+                "days": days,
+                "variance": theoretical_variance(site_id, start, end, result["days"]),
+                "unmatched": {title: str(qty) for title, qty in result["unmatched"].items()},
+                "warnings": result["warnings"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def post(self, request):
+        payload = request.data if isinstance(request.data, dict) else {}
+        parsed = _consumption_range(payload)
+        if isinstance(parsed, Response):
+            return parsed
+        site_id, start, end = parsed
+        result = post_theoretical_movements(site_id, start, end)
+        return Response(
+            {
+                "site": site_id,
+                "date": start.isoformat(),
+                "date_to": end.isoformat(),
+                **result,
+                "unmatched": {title: str(qty) for title, qty in result["unmatched"].items()},
+            },
+            status=status.HTTP_200_OK,
+        )
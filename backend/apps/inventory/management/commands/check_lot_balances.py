@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.inventory.models import Lot
+from apps.inventory.services.lot_ledger import find_lot_balance_drift
+
+
+class Command(BaseCommand):
+    help = "Ricalcola le quantita dei lotti dai movimenti (una query aggregata) e segnala le differenze."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", default="", help="UUID sito. Default: tutti i siti.")
+        parser.add_argument("--fix", action="store_true", help="Riallinea qty_value al saldo dei movimenti.")
+
+    def handle(self, *args, **options):
+        site_id = str(options["site"] or "").strip() or None
+        drift_rows = find_lot_balance_drift(site_id)
+        for row in drift_rows:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"DRIFT {row['lot_id']} {row['internal_lot_code']} "
+                    f"qty={row['qty_value']} ledger={row['ledger_qty']} drift={row['drift']}"
+                )
+            )
+        if options["fix"] and drift_rows:
+            with transaction.atomic():
+                for row in drift_rows:
+                    Lot.objects.filter(pk=row["lot_id"]).update(qty_value=row["ledger_qty"])
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift_rows)} lots."))
+        elif not drift_rows:
+            self.stdout.write(self.style.SUCCESS("All lot balances match their movements."))
+        else:
+            self.stdout.write(f"{len(drift_rows)} lots drifted. Re-run with --fix to realign them.")
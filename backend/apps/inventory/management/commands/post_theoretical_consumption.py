@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.services.theoretical_consumption import MAX_CONSUMPTION_DAYS, post_theoretical_movements
+
+
+class Command(BaseCommand):
+    help = "Registra i consumi teorici (vendite POS x distinta base delle fiche) come movimenti OUT giornalieri."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", required=True, help="UUID sito.")
+        parser.add_argument("--date-from", required=True, help="Primo giorno di vendita (YYYY-MM-DD).")
+        parser.add_argument("--date-to", default="", help="Ultimo giorno di vendita (YYYY-MM-DD). Default: date-from.")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["date_from"])
+            end = date.fromisoformat(options["date_to"] or options["date_from"])
+        except ValueError as exc:
+            raise CommandError("Le date devono essere nel formato YYYY-MM-DD.") from exc
+        if end < start or (end - start).days >= MAX_CONSUMPTION_DAYS:
+            raise CommandError(f"Intervallo non valido: massimo {MAX_CONSUMPTION_DAYS} giorni.")
+
+        result = post_theoretical_movements(options["site"], start, end)
+        for warning in result["warnings"]:
+            self.stdout.write(self.style.WARNING(warning))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['days']} giorni elaborati: {result['created']} movimenti creati, "
+                f"{result['deleted']} sostituiti."
+            )
+        )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Hashable, Iterable
+from datetime import date
+from decimal import Decimal
+
+from apps.inventory.models import Lot, LotStatus
+
+LotKey = tuple[Hashable, str]
+
+
+class FefoAllocator:
+    """
+    First-expired-first-out allocation over the active lots of one site.
+
+    Lots are loaded (and row-locked) once per batch and kept in one heap per
+    (product key, unit), ordered by DLC, then production date, then lot code.
+    Call it inside the transaction that writes the resulting movements.
+    """
+
+    def __init__(self, lots_by_key: dict[LotKey, list[Lot]]):
+        self._suppliers_by_code: dict[tuple[str, str], set[str]] = {}
+        self._lots: dict[str, Lot] = {}
+        self._remaining: dict[str, Decimal] = {}
+        self._heaps: dict[LotKey, list[tuple[date, date, str, str]]] = {}
+        for key, lots in lots_by_key.items():
+            heap = []
+            for lot in lots:
+                lot_id = str(lot.id)
+                self._lots[lot_id] = lot
+                self._remaining[lot_id] = Decimal(str(lot.qty_value))
+                heap.append((lot.dlc_date or date.max, lot.production_date or date.max, lot.internal_lot_code, lot_id))
+            heapq.heapify(heap)
+            self._heaps[key] = heap
+
+    @staticmethod
+    def _active_lots(site_id):
+        return (
+            Lot.objects.select_for_update(of=("self",))
+            .filter(site_id=site_id, status=LotStatus.ACTIVE, qty_value__gt=0)
+            .order_by()
+        )
+
+    @classmethod
+    def for_supplier_products(cls, site_id, supplier_product_ids: Iterable) -> "FefoAllocator":
+        lots_by_key: dict[LotKey, list[Lot]] = {}
+        ids = {str(item) for item in supplier_product_ids if item}
+        if ids:
+            for lot in cls._active_lots(site_id).filter(supplier_product_id__in=ids):
+                lots_by_key.setdefault((str(lot.supplier_product_id), lot.qty_unit), []).append(lot)
+        return cls(lots_by_key)
+
+    @classmethod
+    def for_supplier_codes(cls, site_id, supplier_codes: Iterable[str]) -> "FefoAllocator":
+        """
+        Lots are pooled per (supplier, code, unit): the same SKU from two suppliers is two products.
+        Resolve allocation keys with code_key().
+        """
+        lots_by_key: dict[LotKey, list[Lot]] = {}
+        codes = {str(item).strip() for item in supplier_codes if str(item or "").strip()}
+        if codes:
+            lots = cls._active_lots(site_id).filter(supplier_product__supplier_sku__in=codes).select_related("supplier_product")
+            for lot in lots:
+                product_key = (str(lot.supplier_product.supplier_id), lot.supplier_product.supplier_sku)
+                lots_by_key.setdefault((product_key, lot.qty_unit), []).append(lot)
+        allocator = cls(lots_by_key)
+        for (supplier_id, code), unit in lots_by_key:
+            allocator._suppliers_by_code.setdefault((code, unit), set()).add(supplier_id)
+        return allocator
+
+    def code_key(self, supplier_code: str, qty_unit: str, supplier_id=None) -> LotKey | None:
+        """
+        Allocation key of a supplier code. Without a supplier the code must belong to lots of a single
+        supplier; an ambiguous code returns None, so nothing is allocated to a guessed lot.
+        """
+        if supplier_id:
+            return ((str(supplier_id), supplier_code), qty_unit)
+        suppliers = self._suppliers_by_code.get((supplier_code, qty_unit), set())
+        if len(suppliers) != 1:
+            return None
+        return ((next(iter(suppliers)), supplier_code), qty_unit)
+
+    def allocate(self, key: LotKey | None, qty: Decimal) -> list[tuple[Lot | None, Decimal]]:
+        """Split qty across lots; any quantity no lot can cover is returned with lot None."""
+        remaining = Decimal(str(qty))
+        allocations: list[tuple[Lot | None, Decimal]] = []
+        heap = self._heaps.get(key, [])
+        while remaining > 0 and heap:
+            entry = heap[0]
+            lot_id = entry[3]
+            available = self._remaining[lot_id]
+            taken = min(available, remaining)
+            allocations.append((self._lots[lot_id], taken))
+            remaining -= taken
+            self._remaining[lot_id] = available - taken
+            if self._remaining[lot_id] <= 0:
+                heapq.heappop(heap)
+        if remaining > 0:
+            allocations.append((None, remaining))
+        return allocations
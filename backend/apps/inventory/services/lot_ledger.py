@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, QuerySet, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.inventory.models import InventoryMovement, Lot, LotStatus, MovementType
+
+
+def movement_delta(movement_type: str, qty_value: Decimal) -> Decimal:
+    qty = Decimal(str(qty_value or "0"))
+    return -qty if movement_type == MovementType.OUT else qty
+
+
+def _signed_qty(prefix: str = ""):
+    # OUT movements decrease a lot; IN, ADJUST and TRANSFER rows carry signed quantities as-is.
+    return Case(
+        When(**{f"{prefix}movement_type": MovementType.OUT}, then=-F(f"{prefix}qty_value")),
+        default=F(f"{prefix}qty_value"),
+        output_field=DecimalField(max_digits=14, decimal_places=3),
+    )
+
+
+def _sync_lot_status(lot_ids) -> None:
+    """Mark emptied active lots consumed, and reactivate consumed lots whose balance is positive again."""
+    lot_ids = list(lot_ids)
+    if not lot_ids:
+        return
+    Lot.objects.filter(pk__in=lot_ids, status=LotStatus.ACTIVE, qty_value__lte=0).update(status=LotStatus.CONSUMED)
+    Lot.objects.filter(pk__in=lot_ids, status=LotStatus.CONSUMED, qty_value__gt=0).update(status=LotStatus.ACTIVE)
+
+
+def record_lot_movement(**fields: Any) -> InventoryMovement:
+    """Create a movement and apply its delta to the lot balance in the same transaction."""
+    with transaction.atomic():
+        movement = InventoryMovement.objects.create(**fields)
+        if movement.lot_id:
+            Lot.objects.filter(pk=movement.lot_id).update(
+                qty_value=F("qty_value") + movement_delta(movement.movement_type, movement.qty_value)
+            )
+            _sync_lot_status([movement.lot_id])
+    return movement
+
+
+def record_lot_movements_bulk(movements: list[InventoryMovement]) -> list[InventoryMovement]:
+    """
+    bulk_create movements and apply one F-expression update per touched lot.
+    Lots whose balance drops to zero or below are marked consumed; consumed lots brought back above zero
+    (a reversal or an upward adjustment) become active again.
+    """
+    deltas: dict = {}
+    for movement in movements:
+        if movement.lot_id:
+            deltas[movement.lot_id] = deltas.get(movement.lot_id, Decimal("0")) + movement_delta(
+                movement.movement_type, movement.qty_value
+            )
+    with transaction.atomic():
+        created = InventoryMovement.objects.bulk_create(movements, batch_size=500)
+        for lot_id, delta in deltas.items():
+            if delta:
+                Lot.objects.filter(pk=lot_id).update(qty_value=F("qty_value") + delta)
+        _sync_lot_status(deltas)
+    return created
+
+
+def delete_lot_movements(movements: QuerySet[InventoryMovement]) -> int:
+    """Delete movements and take their summed delta off each impacted lot (one grouped query)."""
+    with transaction.atomic():
+        deltas = list(
+            movements.filter(lot__isnull=False)
+            .values("lot_id")
+            .annotate(delta=Sum(_signed_qty()))
+            .order_by()
+        )
+        deleted, _details = movements.delete()
+        for row in deltas:
+            if row["delta"]:
+                Lot.objects.filter(pk=row["lot_id"]).update(qty_value=F("qty_value") - row["delta"])
+        _sync_lot_status(row["lot_id"] for row in deltas if row["delta"])
+    return deleted
+
+
+def lots_with_ledger_qty(site_id=None) -> QuerySet[Lot]:
+    lots = Lot.objects.all()
+    if site_id:
+        lots = lots.filter(site_id=site_id)
+    return lots.annotate(
+        ledger_qty=Coalesce(
+            Sum(_signed_qty("movements__")),
+            Value(Decimal("0")),
+            output_field=DecimalField(max_digits=14, decimal_places=3),
+        )
+    )
+
+
+def find_lot_balance_drift(site_id=None) -> list[dict[str, Any]]:
+    return [
+        {
+            "lot_id": str(lot.id),
+            "site": str(lot.site_id),
+            "internal_lot_code": lot.internal_lot_code,
+            "qty_value": lot.qty_value,
+            "ledger_qty": lot.ledger_qty,
+            "drift": lot.qty_value - lot.ledger_qty,
+        }
+        for lot in lots_with_ledger_qty(site_id).exclude(qty_value=F("ledger_qty")).order_by("internal_lot_code")
+    ]
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.utils import timezone
+
+from apps.catalog.models import SupplierProduct, normalize_supplier_name
+from apps.core.services.service_ingredients import extract_ingredients, normalize_qty_unit
+from apps.integration.models import RecipeSnapshot, normalize_recipe_title
+from apps.inventory.models import InventoryMovement, MovementType, QtyUnit
+from apps.pos.models import SalesLine
+
+THEORETICAL_REF_TYPE = "pos_theoretical_consumption"
+MAX_CONSUMPTION_DAYS = 31
+MAX_BOM_DEPTH = 6
+QTY_STEP = Decimal("0.001")
+
+# (ingredient, supplier, supplier_code, unit)
+IngredientKey = tuple[str, str, str, str]
+
+
+def _current_snapshots():
+    return RecipeSnapshot.objects.filter(is_current=True).select_related("ingredients_block")
+
+
+class _BomResolver:
+    """
+    Flattens recipe BOMs to raw ingredient quantities per portion. Snapshots are loaded level by level with
+    one query per lookup kind, and each recipe is flattened once however many times it was sold.
+    """
+
+    def __init__(self):
+        self.by_fiche: dict[str, RecipeSnapshot] = {}
+        self.by_title: dict[str, RecipeSnapshot | None] = {}
+        self.warnings: list[str] = []
+        self._per_portion: dict = {}
+
+    def load(self, fiche_product_ids: set[str], titles: set[str]) -> None:
+        if fiche_product_ids:
+            for snapshot in _current_snapshots().filter(fiche_product_id__in=fiche_product_ids):
+                self.by_fiche[str(snapshot.fiche_product_id)] = snapshot
+        pending = {normalize_recipe_title(title) for title in titles} - {""}
+        for snapshot in self.by_fiche.values():
+            pending |= self._ingredient_titles(snapshot)
+        for _level in range(MAX_BOM_DEPTH + 1):
+            pending -= self.by_title.keys()
+            if not pending:
+                break
+            found = {}
+            for snapshot in (
+                _current_snapshots()
+                .filter(source_active=True, normalized_title__in=pending)
+                .order_by(*RecipeSnapshot.LATEST_FIRST)
+            ):
+                found.setdefault(snapshot.normalized_title, snapshot)
+            for title in pending:
+                self.by_title[title] = found.get(title)
+            pending = set()
+            for snapshot in found.values():
+                pending |= self._ingredient_titles(snapshot)
+
+    @staticmethod
+    def _ingredient_titles(snapshot: RecipeSnapshot) -> set[str]:
+        return {normalize_recipe_title(ing["name"]) for ing in extract_ingredients(snapshot.full_payload)}
+
+    def resolve(self, fiche_product_id: str, title: str) -> RecipeSnapshot | None:
+        if fiche_product_id and fiche_product_id in self.by_fiche:
+            return self.by_fiche[fiche_product_id]
+        return self.by_title.get(normalize_recipe_title(title))
+
+    def per_portion(self, snapshot: RecipeSnapshot, stack: tuple = ()) -> dict[IngredientKey, Decimal]:
+        if snapshot.pk in self._per_portion:
+            return self._per_portion[snapshot.pk]
+        portions = snapshot.portions if snapshot.portions and snapshot.portions > 0 else Decimal("1")
+        stack = (*stack, snapshot.pk)
+        flattened: dict[IngredientKey, Decimal] = defaultdict(lambda: Decimal("0"))
+        for ing in extract_ingredients(snapshot.full_payload):
+            qty = ing["qty"] / portions
+            nested = self.by_title.get(normalize_recipe_title(ing["name"]))
+            if nested is not None and nested.pk in stack:
+                self.warnings.append(f"Ciclo rilevato su preparazione interna '{ing['name']}'. Espansione saltata.")
+                nested = None
+            if nested is not None and len(stack) > MAX_BOM_DEPTH:
+                self.warnings.append(
+                    f"Espansione ingredienti interrotta: profondita massima superata per '{snapshot.title}'."
+                )
+                nested = None
+            if nested is not None:
+                nested_items = self.per_portion(nested, stack)
+                if nested_items:
+                    if qty <= 0:
+                        # One portion of the preparation per batch of this recipe. nested_items is already per
+                        # portion of the preparation, so only this recipe's portions divide it. (The service
+                        # ingredients view counts one portion per menu placement; sales have no placements.)
+                        self.warnings.append(
+                            f"'{ing['name']}': quantita non valorizzata, applicata assunzione 1 porzione per espansione ingredienti."
+                        )
+                        qty = Decimal("1") / portions
+                    for key, nested_qty in nested_items.items():
+                        flattened[key] += nested_qty * qty
+                    continue
+            qty_normalized, unit = normalize_qty_unit(qty, ing["unit"])
+            flattened[(ing["name"], ing["supplier"], ing["supplier_code"], unit)] += qty_normalized
+        self._per_portion[snapshot.pk] = dict(flattened)
+        return self._per_portion[snapshot.pk]
+
+
+def compute_theoretical_consumption(site_id, start: date, end: date | None = None) -> dict:
+    """
+    Theoretical ingredient usage of every sales day in [start, end]: POS lines, summed per item by the
+    database, are matched to the current fiche (by fiche_product_id, else by title) and multiplied through
+    its flattened BOM.
+    Returns {"days": {date: {IngredientKey: qty}}, "unmatched": {title: qty}, "warnings": [...]}.
+    """
+    end = end or start
+    sold_by_day: dict[date, dict[tuple[str, str], Decimal]] = defaultdict(dict)
+    labels: dict[tuple[str, str], str] = {}
+    for sales_date, fiche_product_id, normalized_title, qty, label in (
+        SalesLine.objects.filter(site_id=site_id, sales_date__range=(start, end))
+        .values_list("sales_date", "fiche_product_id", "normalized_title")
+        .annotate(qty=Sum("qty"), label=Max("title"))
+        .order_by("sales_date")
+    ):
+        item = (str(fiche_product_id or ""), normalized_title)
+        if qty and any(item):
+            sold_by_day[sales_date][item] = qty
+            labels.setdefault(item, label or item[0])
+
+    items = {item for sold in sold_by_day.values() for item in sold}
+    resolver = _BomResolver()
+    resolver.load({fiche_id for fiche_id, _title in items if fiche_id}, {title for _fiche_id, title in items})
+
+    days: dict[date, dict[IngredientKey, Decimal]] = {}
+    unmatched: dict[str, Decimal] = defaultdict(lambda: Decimal("0"))
+    for sales_date, sold in sold_by_day.items():
+        usage: dict[IngredientKey, Decimal] = defaultdict(lambda: Decimal("0"))
+        for item, qty in sold.items():
+            snapshot = resolver.resolve(*item)
+            if snapshot is None:
+                unmatched[labels[item]] += qty
+                continue
+            for key, per_portion in resolver.per_portion(snapshot).items():
+                usage[key] += per_portion * qty
+        days[sales_date] = dict(usage)
+
+    warnings = list(dict.fromkeys(resolver.warnings))
+    warnings.extend(f"'{title}': nessuna fiche importata trovata (uuid/titolo)." for title in unmatched)
+    return {"days": days, "unmatched": dict(unmatched), "warnings": warnings}
+
+
+def _ingredient_match_key(name: str, supplier_code: str, unit: str) -> tuple[str, str]:
+    return ((supplier_code or "").strip().lower() or normalize_recipe_title(name), unit)
+
+
+def theoretical_variance(site_id, start: date, end: date, days: dict[date, dict[IngredientKey, Decimal]]) -> list[dict]:
+    """
+    Theoretical usage against recorded OUT movements of the site in the same days, matched on supplier code
+    (else ingredient name) and unit. Posted theoretical movements are left out of the actual side.
+    """
+    rows: dict[tuple[str, str], dict] = {}
+    for usage in days.values():
+        for (ingredient, _supplier, supplier_code, unit), qty in usage.items():
+            row = rows.setdefault(
+                _ingredient_match_key(ingredient, supplier_code, unit),
+                {
+                    "ingredient": ingredient,
+                    "supplier_code": supplier_code or None,
+                    "unit": unit,
+                    "theoretical_qty": Decimal("0"),
+                    "actual_qty": Decimal("0"),
+                },
+            )
+            row["theoretical_qty"] += qty
+
+    actual = (
+        InventoryMovement.objects.filter(
+            Q(site_id=site_id) | Q(lot__site_id=site_id),
+            movement_type=MovementType.OUT,
+            happened_at__date__range=(start, end),
+        )
+        .exclude(ref_type=THEORETICAL_REF_TYPE)
+        .values("supplier_product__supplier_sku", "supplier_code", "raw_product_name", "qty_unit")
+        .annotate(qty=Sum("qty_value"))
+    )
+    for item in actual:
+        supplier_code = item["supplier_product__supplier_sku"] or item["supplier_code"] or ""
+        ingredient = item["raw_product_name"] or supplier_code
+        row = rows.setdefault(
+            _ingredient_match_key(ingredient, supplier_code, item["qty_unit"]),
+            {
+                "ingredient": ingredient,
+                "supplier_code": supplier_code or None,
+                "unit": item["qty_unit"],
+                "theoretical_qty": Decimal("0"),
+                "actual_qty": Decimal("0"),
+            },
+        )
+        row["actual_qty"] += item["qty"]
+
+    return [
+        {
+            **row,
+            "theoretical_qty": str(row["theoretical_qty"].quantize(QTY_STEP)),
+            "actual_qty": str(row["actual_qty"].quantize(QTY_STEP)),
+            "variance_qty": str((row["actual_qty"] - row["theoretical_qty"]).quantize(QTY_STEP)),
+        }
+        for row in sorted(rows.values(), key=lambda item: (item["ingredient"].lower(), item["unit"]))
+    ]
+
+
+def _resolve_product(candidates: list[SupplierProduct], supplier: str, supplier_code: str, warnings: list[str]):
+    """
+    The product behind a recipe's supplier code: the one of the recipe's supplier, else the only product
+    with that code. Codes shared by several suppliers are left unlinked and reported.
+    """
+    wanted = normalize_supplier_name(supplier)
+    matches = [product for product in candidates if wanted and normalize_supplier_name(product.supplier.name) == wanted]
+    if not matches and len(candidates) == 1:
+        matches = candidates
+    if len(matches) == 1:
+        return matches[0].pk
+    if len(candidates) > 1:
+        warnings.append(
+            f"Codice fornitore '{supplier_code}' ambiguo tra piu fornitori: movimento registrato senza prodotto."
+        )
+    return None
+
+
+def post_theoretical_movements(site_id, start: date, end: date | None = None) -> dict:
+    """
+    Replace the theoretical OUT movements of the site for [start, end] with one movement per day and ingredient.
+    Days are rewritten as a whole, so re-running after a sales correction is safe.
+    """
+    end = end or start
+    result = compute_theoretical_consumption(site_id, start, end)
+    supported_units = set(QtyUnit.values)
+    coded = sorted({(key[1], key[2]) for usage in result["days"].values() for key in usage if key[2]})
+    products_by_code: dict[str, list[SupplierProduct]] = defaultdict(list)
+    for product in SupplierProduct.objects.filter(
+        active=True, supplier_sku__in={code for _supplier, code in coded}
+    ).select_related("supplier"):
+        products_by_code[product.supplier_sku].append(product)
+
+    warnings = list(result["warnings"])
+    product_ids = {
+        (supplier, code): _resolve_product(products_by_code[code], supplier, code, warnings) for supplier, code in coded
+    }
+    movements = []
+    for sales_date, usage in result["days"].items():
+        happened_at = timezone.make_aware(datetime.combine(sales_date, time(23, 59, 59)))
+        for (ingredient, supplier, supplier_code, unit), qty in sorted(usage.items()):
+            qty = qty.quantize(QTY_STEP)
+            if qty <= 0:
+                continue
+            if unit not in supported_units:
+                warnings.append(f"'{ingredient}': unita '{unit}' non gestita in magazzino, movimento non registrato.")
+                continue
+            movements.append(
+                InventoryMovement(
+                    site_id=site_id,
+                    supplier_product_id=product_ids.get((supplier, supplier_code)),
+                    supplier_code=supplier_code or None,
+                    raw_product_name=ingredient[:255],
+                    movement_type=MovementType.OUT,
+                    qty_value=qty,
+                    qty_unit=unit,
+                    happened_at=happened_at,
+                    ref_type=THEORETICAL_REF_TYPE,
+                    ref_id=sales_date.isoformat(),
+                )
+            )
+
+    day_refs = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+    with transaction.atomic():
+        deleted, _by_model = InventoryMovement.objects.filter(
+            site_id=site_id, ref_type=THEORETICAL_REF_TYPE, ref_id__in=day_refs
+        ).delete()
+        InventoryMovement.objects.bulk_create(movements, batch_size=500)
+    return {
+        "days": len(result["days"]),
+        "created": len(movements),
+        "deleted": deleted,
+        "unmatched": result["unmatched"],
+        "warnings": list(dict.fromkeys(warnings)),
+    }
@@ -4,6 +4,7 @@ from rest_framework.test import APITestCase
 from apps.catalog.models import Supplier, SupplierProduct
 from apps.core.models import Site
 from apps.inventory.models import InventoryMovement
+from apps.purchasing.models import GoodsReceipt
 
 
 class InventoryStockSummaryApiTests(APITestCase):
@@ -49,3 +50,51 @@ class InventoryStockSummaryApiTests(APITestCase):
         self.assertEqual(row["product_key"], "0261249")
         self.assertEqual(row["product_name"], self.product.name)
         self.assertEqual(row["current_stock"], "15.000")
+
+    def test_stock_summary_answers_304_until_a_movement_changes_it(self):
+        InventoryMovement.objects.create(
+            site=self.site,
+            supplier_product=self.product,
+            movement_type="IN",
+            qty_value="4.000",
+            qty_unit="l",
+            happened_at="2026-03-01T08:00:00Z",
+        )
+        url = f"/api/v1/inventory/stock-summary/?site={self.site.id}"
+
+        first = self.client.get(url)
+        etag = first["ETag"]
+        self.assertTrue(etag)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], etag)
+        self.assertEqual(cached.content, b"")
+
+        InventoryMovement.objects.create(
+            site=self.site,
+            supplier_product=self.product,
+            movement_type="OUT",
+            qty_value="1.000",
+            qty_unit="l",
+            happened_at="2026-03-01T12:00:00Z",
+        )
+        refreshed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(refreshed["ETag"], etag)
+        self.assertEqual(refreshed.json()["results"][0]["current_stock"], "3.000")
+
+    def test_stock_summary_etag_follows_receipt_header_edits(self):
+        receipt = GoodsReceipt.objects.create(
+            site=self.site,
+            supplier=self.supplier,
+            delivery_note_number="DDT-1",
+            received_at="2026-03-01T08:00:00Z",
+        )
+        url = f"/api/v1/inventory/stock-summary/?site={self.site.id}"
+        etag = self.client.get(url)["ETag"]
+
+        receipt.delivery_note_number = "DDT-1-BIS"
+        receipt.save(update_fields=["delivery_note_number", "updated_at"])
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
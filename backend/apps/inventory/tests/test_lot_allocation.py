@@ -0,0 +1,211 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import Supplier, SupplierProduct
+from apps.core.models import Site
+from apps.integration.models import DocumentExtraction, DocumentSource, DocumentType, IntegrationDocument
+from apps.inventory.models import (
+    InventoryCountLine,
+    InventoryMovement,
+    InventorySession,
+    Lot,
+    LotStatus,
+    MovementType,
+    SourceType,
+)
+from apps.inventory.services.lot_allocation import FefoAllocator
+from apps.inventory.services.lot_ledger import delete_lot_movements, record_lot_movements_bulk
+
+
+class LotAllocationTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="FEFO Site", code="FEFO")
+        self.supplier = Supplier.objects.create(name="Metro")
+        self.product = SupplierProduct.objects.create(
+            supplier=self.supplier,
+            name="Creme 35%",
+            supplier_sku="CREME-35",
+            uom="l",
+            category="bof",
+        )
+        self.late = self._lot("LOT-LATE", "4.000", date(2026, 5, 20))
+        self.early = self._lot("LOT-EARLY", "1.500", date(2026, 5, 2))
+        self.middle = self._lot("LOT-MID", "3.000", date(2026, 5, 10))
+
+    def _lot(self, code, qty, dlc_date):
+        return Lot.objects.create(
+            site=self.site,
+            source_type=SourceType.SUPPLIER_PRODUCT,
+            supplier_product=self.product,
+            internal_lot_code=code,
+            dlc_date=dlc_date,
+            qty_value=Decimal(qty),
+            qty_unit="l",
+        )
+
+    def test_allocator_consumes_earliest_dlc_first_and_reports_uncovered_rest(self):
+        with transaction.atomic():
+            allocator = FefoAllocator.for_supplier_products(self.site.id, [self.product.id])
+            first = allocator.allocate((str(self.product.id), "l"), Decimal("2.000"))
+            second = allocator.allocate((str(self.product.id), "l"), Decimal("7.000"))
+
+        self.assertEqual(
+            [(lot.internal_lot_code, qty) for lot, qty in first],
+            [("LOT-EARLY", Decimal("1.500")), ("LOT-MID", Decimal("0.500"))],
+        )
+        self.assertEqual(
+            [(lot.internal_lot_code if lot else None, qty) for lot, qty in second],
+            [("LOT-MID", Decimal("2.500")), ("LOT-LATE", Decimal("4.000")), (None, Decimal("0.500"))],
+        )
+
+    def test_session_close_splits_out_movement_across_lots(self):
+        session = InventorySession.objects.create(site=self.site, status="in_progress")
+        InventoryCountLine.objects.create(
+            session=session,
+            supplier_product=self.product,
+            qty_value=Decimal("5.500"),
+            qty_unit="l",
+            expected_qty=Decimal("8.500"),
+            delta_qty=Decimal("-3.000"),
+        )
+
+        response = self.client.post(f"/api/v1/inventory/sessions/{session.id}/close/", {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["created_adjustments"], 1)
+        self.assertEqual(response.json()["lot_allocations"], 2)
+        movements = InventoryMovement.objects.filter(ref_type="inventory_session_close").order_by("qty_value")
+        self.assertEqual(
+            [(movement.lot.internal_lot_code, movement.qty_value) for movement in movements],
+            [("LOT-EARLY", Decimal("1.500")), ("LOT-MID", Decimal("1.500"))],
+        )
+        self.early.refresh_from_db()
+        self.middle.refresh_from_db()
+        self.assertEqual(self.early.qty_value, Decimal("0.000"))
+        self.assertEqual(self.early.status, LotStatus.CONSUMED)
+        self.assertEqual(self.middle.qty_value, Decimal("1.500"))
+
+    def test_inventory_apply_allocates_out_delta_by_supplier_code(self):
+        InventoryMovement.objects.create(
+            site=self.site,
+            supplier_code="CREME-35",
+            raw_product_name="Creme 35%",
+            movement_type="IN",
+            qty_value="8.500",
+            qty_unit="l",
+            happened_at="2026-04-20T10:00:00Z",
+            ref_type="goods_receipt_line",
+            ref_id="seed",
+        )
+
+        response = self.client.post(
+            "/api/v1/inventory/inventories/apply/",
+            {"site": str(self.site.id), "lines": [{"supplier_code": "CREME-35", "qty_unit": "l", "qty_value": "6.5"}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        movements = InventoryMovement.objects.filter(ref_type="inventory_adjustment").order_by("qty_value")
+        self.assertEqual(
+            [(movement.lot.internal_lot_code, movement.qty_value) for movement in movements],
+            [("LOT-MID", Decimal("0.500")), ("LOT-EARLY", Decimal("1.500"))],
+        )
+
+    def test_supplier_codes_are_not_pooled_across_suppliers(self):
+        other = SupplierProduct.objects.create(
+            supplier=Supplier.objects.create(name="Sysco"),
+            name="Panna 35%",
+            supplier_sku="CREME-35",
+            uom="l",
+            category="bof",
+        )
+        Lot.objects.create(
+            site=self.site,
+            source_type=SourceType.SUPPLIER_PRODUCT,
+            supplier_product=other,
+            internal_lot_code="LOT-SYSCO",
+            dlc_date=date(2026, 4, 1),
+            qty_value=Decimal("9.000"),
+            qty_unit="l",
+        )
+
+        with transaction.atomic():
+            allocator = FefoAllocator.for_supplier_codes(self.site.id, ["CREME-35"])
+            ambiguous = allocator.code_key("CREME-35", "l")
+            allocations = allocator.allocate(allocator.code_key("CREME-35", "l", supplier_id=self.supplier.id), Decimal("2"))
+
+        self.assertIsNone(ambiguous)
+        self.assertEqual(allocator.allocate(ambiguous, Decimal("1")), [(None, Decimal("1"))])
+        self.assertEqual(
+            [(lot.internal_lot_code, qty) for lot, qty in allocations],
+            [("LOT-EARLY", Decimal("1.500")), ("LOT-MID", Decimal("0.500"))],
+        )
+
+    def test_reversed_movement_reactivates_consumed_lot(self):
+        movement = InventoryMovement(
+            site=self.site,
+            lot=self.early,
+            supplier_product=self.product,
+            movement_type=MovementType.OUT,
+            qty_value=Decimal("1.500"),
+            qty_unit="l",
+            happened_at="2026-05-01T10:00:00Z",
+            ref_type="inventory_adjustment",
+            ref_id="reverse-me",
+        )
+        record_lot_movements_bulk([movement])
+        self.early.refresh_from_db()
+        self.assertEqual(self.early.status, LotStatus.CONSUMED)
+
+        delete_lot_movements(InventoryMovement.objects.filter(ref_id="reverse-me"))
+
+        self.early.refresh_from_db()
+        self.assertEqual((self.early.qty_value, self.early.status), (Decimal("1.500"), LotStatus.ACTIVE))
+
+    def test_lot_created_by_reconciliation_sync_is_allocated(self):
+        Lot.objects.all().delete()
+        document = IntegrationDocument.objects.create(
+            site=self.site,
+            document_type=DocumentType.LABEL_CAPTURE,
+            source=DocumentSource.DRIVE,
+            filename="capture.jpg",
+            status="extracted",
+        )
+        DocumentExtraction.objects.create(
+            document=document,
+            extractor_name="claude",
+            status="succeeded",
+            normalized_payload={"product_guess": "Creme 35%", "supplier_code": "CREME-35", "dlc_date": "2026-05-04"},
+        )
+        response = self.client.post(
+            "/api/v1/integration/reconciliation-decisions/",
+            {
+                "site": str(self.site.id),
+                "event_id": "evt-fefo-001",
+                "decision_status": "matched",
+                "metadata": {
+                    "source_document_id": str(document.id),
+                    "allocated_qty": "2.000",
+                    "allocated_unit": "l",
+                    "internal_lot_code": "INT-CREME-1",
+                },
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        lot = Lot.objects.get(site=self.site, internal_lot_code="INT-CREME-1")
+        self.assertEqual(lot.supplier_product_id, self.product.id)
+        with transaction.atomic():
+            by_product = FefoAllocator.for_supplier_products(self.site.id, [self.product.id])
+            by_code = FefoAllocator.for_supplier_codes(self.site.id, ["CREME-35"])
+            product_allocations = by_product.allocate((str(self.product.id), "l"), Decimal("0.500"))
+            code_allocations = by_code.allocate(by_code.code_key("CREME-35", "l"), Decimal("0.500"))
+
+        self.assertEqual(product_allocations, [(lot, Decimal("0.500"))])
+        self.assertEqual(code_allocations, [(lot, Decimal("0.500"))])
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.core.models import Site
+from apps.inventory.models import InventoryMovement, Lot, MovementType, SourceType
+from apps.inventory.services.lot_ledger import delete_lot_movements, find_lot_balance_drift, record_lot_movement
+
+
+class LotLedgerTests(TestCase):
+    def setUp(self):
+        self.site = Site.objects.create(name="Ledger Site", code="SITE-LEDGER")
+        self.lot = Lot.objects.create(
+            site=self.site,
+            source_type=SourceType.SUPPLIER_PRODUCT,
+            internal_lot_code="LOT-001",
+            qty_value=Decimal("0"),
+            qty_unit="kg",
+        )
+
+    def _move(self, movement_type, qty, ref_id, lot=None):
+        return record_lot_movement(
+            site=self.site,
+            lot=lot or self.lot,
+            movement_type=movement_type,
+            qty_value=Decimal(qty),
+            qty_unit="kg",
+            happened_at=datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc),
+            ref_type="test",
+            ref_id=ref_id,
+        )
+
+    def test_movements_apply_deltas_to_lot_balance(self):
+        self._move(MovementType.IN, "5.000", "in-1")
+        self._move(MovementType.IN, "2.500", "in-2")
+        self._move(MovementType.OUT, "1.250", "out-1")
+
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.qty_value, Decimal("6.250"))
+
+    def test_deleting_movements_reverts_their_deltas(self):
+        self._move(MovementType.IN, "5.000", "in-1")
+        self._move(MovementType.OUT, "1.000", "out-1")
+        self._move(MovementType.OUT, "0.500", "out-2")
+
+        deleted = delete_lot_movements(InventoryMovement.objects.filter(ref_id__in=["out-1", "out-2"]))
+
+        self.assertEqual(deleted, 2)
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.qty_value, Decimal("5.000"))
+        self.assertEqual(find_lot_balance_drift(), [])
+
+    def test_check_lot_balances_reports_and_fixes_drift(self):
+        self._move(MovementType.IN, "3.000", "in-1")
+        Lot.objects.filter(pk=self.lot.pk).update(qty_value=Decimal("9.000"))
+
+        drift = find_lot_balance_drift(self.site.id)
+        self.assertEqual(len(drift), 1)
+        self.assertEqual(drift[0]["drift"], Decimal("6.000"))
+
+        output = StringIO()
+        call_command("check_lot_balances", "--fix", stdout=output)
+
+        self.assertIn("DRIFT", output.getvalue())
+        self.lot.refresh_from_db()
+        self.assertEqual(self.lot.qty_value, Decimal("3.000"))
+        self.assertEqual(find_lot_balance_drift(), [])
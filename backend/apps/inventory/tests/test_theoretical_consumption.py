@@ -0,0 +1,154 @@
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from rest_framework.test import APITestCase
+
+from apps.catalog.models import Supplier, SupplierProduct
+from apps.core.models import Site
+from apps.integration.models import RecipeSnapshot
+from apps.inventory.models import InventoryMovement, MovementType
+from apps.inventory.services.theoretical_consumption import (
+    THEORETICAL_REF_TYPE,
+    compute_theoretical_consumption,
+    post_theoretical_movements,
+)
+from apps.pos.models import PosSource
+from apps.pos.services.sales_lines import upsert_sales_days
+
+
+class TheoreticalConsumptionTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="Site Consumi", code="SITE-CONS")
+        self.source = PosSource.objects.create(site=self.site, name="Cassa", vendor="Lightspeed")
+        self.pizza_id = uuid.uuid4()
+        RecipeSnapshot.objects.create(
+            fiche_product_id=self.pizza_id,
+            title="Pizza Margherita",
+            snapshot_hash="hash-pizza",
+            portions="4",
+            payload={
+                "ingredients": [
+                    {"name": "Impasto pizza", "qty": "1", "unit": "kg"},
+                    {"name": "Mozzarella", "qty": "400 g", "supplier": "AEM", "supplier_code": "MOZ-1"},
+                ]
+            },
+        )
+        RecipeSnapshot.objects.create(
+            fiche_product_id=uuid.uuid4(),
+            title="Impasto pizza",
+            snapshot_hash="hash-impasto",
+            portions="1",
+            payload={"ingredients": [{"name": "Farina", "qty": "600 g", "supplier": "AEM", "supplier_code": "FAR-1"}]},
+        )
+
+    def _sales(self, sales_date, lines):
+        upsert_sales_days([{"site": self.site, "pos_source": self.source, "sales_date": sales_date, "lines": lines}])
+
+    def test_sales_expand_through_nested_boms_with_batched_lookups(self):
+        self._sales(date(2026, 3, 1), [{"pos_name": "pizza margherita", "qty": 8}, {"pos_name": "Tiramisu", "qty": 2}])
+        self._sales(date(2026, 3, 2), [{"fiche_product_id": str(self.pizza_id), "pos_name": "Margherita", "qty": 4}])
+
+        with self.assertNumQueries(4):
+            result = compute_theoretical_consumption(self.site.id, date(2026, 3, 1), date(2026, 3, 31))
+
+        first_day = result["days"][date(2026, 3, 1)]
+        self.assertEqual(first_day[("Farina", "AEM", "FAR-1", "kg")], Decimal("1.2"))
+        self.assertEqual(first_day[("Mozzarella", "AEM", "MOZ-1", "kg")], Decimal("0.8"))
+        self.assertEqual(result["days"][date(2026, 3, 2)][("Farina", "AEM", "FAR-1", "kg")], Decimal("0.6"))
+        self.assertEqual(result["unmatched"], {"Tiramisu": Decimal("2")})
+
+    def test_posting_replaces_the_days_movements(self):
+        self._sales(date(2026, 3, 1), [{"pos_name": "Pizza Margherita", "qty": 8}])
+
+        post_theoretical_movements(self.site.id, date(2026, 3, 1))
+        self._sales(date(2026, 3, 1), [{"pos_name": "Pizza Margherita", "qty": 4}])
+        result = post_theoretical_movements(self.site.id, date(2026, 3, 1))
+
+        movements = InventoryMovement.objects.filter(ref_type=THEORETICAL_REF_TYPE).order_by("supplier_code")
+        self.assertEqual((result["created"], result["deleted"]), (2, 2))
+        self.assertEqual(
+            [(m.supplier_code, m.movement_type, m.qty_value, m.qty_unit) for m in movements],
+            [("FAR-1", MovementType.OUT, Decimal("0.600"), "kg"), ("MOZ-1", MovementType.OUT, Decimal("0.400"), "kg")],
+        )
+
+    def test_api_reports_variance_against_recorded_movements(self):
+        self._sales(date(2026, 3, 1), [{"pos_name": "Pizza Margherita", "qty": 8}])
+        InventoryMovement.objects.create(
+            site=self.site,
+            supplier_code="MOZ-1",
+            raw_product_name="Mozzarella",
+            movement_type=MovementType.OUT,
+            qty_value=Decimal("1.000"),
+            qty_unit="kg",
+            happened_at=datetime(2026, 3, 1, 22, 0, tzinfo=timezone.utc),
+            ref_type="inventory_adjustment",
+        )
+
+        response = self.client.get(
+            f"/api/v1/inventory/theoretical-consumption/?site={self.site.id}&date=2026-03-01&date_to=2026-03-07"
+        )
+        too_long = self.client.get(
+            f"/api/v1/inventory/theoretical-consumption/?site={self.site.id}&date=2026-03-01&date_to=2026-04-15"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        variance = {row["supplier_code"]: row for row in response.json()["variance"]}
+        self.assertEqual(
+            (variance["MOZ-1"]["theoretical_qty"], variance["MOZ-1"]["actual_qty"], variance["MOZ-1"]["variance_qty"]),
+            ("0.800", "1.000", "0.200"),
+        )
+        self.assertEqual(variance["FAR-1"]["actual_qty"], "0.000")
+        self.assertEqual(too_long.status_code, 400)
+
+        posted = self.client.post(
+            "/api/v1/inventory/theoretical-consumption/",
+            {"site": str(self.site.id), "date": "2026-03-01"},
+            format="json",
+        )
+        self.assertEqual(posted.status_code, 200)
+        self.assertEqual(posted.json()["created"], 2)
+
+    def test_unquantified_preparation_counts_one_portion_per_recipe_batch(self):
+        RecipeSnapshot.objects.create(
+            fiche_product_id=uuid.uuid4(),
+            title="Lasagna",
+            snapshot_hash="hash-lasagna",
+            portions="4",
+            payload={"ingredients": [{"name": "Besciamella", "qty": "0"}]},
+        )
+        RecipeSnapshot.objects.create(
+            fiche_product_id=uuid.uuid4(),
+            title="Besciamella",
+            snapshot_hash="hash-besciamella",
+            portions="2",
+            payload={"ingredients": [{"name": "Latte", "qty": "1 l", "supplier": "AEM", "supplier_code": "LAT-1"}]},
+        )
+        self._sales(date(2026, 3, 1), [{"pos_name": "Lasagna", "qty": 8}])
+
+        result = compute_theoretical_consumption(self.site.id, date(2026, 3, 1))
+
+        # 8 sold / 4 portions = 2 batches, each taking one of the 2 portions of besciamella.
+        self.assertEqual(result["days"][date(2026, 3, 1)], {("Latte", "AEM", "LAT-1", "l"): Decimal("1")})
+
+    def test_posting_links_supplier_codes_by_recipe_supplier(self):
+        aem = SupplierProduct.objects.create(
+            supplier=Supplier.objects.create(name="A.E.M."), name="Mozzarella", supplier_sku="MOZ-1", uom="kg"
+        )
+        SupplierProduct.objects.create(
+            supplier=Supplier.objects.create(name="Metro"), name="Mozzarella fior di latte", supplier_sku="MOZ-1", uom="kg"
+        )
+        SupplierProduct.objects.create(
+            supplier=Supplier.objects.create(name="Sysco"), name="Farina 00", supplier_sku="FAR-1", uom="kg"
+        )
+        SupplierProduct.objects.create(
+            supplier=Supplier.objects.create(name="Metro Farine"), name="Farina", supplier_sku="FAR-1", uom="kg"
+        )
+        self._sales(date(2026, 3, 1), [{"pos_name": "Pizza Margherita", "qty": 4}])
+
+        result = post_theoretical_movements(self.site.id, date(2026, 3, 1))
+
+        by_code = {m.supplier_code: m.supplier_product_id for m in InventoryMovement.objects.filter(ref_type=THEORETICAL_REF_TYPE)}
+        self.assertEqual(by_code, {"MOZ-1": aem.id, "FAR-1": None})
+        self.assertIn("Codice fornitore 'FAR-1' ambiguo tra piu fornitori: movimento registrato senza prodotto.", result["warnings"])
@@ -1,6 +1,6 @@
 ﻿from django.contrib import admin
 
-from apps.pos.models import PosSource, SalesEventDaily
+from apps.pos.models import PosSource, SalesEventDaily, SalesLine
 
 
 @admin.register(PosSource)
@@ -14,3 +14,10 @@ class SalesEventDailyAdmin(admin.ModelAdmin):
     list_display = ("sales_date", "site", "pos_source", "created_at")
     search_fields = ("site__name", "pos_source__name")
     list_filter = ("sales_date",)
+
+
+@admin.register(SalesLine)
+class SalesLineAdmin(admin.ModelAdmin):
+    list_display = ("sales_date", "site", "pos_source", "item_code", "title", "qty", "amount", "hour_bucket")
+    search_fields = ("item_code", "title", "site__name")
+    list_filter = ("sales_date",)
@@ -1,7 +1,11 @@
-﻿from rest_framework import serializers
+﻿from django.db import transaction
+from rest_framework import serializers
 
 from apps.core.models import Site
 from apps.pos.models import PosSource, SalesEventDaily
+from apps.pos.services.sales_lines import MAX_SUMMARY_DAYS, SALES_GROUPINGS, replace_sales_lines
+
+MAX_BULK_DAYS = 500
 
 
 class SalesEventDailyImportSerializer(serializers.ModelSerializer):
@@ -51,4 +55,50 @@ class SalesEventDailyImportSerializer(serializers.ModelSerializer):
         payload = validated_data.get("payload", {})
         payload["lines"] = lines
         validated_data["payload"] = payload
-        return super().create(validated_data)
+        with transaction.atomic():
+            instance = super().create(validated_data)
+            replace_sales_lines([(instance, lines)])
+        return instance
+
+
+class SalesDayBulkRowSerializer(serializers.Serializer):
+    site_id = serializers.UUIDField()
+    pos_source_id = serializers.UUIDField()
+    sales_date = serializers.DateField()
+    lines = serializers.ListField(allow_empty=True)
+
+
+class SalesDayBulkImportSerializer(serializers.Serializer):
+    days = SalesDayBulkRowSerializer(many=True, allow_empty=False, max_length=MAX_BULK_DAYS)
+
+    def validate_days(self, days):
+        # One query for every POS source in the request instead of one site/source lookup per day.
+        sources = PosSource.objects.select_related("site").in_bulk({day["pos_source_id"] for day in days})
+        errors = {}
+        for index, day in enumerate(days):
+            pos_source = sources.get(day["pos_source_id"])
+            if pos_source is None:
+                errors[index] = {"pos_source_id": "Invalid pos_source_id."}
+            elif pos_source.site_id != day["site_id"]:
+                errors[index] = {"pos_source_id": "pos_source_id does not belong to the provided site_id."}
+            else:
+                day["pos_source"] = pos_source
+                day["site"] = pos_source.site
+        if errors:
+            raise serializers.ValidationError(errors)
+        return days
+
+
+class SalesSummaryQuerySerializer(serializers.Serializer):
+    site = serializers.UUIDField()
+    date = serializers.DateField()
+    date_to = serializers.DateField(required=False)
+    group_by = serializers.ChoiceField(choices=sorted(SALES_GROUPINGS), default="item")
+
+    def validate(self, attrs):
+        attrs.setdefault("date_to", attrs["date"])
+        if attrs["date_to"] < attrs["date"]:
+            raise serializers.ValidationError({"date_to": "date_to must not be before date."})
+        if (attrs["date_to"] - attrs["date"]).days >= MAX_SUMMARY_DAYS:
+            raise serializers.ValidationError({"date_to": f"Date range is limited to {MAX_SUMMARY_DAYS} days."})
+        return attrs
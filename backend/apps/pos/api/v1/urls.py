@@ -1,6 +1,6 @@
 ﻿from django.urls import path
 
-from apps.pos.api.v1.views import SalesEventDailyImportViewSet
+from apps.pos.api.v1.views import SalesDayBulkImportView, SalesEventDailyImportViewSet, SalesSummaryView
 
 
 urlpatterns = [
@@ -9,4 +9,14 @@ urlpatterns = [
         SalesEventDailyImportViewSet.as_view({"post": "create"}),
         name="pos-import-daily",
     ),
+    path(
+        "pos/import/bulk/",
+        SalesDayBulkImportView.as_view(),
+        name="pos-import-bulk",
+    ),
+    path(
+        "pos/sales/summary/",
+        SalesSummaryView.as_view(),
+        name="pos-sales-summary",
+    ),
 ]
@@ -1,10 +1,20 @@
-﻿from rest_framework import mixins, status, viewsets
+﻿import hashlib
+import json
+
+from rest_framework import mixins, status, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from apps.core.api.renderers import FastJSONParser, NDJSONParser
 from apps.integration.import_batches import complete_batch, fail_batch, find_completed_batch, start_batch
-from apps.pos.api.v1.serializers import SalesEventDailyImportSerializer
+from apps.pos.api.v1.serializers import (
+    SalesDayBulkImportSerializer,
+    SalesEventDailyImportSerializer,
+    SalesSummaryQuerySerializer,
+)
 from apps.pos.models import SalesEventDaily
+from apps.pos.services.sales_lines import aggregate_sales, upsert_sales_days
 
 
 class SalesEventDailyImportViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
@@ -39,3 +49,85 @@ class SalesEventDailyImportViewSet(mixins.CreateModelMixin, viewsets.GenericView
         except Exception as exc:
             fail_batch(batch, status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": str(exc)})
             raise
+
+
+def _bulk_batch_payload(data) -> dict:
+    """What a bulk batch records of its request: a digest and a day count, not the whole body."""
+    serialized = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    days = data.get("days") if isinstance(data, dict) else None
+    return {
+        "sha256": hashlib.sha256(serialized.encode("utf-8")).hexdigest(),
+        "day_count": len(days) if isinstance(days, list) else None,
+    }
+
+
+class SalesDayBulkImportView(APIView):
+    """
+    Many POS days in one request, as {"days": [...]}, a JSON list or NDJSON (one day per line). Each
+    (site, source, date) is upserted, so the endpoint is idempotent per day; Idempotency-Key is optional.
+    """
+
+    parser_classes = (FastJSONParser, NDJSONParser)
+
+    def post(self, request):
+        source = "api"
+        import_type = "pos_sales_bulk"
+        idempotency_key = request.headers.get("Idempotency-Key") or ""
+        existing = find_completed_batch(source, import_type, idempotency_key)
+        if existing:
+            result = existing.result or {}
+            return Response(result.get("data", {}), status=result.get("status_code", status.HTTP_200_OK))
+
+        data = {"days": request.data} if isinstance(request.data, list) else request.data
+        batch = start_batch(source, import_type, idempotency_key, _bulk_batch_payload(data))
+        try:
+            serializer = SalesDayBulkImportSerializer(data=data)
+            serializer.is_valid(raise_exception=True)
+            events, line_count = upsert_sales_days(serializer.validated_data["days"])
+            response_data = {
+                "days": [
+                    {
+                        "id": str(event.pk),
+                        "site_id": str(event.site_id),
+                        "pos_source_id": str(event.pos_source_id),
+                        "sales_date": event.sales_date.isoformat(),
+                    }
+                    for event in events
+                ],
+                "count": len(events),
+                "line_count": line_count,
+            }
+            complete_batch(batch, status.HTTP_200_OK, response_data)
+            return Response(response_data, status=status.HTTP_200_OK)
+        except ValidationError as exc:
+            fail_batch(batch, status.HTTP_400_BAD_REQUEST, exc.detail)
+            raise
+        except Exception as exc:
+            fail_batch(batch, status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": str(exc)})
+            raise
+
+
+class SalesSummaryView(APIView):
+    def get(self, request):
+        query = SalesSummaryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        rows = [
+            {
+                **row,
+                "qty_total": str(row["qty_total"]),
+                "amount_total": str(row["amount_total"]) if row["amount_total"] is not None else None,
+            }
+            for row in aggregate_sales(params["site"], params["date"], params["date_to"], params["group_by"])
+        ]
+        return Response(
+            {
+                "site": str(params["site"]),
+                "date": params["date"].isoformat(),
+                "date_to": params["date_to"].isoformat(),
+                "group_by": params["group_by"],
+                "results": rows,
+                "count": len(rows),
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of apps.pos.services.sales_lines.parse_sales_line.
+def _decimal(value, step):
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value).replace(",", ".")).quantize(step)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _hour_bucket(line):
+    hour = line.get("hour")
+    if hour is not None and str(hour).strip().isdigit() and 0 <= int(str(hour).strip()) <= 23:
+        return int(str(hour).strip())
+    raw_value = str(line.get("sold_at") or line.get("time") or "").strip()
+    if not raw_value:
+        return None
+    for parse in (datetime.fromisoformat, time.fromisoformat):
+        try:
+            return parse(raw_value.replace("Z", "+00:00")).hour
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_line(line, line_no):
+    if not isinstance(line, dict):
+        return None
+    title = str(line.get("pos_name") or line.get("title") or line.get("name") or line.get("item") or "").strip()
+    item_code = str(line.get("item_code") or line.get("code") or line.get("sku") or line.get("plu") or "").strip()
+    fiche_product_id = str(line.get("fiche_product_id") or "").strip()
+    try:
+        fiche_product_id = uuid.UUID(fiche_product_id) if fiche_product_id else None
+    except ValueError:
+        fiche_product_id = None
+    if not title and not item_code and not fiche_product_id:
+        return None
+    return {
+        "line_no": line_no,
+        "item_code": item_code[:128],
+        "fiche_product_id": fiche_product_id,
+        "title": title[:255],
+        "normalized_title": " ".join(title.split()).casefold()[:255],
+        "qty": _decimal(line.get("qty", line.get("quantity")), Decimal("0.001")) or Decimal("0"),
+        "amount": _decimal(line.get("amount", line.get("total")), Decimal("0.01")),
+        "hour_bucket": _hour_bucket(line),
+    }
+
+
+def fill_sales_lines(apps, schema_editor):
+    SalesEventDaily = apps.get_model("pos", "SalesEventDaily")
+    SalesLine = apps.get_model("pos", "SalesLine")
+    pending = []
+    for event in SalesEventDaily.objects.iterator(chunk_size=200):
+        lines = event.payload.get("lines") if isinstance(event.payload, dict) else None
+        for line_no, line in enumerate(lines if isinstance(lines, list) else []):
+            fields = _parse_line(line, line_no)
+            if fields:
+                pending.append(
+                    SalesLine(
+                        event_id=event.pk,
+                        site_id=event.site_id,
+                        pos_source_id=event.pos_source_id,
+                        sales_date=event.sales_date,
+                        **fields,
+                    )
+                )
+        if len(pending) >= 2000:
+            SalesLine.objects.bulk_create(pending)
+            pending = []
+    SalesLine.objects.bulk_create(pending)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_service_menu_schedule_columns"),
+        ("pos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesLine",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("sales_date", models.DateField()),
+                ("line_no", models.PositiveIntegerField(default=0)),
+                ("item_code", models.CharField(blank=True, default="", max_length=128)),
+                ("fiche_product_id", models.UUIDField(blank=True, null=True)),
+                ("title", models.CharField(blank=True, default="", max_length=255)),
+                ("normalized_title", models.CharField(blank=True, default="", editable=False, max_length=255)),
+                ("qty", models.DecimalField(decimal_places=3, default=0, max_digits=12)),
+                ("amount", models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ("hour_bucket", models.PositiveSmallIntegerField(blank=True, null=True)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="sales_lines", to="pos.saleseventdaily"
+                    ),
+                ),
+                (
+                    "pos_source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT, related_name="sales_lines", to="pos.possource"
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT, related_name="pos_sales_lines", to="core.site"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_sales_line",
+                "ordering": ["sales_date", "line_no"],
+                "indexes": [
+                    models.Index(fields=["site", "sales_date"], name="idx_pos_line_site_date"),
+                    models.Index(fields=["site", "item_code", "sales_date"], name="idx_pos_line_site_item_date"),
+                    models.Index(fields=["site", "normalized_title", "sales_date"], name="idx_pos_line_site_title_date"),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_sales_lines, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,11 @@ from django.db import models
 from apps.core.models import Site
 
 
+def normalize_item_title(value: str | None) -> str:
+    """Case- and whitespace-insensitive form of a POS item title, used to group lines without an item code."""
+    return " ".join(str(value or "").split()).casefold()
+
+
 class PosSource(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     site = models.ForeignKey(Site, on_delete=models.PROTECT, related_name="pos_sources")
@@ -42,3 +47,40 @@ class SalesEventDaily(models.Model):
 
     def __str__(self) -> str:
         return f"{self.sales_date} - {self.pos_source.name}"
+
+
+class SalesLine(models.Model):
+    """One typed line of a daily POS event; rebuilt from the event's lines on every import of that day."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event = models.ForeignKey(SalesEventDaily, on_delete=models.CASCADE, related_name="sales_lines")
+    site = models.ForeignKey(Site, on_delete=models.PROTECT, related_name="pos_sales_lines")
+    pos_source = models.ForeignKey(PosSource, on_delete=models.PROTECT, related_name="sales_lines")
+    sales_date = models.DateField()
+    line_no = models.PositiveIntegerField(default=0)
+    item_code = models.CharField(max_length=128, blank=True, default="")
+    fiche_product_id = models.UUIDField(blank=True, null=True)
+    title = models.CharField(max_length=255, blank=True, default="")
+    normalized_title = models.CharField(max_length=255, blank=True, default="", editable=False)
+    qty = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    hour_bucket = models.PositiveSmallIntegerField(blank=True, null=True)
+
+    class Meta:
+        db_table = "pos_sales_line"
+        ordering = ["sales_date", "line_no"]
+        indexes = [
+            models.Index(fields=["site", "sales_date"], name="idx_pos_line_site_date"),
+            models.Index(fields=["site", "item_code", "sales_date"], name="idx_pos_line_site_item_date"),
+            models.Index(fields=["site", "normalized_title", "sales_date"], name="idx_pos_line_site_title_date"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.sales_date} - {self.title or self.item_code} x {self.qty}"
+
+    def save(self, *args, **kwargs):
+        self.normalized_title = normalize_item_title(self.title)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "title" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_title"}
+        super().save(*args, **kwargs)
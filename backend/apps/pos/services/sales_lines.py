@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from apps.pos.models import SalesEventDaily, SalesLine, normalize_item_title
+
+AMOUNT_STEP = Decimal("0.01")
+QTY_STEP = Decimal("0.001")
+MAX_SUMMARY_DAYS = 31
+SALES_GROUPINGS = {
+    "item": ("item_code", "normalized_title"),
+    "date": ("sales_date",),
+    "hour": ("hour_bucket",),
+    "item_date": ("sales_date", "item_code", "normalized_title"),
+}
+
+
+def _decimal(value, step: Decimal) -> Decimal | None:
+    if value is None or value == "":
+        return None
+    try:
+        return Decimal(str(value).replace(",", ".")).quantize(step)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _hour_bucket(line: dict) -> int | None:
+    hour = line.get("hour")
+    if hour is not None and str(hour).strip().isdigit() and 0 <= int(str(hour).strip()) <= 23:
+        return int(str(hour).strip())
+    raw_value = str(line.get("sold_at") or line.get("time") or "").strip()
+    if not raw_value:
+        return None
+    for parse in (datetime.fromisoformat, time.fromisoformat):
+        try:
+            return parse(raw_value.replace("Z", "+00:00")).hour
+        except ValueError:
+            continue
+    return None
+
+
+def parse_sales_line(line, line_no: int = 0) -> dict | None:
+    """Typed fields of one raw POS line, or None when it names no item."""
+    if not isinstance(line, dict):
+        return None
+    title = str(line.get("pos_name") or line.get("title") or line.get("name") or line.get("item") or "").strip()
+    item_code = str(line.get("item_code") or line.get("code") or line.get("sku") or line.get("plu") or "").strip()
+    fiche_product_id = str(line.get("fiche_product_id") or "").strip()
+    try:
+        fiche_product_id = uuid.UUID(fiche_product_id) if fiche_product_id else None
+    except ValueError:
+        fiche_product_id = None
+    if not title and not item_code and not fiche_product_id:
+        return None
+    return {
+        "line_no": line_no,
+        "item_code": item_code[:128],
+        "fiche_product_id": fiche_product_id,
+        "title": title[:255],
+        "normalized_title": normalize_item_title(title)[:255],
+        "qty": _decimal(line.get("qty", line.get("quantity")), QTY_STEP) or Decimal("0"),
+        "amount": _decimal(line.get("amount", line.get("total")), AMOUNT_STEP),
+        "hour_bucket": _hour_bucket(line),
+    }
+
+
+def replace_sales_lines(events: list[tuple[SalesEventDaily, list]]) -> int:
+    """Rebuild the typed lines of the given events from their raw lines: one delete and one bulk insert."""
+    pending = []
+    for event, lines in events:
+        for line_no, line in enumerate(lines):
+            fields = parse_sales_line(line, line_no)
+            if fields:
+                pending.append(
+                    SalesLine(
+                        event_id=event.pk,
+                        site_id=event.site_id,
+                        pos_source_id=event.pos_source_id,
+                        sales_date=event.sales_date,
+                        **fields,
+                    )
+                )
+    with transaction.atomic():
+        SalesLine.objects.filter(event_id__in=[event.pk for event, _lines in events]).delete()
+        SalesLine.objects.bulk_create(pending, batch_size=1000)
+    return len(pending)
+
+
+def _events_for_keys(keys):
+    # A superset of the (site, source, date) keys; callers index the rows by key.
+    return SalesEventDaily.objects.filter(
+        site_id__in={key[0] for key in keys},
+        pos_source_id__in={key[1] for key in keys},
+        sales_date__in={key[2] for key in keys},
+    )
+
+
+def upsert_sales_days(days: list[dict]) -> tuple[list[SalesEventDaily], int]:
+    """
+    Store many (site, pos_source, sales_date) days at once. The lines of existing days are overwritten
+    (other payload keys are kept), so replaying a request is harmless; when a request repeats a day, its
+    last occurrence wins.
+    """
+    by_key: dict[tuple, dict] = {}
+    for day in days:
+        by_key[(day["site"].pk, day["pos_source"].pk, day["sales_date"])] = day
+    with transaction.atomic():
+        existing_payloads = {
+            (site_id, pos_source_id, sales_date): payload
+            for site_id, pos_source_id, sales_date, payload in _events_for_keys(by_key)
+            .select_for_update()
+            .values_list("site_id", "pos_source_id", "sales_date", "payload")
+        }
+        events = [
+            SalesEventDaily(
+                site=day["site"],
+                pos_source=day["pos_source"],
+                sales_date=day["sales_date"],
+                payload={
+                    **(existing_payloads.get(key) if isinstance(existing_payloads.get(key), dict) else {}),
+                    **day.get("payload", {}),
+                    "lines": day["lines"],
+                },
+            )
+            for key, day in by_key.items()
+        ]
+        SalesEventDaily.objects.bulk_create(
+            events,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["site", "pos_source", "sales_date"],
+            update_fields=["payload", "updated_at"],
+        )
+        # Rows that already existed keep their id, not the one generated client-side: read them back.
+        stored = {(event.site_id, event.pos_source_id, event.sales_date): event for event in _events_for_keys(by_key)}
+        events = [stored[key] for key in by_key]
+        line_count = replace_sales_lines([(event, event.payload["lines"]) for event in events])
+    return events, line_count
+
+
+def aggregate_sales(site_id, start: date, end: date, group_by: str = "item") -> list[dict]:
+    """
+    Sold quantity, amount and line count per group, computed by the database on the indexed line table.
+    Totals are quantized to the column scales, since backends differ in the scale of a SUM.
+    """
+    fields = SALES_GROUPINGS[group_by]
+    totals = {"qty_total": Sum("qty"), "amount_total": Sum("amount"), "line_count": Count("id")}
+    if "normalized_title" in fields:
+        totals["item_title"] = Max("title")
+    rows = list(
+        SalesLine.objects.filter(site_id=site_id, sales_date__range=(start, end))
+        .values(*fields)
+        .annotate(**totals)
+        .order_by(*fields)
+    )
+    for row in rows:
+        row["qty_total"] = Decimal(row["qty_total"] or 0).quantize(QTY_STEP)
+        if row["amount_total"] is not None:
+            row["amount_total"] = Decimal(row["amount_total"]).quantize(AMOUNT_STEP)
+    return rows
@@ -0,0 +1,154 @@
+import json
+from decimal import Decimal
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.core.models import Site
+from apps.integration.models import IntegrationImportBatch
+from apps.pos.models import PosSource, SalesEventDaily, SalesLine
+
+
+class PosSalesLinesApiTests(APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_X_API_KEY="dev-api-key")
+        self.site = Site.objects.create(name="Site Lines", code="SITE-LINES")
+        self.source = PosSource.objects.create(site=self.site, name="Cassa 1", vendor="Lightspeed")
+        self.bar = PosSource.objects.create(site=self.site, name="Bar", vendor="Lightspeed")
+
+    def _day(self, source, sales_date, lines):
+        return {
+            "site_id": str(self.site.id),
+            "pos_source_id": str(source.id),
+            "sales_date": sales_date,
+            "lines": lines,
+        }
+
+    def test_daily_import_populates_typed_lines(self):
+        response = self.client.post(
+            "/api/v1/pos/import/daily/",
+            self._day(
+                self.source,
+                "2026-03-01",
+                [
+                    {"item_code": "PZ-01", "pos_name": "Pizza  Margherita", "qty": "3", "amount": "27.00", "hour": 20},
+                    {"pos_name": "Acqua", "qty": 2, "sold_at": "2026-03-01T13:05:00Z"},
+                    "not a line",
+                ],
+            ),
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="pos-lines-001",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        lines = list(SalesLine.objects.order_by("line_no"))
+        self.assertEqual(
+            [(line.item_code, line.normalized_title, line.qty, line.amount, line.hour_bucket) for line in lines],
+            [
+                ("PZ-01", "pizza margherita", Decimal("3.000"), Decimal("27.00"), 20),
+                ("", "acqua", Decimal("2.000"), None, 13),
+            ],
+        )
+
+    def test_bulk_import_upserts_each_day(self):
+        payload = {
+            "days": [
+                self._day(self.source, "2026-03-01", [{"item_code": "PZ-01", "pos_name": "Margherita", "qty": 4}]),
+                self._day(self.bar, "2026-03-01", [{"item_code": "CAF", "pos_name": "Caffe", "qty": 30}]),
+                self._day(self.source, "2026-03-02", [{"item_code": "PZ-01", "pos_name": "Margherita", "qty": 6}]),
+            ]
+        }
+
+        first = self.client.post("/api/v1/pos/import/bulk/", payload, format="json")
+        payload["days"][0]["lines"] = [{"item_code": "PZ-01", "pos_name": "Margherita", "qty": 5}]
+        second = self.client.post("/api/v1/pos/import/bulk/", payload, format="json")
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual((second.json()["count"], second.json()["line_count"]), (3, 3))
+        self.assertEqual(SalesEventDaily.objects.count(), 3)
+        self.assertEqual(SalesLine.objects.count(), 3)
+        self.assertEqual(
+            SalesLine.objects.get(pos_source=self.source, sales_date="2026-03-01").qty,
+            Decimal("5.000"),
+        )
+
+    def test_bulk_import_keeps_other_payload_keys_and_records_only_a_digest(self):
+        event = SalesEventDaily.objects.create(
+            site=self.site,
+            pos_source=self.source,
+            sales_date="2026-03-01",
+            payload={"lines": [], "totals": {"covers": 42}},
+        )
+
+        response = self.client.post(
+            "/api/v1/pos/import/bulk/",
+            {"days": [self._day(self.source, "2026-03-01", [{"pos_name": "Margherita", "qty": 2}])]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="pos-bulk-001",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event.refresh_from_db()
+        self.assertEqual(event.payload["totals"], {"covers": 42})
+        self.assertEqual(event.payload["lines"], [{"pos_name": "Margherita", "qty": 2}])
+        batch = IntegrationImportBatch.objects.get(import_type="pos_sales_bulk")
+        self.assertEqual(sorted(batch.payload), ["day_count", "sha256"])
+        self.assertEqual(batch.payload["day_count"], 1)
+
+    def test_bulk_import_accepts_ndjson(self):
+        body = "\n".join(
+            json.dumps(self._day(self.source, sales_date, [{"pos_name": "Margherita", "qty": 2}]))
+            for sales_date in ("2026-03-01", "2026-03-02")
+        )
+
+        response = self.client.post("/api/v1/pos/import/bulk/", body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(SalesLine.objects.count(), 2)
+
+    def test_bulk_import_rejects_source_of_other_site(self):
+        other_site = Site.objects.create(name="Site Other", code="SITE-OTHER-LINES")
+        foreign_source = PosSource.objects.create(site=other_site, name="Other POS", vendor="Lightspeed")
+
+        response = self.client.post(
+            "/api/v1/pos/import/bulk/",
+            {"days": [self._day(self.source, "2026-03-01", []), self._day(foreign_source, "2026-03-01", [])]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("1", response.json()["field_errors"]["days"])
+        self.assertEqual(SalesEventDaily.objects.count(), 0)
+
+    def test_summary_aggregates_by_item_and_date(self):
+        self.client.post(
+            "/api/v1/pos/import/bulk/",
+            [
+                self._day(self.source, "2026-03-01", [{"item_code": "PZ-01", "pos_name": "Margherita", "qty": 4, "amount": 36}]),
+                self._day(self.bar, "2026-03-01", [{"item_code": "PZ-01", "pos_name": "Margherita", "qty": 1, "amount": 9}]),
+                self._day(self.source, "2026-03-02", [{"item_code": "PZ-01", "pos_name": "Margherita", "qty": 6}]),
+            ],
+            format="json",
+        )
+
+        by_item = self.client.get(f"/api/v1/pos/sales/summary/?site={self.site.id}&date=2026-03-01&date_to=2026-03-31")
+        by_date = self.client.get(
+            f"/api/v1/pos/sales/summary/?site={self.site.id}&date=2026-03-01&date_to=2026-03-31&group_by=date"
+        )
+
+        self.assertEqual(by_item.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["item_code"], row["item_title"], row["qty_total"], row["amount_total"]) for row in by_item.json()["results"]],
+            [("PZ-01", "Margherita", "11.000", "45.00")],
+        )
+        self.assertEqual(
+            [(row["sales_date"], row["qty_total"]) for row in by_date.json()["results"]],
+            [("2026-03-01", "5.000"), ("2026-03-02", "6.000")],
+        )
+
+    def test_summary_rejects_ranges_over_the_cap(self):
+        response = self.client.get(f"/api/v1/pos/sales/summary/?site={self.site.id}&date=2026-03-01&date_to=2026-04-15")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date_to", response.json()["field_errors"])
@@ -11,6 +11,20 @@ from apps.purchasing.models import (
 )
 
 
+class SparseFieldsMixin:
+    """Accepts `fields=[...]` to serialize only those fields (list endpoints' ?fields=)."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+        unknown = sorted(set(fields) - set(self.fields))
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}."})
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+
 class AutoReconciliationSerializer(serializers.Serializer):
     invoice_id = serializers.UUIDField()
     qty_tolerance_ratio = serializers.DecimalField(
@@ -55,7 +69,7 @@ class GoodsReceiptLineSerializer(serializers.ModelSerializer):
         return value
 
 
-class GoodsReceiptSerializer(serializers.ModelSerializer):
+class GoodsReceiptSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     lines = GoodsReceiptLineSerializer(many=True)
 
     class Meta:
@@ -104,6 +118,22 @@ class GoodsReceiptSerializer(serializers.ModelSerializer):
         return receipt
 
 
+class GoodsReceiptHeaderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = GoodsReceipt
+        fields = (
+            "id",
+            "site",
+            "supplier",
+            "delivery_note_number",
+            "received_at",
+            "metadata",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
 class InvoiceLineSerializer(serializers.ModelSerializer):
     qty_value = serializers.DecimalField(max_digits=12, decimal_places=3)
 
@@ -132,7 +162,7 @@ class InvoiceLineSerializer(serializers.ModelSerializer):
         return value
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     lines = InvoiceLineSerializer(many=True)
 
     class Meta:
@@ -198,6 +228,23 @@ class InvoiceSerializer(serializers.ModelSerializer):
         return invoice
 
 
+class InvoiceHeaderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Invoice
+        fields = (
+            "id",
+            "site",
+            "supplier",
+            "invoice_number",
+            "invoice_date",
+            "due_date",
+            "metadata",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
 class InvoiceGoodsReceiptMatchSerializer(serializers.ModelSerializer):
     class Meta:
         model = InvoiceGoodsReceiptMatch
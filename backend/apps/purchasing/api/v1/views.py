@@ -1,29 +1,98 @@
+from django.utils.dateparse import parse_date
 from rest_framework import mixins, status, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.api.pagination import KeysetPagination
 from apps.integration.import_batches import complete_batch, fail_batch, find_completed_batch, start_batch
 from apps.purchasing.api.v1.serializers import (
     AutoReconciliationSerializer,
+    GoodsReceiptHeaderSerializer,
     GoodsReceiptSerializer,
     InvoiceGoodsReceiptMatchSerializer,
+    InvoiceHeaderSerializer,
     InvoiceSerializer,
 )
 from apps.purchasing.models import GoodsReceipt, Invoice, InvoiceGoodsReceiptMatch
 from apps.purchasing.services.reconciliation_auto_match import auto_match_invoice_lines
 
 
-class GoodsReceiptViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
-    queryset = GoodsReceipt.objects.select_related("site", "supplier").prefetch_related("lines").all()
-    serializer_class = GoodsReceiptSerializer
+def _parse_date_param(request, name):
+    raw = (request.query_params.get(name) or "").strip()
+    if not raw:
+        return None
+    parsed = parse_date(raw)
+    if parsed is None:
+        raise ValidationError({name: "Must be YYYY-MM-DD."})
+    return parsed
+
+
+class PurchasingDocumentListMixin:
+    """
+    Site/date-filtered list. Pages by keyset once the client sends `limit` or `cursor` (otherwise the
+    bare array of earlier versions); `fields=a,b` keeps only those fields, and `include_lines=false` (or
+    a `fields` list without "lines") returns headers only and skips the lines prefetch entirely.
+    """
+
+    pagination_class = KeysetPagination
+    keyset_ordering_field = ""
+    date_filter_lookup = ""
+    header_serializer_class = None
+
+    def requested_fields(self) -> list[str] | None:
+        raw = (self.request.query_params.get("fields") or "").strip()
+        if self.action != "list" or not raw:
+            return None
+        return [name.strip() for name in raw.split(",") if name.strip()]
+
+    def include_lines(self) -> bool:
+        fields = self.requested_fields()
+        if fields is not None:
+            return "lines" in fields
+        raw = str(self.request.query_params.get("include_lines") or "1").strip().lower()
+        return raw not in {"0", "false", "no"}
+
+    def get_serializer_class(self):
+        if self.action == "list" and not self.include_lines():
+            return self.header_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.requested_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+        if not self.include_lines():
+            queryset = queryset.prefetch_related(None)
         site_id = (self.request.query_params.get("site") or "").strip()
         if site_id:
             queryset = queryset.filter(site_id=site_id)
-        return queryset.order_by("-received_at", "-created_at")
+        date_from = _parse_date_param(self.request, "date_from")
+        if date_from:
+            queryset = queryset.filter(**{f"{self.date_filter_lookup}__gte": date_from})
+        date_to = _parse_date_param(self.request, "date_to")
+        if date_to:
+            queryset = queryset.filter(**{f"{self.date_filter_lookup}__lte": date_to})
+        return queryset.order_by(f"-{self.keyset_ordering_field}", "-id")
+
+
+class GoodsReceiptViewSet(
+    PurchasingDocumentListMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = GoodsReceipt.objects.prefetch_related("lines").all()
+    serializer_class = GoodsReceiptSerializer
+    header_serializer_class = GoodsReceiptHeaderSerializer
+    keyset_ordering_field = "received_at"
+    date_filter_lookup = "received_at__date"
 
     def create(self, request, *args, **kwargs):
         source = "api"
@@ -55,16 +124,17 @@ class GoodsReceiptViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewse
             raise
 
 
-class InvoiceViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
-    queryset = Invoice.objects.select_related("site", "supplier").prefetch_related("lines").all()
+class InvoiceViewSet(
+    PurchasingDocumentListMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = Invoice.objects.prefetch_related("lines").all()
     serializer_class = InvoiceSerializer
-
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        site_id = (self.request.query_params.get("site") or "").strip()
-        if site_id:
-            queryset = queryset.filter(site_id=site_id)
-        return queryset.order_by("-invoice_date", "-created_at")
+    header_serializer_class = InvoiceHeaderSerializer
+    keyset_ordering_field = "invoice_date"
+    date_filter_lookup = "invoice_date"
 
     def create(self, request, *args, **kwargs):
         source = "api"
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_supplierproduct_category'),
+        ('core', '0005_alter_servicemenuentry_expected_qty'),
+        ('purchasing', '0004_line_supplier_code'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goodsreceipt',
+            index=models.Index(fields=['site', '-received_at', '-id'], name='idx_purch_gr_site_received'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['site', '-invoice_date', '-id'], name='idx_purch_inv_site_date'),
+        ),
+    ]
@@ -30,6 +30,9 @@ class GoodsReceipt(models.Model):
     class Meta:
         db_table = "purchasing_goods_receipt"
         ordering = ["-received_at", "delivery_note_number"]
+        indexes = [
+            models.Index(fields=["site", "-received_at", "-id"], name="idx_purch_gr_site_received"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["site", "supplier", "delivery_note_number"],
@@ -87,6 +90,9 @@ class Invoice(models.Model):
     class Meta:
         db_table = "purchasing_invoice"
         ordering = ["-invoice_date", "invoice_number"]
+        indexes = [
+            models.Index(fields=["site", "-invoice_date", "-id"], name="idx_purch_inv_site_date"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["site", "supplier", "invoice_number"],
@@ -150,3 +150,22 @@ class GoodsReceiptApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.json()["code"], "validation_error")
         self.assertIn("supplier_product", response.json()["field_errors"]["lines"][0])
+
+    def test_list_goods_receipts_paginates_on_received_at(self):
+        for index in range(5):
+            GoodsReceipt.objects.create(
+                site=self.site,
+                supplier=self.supplier,
+                delivery_note_number=f"BL-LIST-{index}",
+                received_at="2026-02-0%dT08:00:00Z" % (1 + index // 2),
+            )
+
+        first = self.client.get("/api/v1/goods-receipts/", {"site": str(self.site.id), "limit": 2, "include_lines": "0"})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        second = self.client.get(first.json()["next"])
+        third = self.client.get(second.json()["next"])
+
+        numbers = [row["delivery_note_number"] for page in (first, second, third) for row in page.json()["results"]]
+        self.assertEqual(sorted(numbers), [f"BL-LIST-{index}" for index in range(5)])
+        self.assertEqual(numbers[0], "BL-LIST-4")
+        self.assertIsNone(third.json()["next_cursor"])
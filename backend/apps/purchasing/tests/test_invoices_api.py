@@ -4,7 +4,7 @@ from rest_framework.test import APITestCase
 from apps.catalog.models import Supplier, SupplierProduct
 from apps.core.models import Site
 from apps.integration.models import IntegrationImportBatch
-from apps.purchasing.models import GoodsReceipt, GoodsReceiptLine, Invoice
+from apps.purchasing.models import GoodsReceipt, GoodsReceiptLine, Invoice, InvoiceLine
 
 
 class InvoiceApiTests(APITestCase):
@@ -176,3 +176,75 @@ class InvoiceApiTests(APITestCase):
         invoice = Invoice.objects.get(invoice_number="AV-001")
         self.assertEqual(invoice.lines.count(), 1)
         self.assertEqual(str(invoice.lines.first().qty_value), "-1.000")
+
+    def _seed_invoices(self, count):
+        for index in range(count):
+            invoice = Invoice.objects.create(
+                site=self.site,
+                supplier=self.supplier,
+                invoice_number=f"INV-LIST-{index:03d}",
+                invoice_date=f"2026-01-{(index % 3) + 1:02d}",
+            )
+            InvoiceLine.objects.create(invoice=invoice, raw_product_name="Milk", qty_value="1.000", qty_unit="l")
+
+    def test_list_invoices_walks_keyset_pages_without_gaps(self):
+        self._seed_invoices(7)
+
+        seen = []
+        dates = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"site": str(self.site.id), "limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/v1/invoices/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = response.json()
+            pages += 1
+            seen.extend(row["id"] for row in body["results"])
+            dates.extend(row["invoice_date"] for row in body["results"])
+            self.assertTrue(all(len(row["lines"]) == 1 for row in body["results"]))
+            cursor = body["next_cursor"]
+            if not cursor:
+                self.assertIsNone(body["next"])
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), {str(pk) for pk in Invoice.objects.values_list("id", flat=True)})
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_list_invoices_headers_only_with_date_range(self):
+        self._seed_invoices(6)
+
+        response = self.client.get(
+            "/api/v1/invoices/",
+            {"site": str(self.site.id), "include_lines": "false", "date_from": "2026-01-02", "date_to": "2026-01-02"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # No limit/cursor: the unpaginated array older clients expect.
+        results = response.json()
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(row["invoice_date"] == "2026-01-02" for row in results))
+        self.assertTrue(all("lines" not in row for row in results))
+
+    def test_list_invoices_returns_only_requested_fields(self):
+        self._seed_invoices(2)
+
+        headers = self.client.get("/api/v1/invoices/", {"site": str(self.site.id), "limit": 5, "fields": "id,invoice_number"})
+        with_lines = self.client.get("/api/v1/invoices/", {"site": str(self.site.id), "fields": "id,lines"})
+        unknown = self.client.get("/api/v1/invoices/", {"fields": "id,total"})
+
+        self.assertEqual(headers.status_code, status.HTTP_200_OK)
+        self.assertEqual([sorted(row) for row in headers.json()["results"]], [["id", "invoice_number"]] * 2)
+        self.assertEqual([sorted(row) for row in with_lines.json()], [["id", "lines"]] * 2)
+        self.assertEqual(unknown.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", unknown.json()["field_errors"])
+
+    def test_list_invoices_rejects_invalid_cursor(self):
+        response = self.client.get("/api/v1/invoices/", {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cursor", response.json()["field_errors"])
@@ -118,6 +118,37 @@ if os.getenv("FICHES_DB_NAME"):
         "PORT": os.getenv("FICHES_DB_PORT", "5432"),
     }
 
+
+def _psycopg_pool_available() -> bool:
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# none: one connection per request (Django default); persistent: reuse per thread with
+# health checks; pool: psycopg3 connection pool per process (needs psycopg[pool]).
+DB_CONNECTION_MODE = os.getenv("DB_CONNECTION_MODE", "persistent").strip().lower()
+if DB_CONNECTION_MODE == "pool" and not _psycopg_pool_available():
+    DB_CONNECTION_MODE = "persistent"
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+
+for database in DATABASES.values():
+    if DB_CONNECTION_MODE == "pool":
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT_SECONDS,
+        }
+    elif DB_CONNECTION_MODE == "persistent":
+        database["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+        database["CONN_HEALTH_CHECKS"] = True
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -161,7 +192,12 @@ FICHES_RECIPE_TITLE_COLUMN = os.getenv("FICHES_RECIPE_TITLE_COLUMN", "title")
 FICHES_RECIPE_DATA_COLUMN = os.getenv("FICHES_RECIPE_DATA_COLUMN", "data")
 FICHES_RECIPE_UPDATED_AT_COLUMN = os.getenv("FICHES_RECIPE_UPDATED_AT_COLUMN", "updated_at")
 FICHES_RECIPE_ACTIVE_COLUMN = os.getenv("FICHES_RECIPE_ACTIVE_COLUMN", "")
+# Column on fiches suppliers/supplier_products used for incremental catalog syncs; empty disables them.
+FICHES_CATALOG_UPDATED_AT_COLUMN = os.getenv("FICHES_CATALOG_UPDATED_AT_COLUMN", "updated_at")
 FICHES_API_BASE_URL = os.getenv("FICHES_API_BASE_URL", "").strip().rstrip("/")
+FICHES_API_TIMEOUT_SECONDS = float(os.getenv("FICHES_API_TIMEOUT_SECONDS", "30"))
+FICHES_API_WORKERS = int(os.getenv("FICHES_API_WORKERS", "8"))
+FICHES_API_MAX_RETRIES = int(os.getenv("FICHES_API_MAX_RETRIES", "3"))
 
 REST_FRAMEWORK = {
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.URLPathVersioning",
@@ -174,11 +210,40 @@ REST_FRAMEWORK = {
         "apps.core.api.permissions.HasValidApiKey",
     ),
     "EXCEPTION_HANDLER": "apps.core.api.exceptions.cookops_exception_handler",
+    # orjson-backed when installed, stdlib json otherwise.
+    "DEFAULT_RENDERER_CLASSES": (
+        "apps.core.api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "apps.core.api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 TRACCIA_API_BASE_URL = os.getenv("TRACCIA_API_BASE_URL", "").strip().rstrip("/")
 TRACCIA_API_KEY = os.getenv("TRACCIA_API_KEY", "").strip()
 TRACCIA_TIMEOUT_SECONDS = float(os.getenv("TRACCIA_TIMEOUT_SECONDS", "12"))
+# Short-lived cache for Traccia GET proxies polled by kitchen tablets; 0 disables it.
+# locmem is per process; use file or db to share entries (and invalidations) across gunicorn workers.
+TRACCIA_CACHE_TTL_SECONDS = float(os.getenv("TRACCIA_CACHE_TTL_SECONDS", "10"))
+TRACCIA_CACHE_BACKEND = os.getenv("TRACCIA_CACHE_BACKEND", "locmem").strip().lower()
+_TRACCIA_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "cookops-traccia"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "var" / "traccia-cache")),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "cookops_traccia_cache"),
+}
+_traccia_cache_backend, _traccia_cache_location = _TRACCIA_CACHE_BACKENDS.get(
+    TRACCIA_CACHE_BACKEND, _TRACCIA_CACHE_BACKENDS["locmem"]
+)
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "traccia": {
+        "BACKEND": _traccia_cache_backend,
+        "LOCATION": os.getenv("TRACCIA_CACHE_LOCATION", "").strip() or _traccia_cache_location,
+    },
+}
 
 GOOGLE_DRIVE_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID", "").strip()
 GOOGLE_DRIVE_LABELS_FOLDER_ID = os.getenv("GOOGLE_DRIVE_LABELS_FOLDER_ID", "").strip() or GOOGLE_DRIVE_FOLDER_ID
@@ -190,6 +255,7 @@ GOOGLE_DRIVE_OAUTH_CLIENT_SECRET = os.getenv("GOOGLE_DRIVE_OAUTH_CLIENT_SECRET",
 GOOGLE_DRIVE_OAUTH_REFRESH_TOKEN = os.getenv("GOOGLE_DRIVE_OAUTH_REFRESH_TOKEN", "").strip()
 GOOGLE_DRIVE_OAUTH_TOKEN_URI = os.getenv("GOOGLE_DRIVE_OAUTH_TOKEN_URI", "https://oauth2.googleapis.com/token").strip()
 GOOGLE_DRIVE_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_DRIVE_TIMEOUT_SECONDS", "20"))
+GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE = int(os.getenv("GOOGLE_DRIVE_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
 DRIVE_IMPORT_WORKER_ENABLED = os.getenv("DRIVE_IMPORT_WORKER_ENABLED", "false").lower() == "true"
 DRIVE_IMPORT_WORKER_INTERVAL_SECONDS = int(os.getenv("DRIVE_IMPORT_WORKER_INTERVAL_SECONDS", "300"))
 DRIVE_IMPORT_WORKER_SITE_IDS = [
@@ -208,3 +274,23 @@ if not DRIVE_IMPORT_WORKER_DOCUMENT_TYPES:
 DRIVE_IMPORT_WORKER_LIMIT = int(os.getenv("DRIVE_IMPORT_WORKER_LIMIT", "80"))
 DRIVE_IMPORT_SCAN_LIMIT = int(os.getenv("DRIVE_IMPORT_SCAN_LIMIT", "2000"))
 DRIVE_IMPORT_WORKER_AUTO_EXTRACT = os.getenv("DRIVE_IMPORT_WORKER_AUTO_EXTRACT", "true").lower() == "true"
+EXTRACTION_QUEUE_ASYNC = os.getenv("EXTRACTION_QUEUE_ASYNC", "false").lower() == "true"
+EXTRACTION_QUEUE_MAX_ATTEMPTS = int(os.getenv("EXTRACTION_QUEUE_MAX_ATTEMPTS", "3"))
+EXTRACTION_QUEUE_RETRY_BASE_SECONDS = int(os.getenv("EXTRACTION_QUEUE_RETRY_BASE_SECONDS", "30"))
+EXTRACTION_QUEUE_RETRY_MAX_SECONDS = int(os.getenv("EXTRACTION_QUEUE_RETRY_MAX_SECONDS", "900"))
+EXTRACTION_QUEUE_LOCK_TIMEOUT_SECONDS = int(os.getenv("EXTRACTION_QUEUE_LOCK_TIMEOUT_SECONDS", "600"))
+EXTRACTION_QUEUE_POLL_SECONDS = float(os.getenv("EXTRACTION_QUEUE_POLL_SECONDS", "5"))
+EXTRACTION_QUEUE_CALLBACK_URL = os.getenv("EXTRACTION_QUEUE_CALLBACK_URL", "").strip()
+# Hosts a client may name in a per-request callback_url; empty means only EXTRACTION_QUEUE_CALLBACK_URL is used.
+EXTRACTION_QUEUE_CALLBACK_ALLOWED_HOSTS = [
+    item.strip().lower()
+    for item in os.getenv("EXTRACTION_QUEUE_CALLBACK_ALLOWED_HOSTS", "").split(",")
+    if item.strip()
+]
+EXTRACTION_QUEUE_CALLBACK_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_QUEUE_CALLBACK_TIMEOUT_SECONDS", "5"))
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_LABEL_BATCH_SIZE = int(os.getenv("EXTRACTION_LABEL_BATCH_SIZE", "8"))
+OCR_PREPROCESSING_ENABLED = os.getenv("OCR_PREPROCESSING_ENABLED", "true").lower() == "true"
+OCR_IMAGE_MAX_EDGE = int(os.getenv("OCR_IMAGE_MAX_EDGE", "1568"))
+OCR_IMAGE_JPEG_QUALITY = int(os.getenv("OCR_IMAGE_JPEG_QUALITY", "85"))
+OCR_PDF_DROP_BLANK_PAGES = os.getenv("OCR_PDF_DROP_BLANK_PAGES", "false").lower() == "true"
@@ -2,4 +2,5 @@
 set -euo pipefail
 
 python manage.py migrate
+python manage.py createcachetable
 exec gunicorn config.wsgi:application --bind 0.0.0.0:${PORT:-8000} --workers ${GUNICORN_WORKERS:-2} --timeout ${GUNICORN_TIMEOUT:-120}
@@ -1847,14 +1847,15 @@ function App() {
 
   async function loadSupplierProductSuggestions(search = "") {
     try {
-      const query = search ? `?active=1&q=${encodeURIComponent(search)}` : "?active=1";
-      const res = await apiFetch(`/supplier-products/${query}`);
+      const res = await apiFetch(`/supplier-products/complete/?active=1&limit=50&q=${encodeURIComponent(search)}`);
       const body = await res.json();
       if (!res.ok) {
         setSupplierProductSuggestions([]);
         return;
       }
-      const names = ((body ?? []) as Array<{ name?: string }>).map((item) => item.name?.trim() ?? "").filter(Boolean);
+      const names = ((body?.results ?? []) as Array<{ name?: string }>)
+        .map((item) => item.name?.trim() ?? "")
+        .filter(Boolean);
       setSupplierProductSuggestions([...new Set(names)]);
     } catch {
       setSupplierProductSuggestions([]);
@@ -2547,12 +2548,19 @@ function App() {
     try {
       const responses = await Promise.all(
         activeSites.map(async (site) => {
-          const res = await apiFetch(`/invoices/?site=${encodeURIComponent(site.id)}`);
-          const body = await res.json();
-          if (!res.ok) {
-            throw new Error(body.detail ?? JSON.stringify(body));
-          }
-          return Array.isArray(body) ? (body as InvoiceRecord[]) : [];
+          const invoices: InvoiceRecord[] = [];
+          let cursor: string | null = null;
+          do {
+            const query = `site=${encodeURIComponent(site.id)}&limit=500${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""}`;
+            const res = await apiFetch(`/invoices/?${query}`);
+            const body = await res.json();
+            if (!res.ok) {
+              throw new Error(body.detail ?? JSON.stringify(body));
+            }
+            invoices.push(...(Array.isArray(body.results) ? (body.results as InvoiceRecord[]) : []));
+            cursor = typeof body.next_cursor === "string" ? body.next_cursor : null;
+          } while (cursor);
+          return invoices;
         })
       );
       const deduped = new Map<string, InvoiceRecord>();